@@ -4,8 +4,12 @@ from flask import Flask
 from app.db import init_db
 
 
-def create_app() -> Flask:
-    """Flask 앱을 생성하고 설정합니다."""
+def create_app(start_services: bool = True) -> Flask:
+    """Flask 앱을 생성하고 설정합니다.
+
+    start_services=False면 백그라운드 스레드(인박스/스케줄러/write-back/리포트 작업)를
+    시작하지 않습니다 (디버그 리로더의 감시 프로세스처럼 요청을 받지 않는 프로세스).
+    """
     import config
     application = Flask(__name__)
     application.secret_key = config.SECRET_KEY
@@ -15,6 +19,8 @@ def create_app() -> Flask:
     application.config["SESSION_COOKIE_SAMESITE"] = "Lax"
     application.config["SESSION_REFRESH_EACH_REQUEST"] = False
     init_db(application)
+    if start_services:
+        _init_services(application)
     _register_blueprints(application)
     _register_context_processors(application)
     _register_template_filters(application)
@@ -23,6 +29,27 @@ def create_app() -> Flask:
     return application
 
 
+def _init_services(application: Flask) -> None:
+    """백그라운드 서비스를 시작합니다.
+
+    write-back 큐와 리포트 작업 풀은 상태를 프로세스 메모리에 두므로 요청을 받는 프로세스마다
+    시작하고, DB를 주기적으로 훑는 스케줄러와 인박스 디스패처는 BACKGROUND_POLLERS가
+    켜진 프로세스에서만 시작합니다 (여러 워커 프로세스로 띄울 때 한 곳만 켠다).
+    """
+    import config
+    from app.services.pos_writeback_service import init_pos_writeback
+    from app.services.pos_inbox_service import init_pos_inbox
+    from app.services.pos_sync_scheduler import init_pos_sync_scheduler
+    from app.services.report_job_service import init_report_jobs
+    init_pos_writeback(application)
+    init_report_jobs(application)
+    if not config.BACKGROUND_POLLERS:
+        print("  [백그라운드] 이 프로세스에서는 POS 스케줄러/인박스 디스패처를 시작하지 않음")
+        return
+    init_pos_inbox(application)
+    init_pos_sync_scheduler(application)
+
+
 def _register_blueprints(application: Flask) -> None:
     """모든 Blueprint를 등록합니다."""
     from app.routes.auth_routes import auth_bp
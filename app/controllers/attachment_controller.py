@@ -1,8 +1,8 @@
 """첨부파일 관리 비즈니스 로직 (영수증/배송원장 사진)"""
 import io
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from werkzeug.datastructures import FileStorage
-from app.db import fetch_one, fetch_all, insert, execute
+from app.db import fetch_one, fetch_all, insert, execute, stream_all
 
 MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 업로드 허용 최대 10MB (리사이징 전)
 MAX_IMAGE_DIMENSION: int = 1920  # 긴 변 최대 1920px (FHD)
@@ -171,6 +171,18 @@ def load_attachments_by_period(business_id: int, start_date: str = "",
                                end_date: str = "",
                                reference_type: str = "") -> List[Dict]:
     """기간별 첨부파일 목록을 조회합니다 (세무 앱 연동용, file_data 제외)."""
+    return fetch_all(*_attachments_by_period_query(business_id, start_date, end_date, reference_type))
+
+
+def iter_attachments_by_period(business_id: int, start_date: str = "",
+                               end_date: str = "", reference_type: str = "") -> Iterator[Dict]:
+    """기간별 첨부파일 목록을 서버 측 커서로 한 행씩 돌려줍니다 (내보내기용)."""
+    for chunk in stream_all(*_attachments_by_period_query(business_id, start_date, end_date, reference_type)):
+        yield from chunk
+
+
+def _attachments_by_period_query(business_id: int, start_date: str = "", end_date: str = "",
+                                 reference_type: str = "") -> Tuple[str, tuple]:
     sql = (
         "SELECT a.id, a.reference_type, a.reference_id, a.file_name, "
         "a.file_type, a.file_size, a.memo, a.created_at "
@@ -188,4 +200,4 @@ def load_attachments_by_period(business_id: int, start_date: str = "",
         sql += " AND a.created_at <= %s"
         params.append(end_date + " 23:59:59")
     sql += " ORDER BY a.created_at DESC"
-    return fetch_all(sql, tuple(params))
+    return sql, tuple(params)
@@ -0,0 +1,78 @@
+"""대시보드 위젯 비즈니스 로직"""
+from typing import Dict, Iterable, Optional
+from app.db import fetch_one, fetch_all
+from app.controllers.inventory_controller import load_inventory_summary, load_expiry_alerts
+from app.controllers.report_controller import load_low_stock_products
+from app.controllers.pos_sync_controller import load_sync_status, load_sync_progress
+from app.controllers.transfer_controller import load_pending_transfer_counts, load_store_inventory_summary
+from app.services import dashboard_cache_service
+
+DASHBOARD_GROUPS = ("inventory", "store_inventory", "transfers", "sync")
+
+
+def load_dashboard(business_id: int, store_id: Optional[int], is_hq: bool,
+                   groups: Iterable[str] = DASHBOARD_GROUPS) -> Dict:
+    """대시보드 위젯 묶음들을 캐시를 거쳐 조회합니다.
+
+    본점/관리자는 전체, 지점 직원은 자기 매장 재고만 봅니다.
+    """
+    widgets: Dict = {}
+    if "inventory" in groups:
+        scope = None if is_hq else store_id
+        widgets.update(dashboard_cache_service.get_widget(
+            business_id, scope, "inventory", lambda: _load_inventory_widgets(business_id, scope),
+        ))
+    if "store_inventory" in groups:
+        widgets["store_inventory"] = dashboard_cache_service.get_widget(
+            business_id, None, "store_inventory", lambda: load_store_inventory_summary(business_id),
+        )
+    if "transfers" in groups:
+        widgets["transfer_counts"] = dashboard_cache_service.get_widget(
+            business_id, store_id, "transfers",
+            lambda: load_pending_transfer_counts(business_id, store_id) if store_id
+            else {"outgoing": 0, "incoming": 0},
+        )
+    if "sync" in groups:
+        pos_sync = dashboard_cache_service.get_widget(
+            business_id, None, "sync", lambda: load_sync_status(business_id),
+        )
+        # 청크 진행 상황은 메모리 값이라 캐시하지 않는다
+        widgets["pos_sync"] = dict(pos_sync, progress=load_sync_progress(business_id))
+    return widgets
+
+
+def _load_inventory_widgets(business_id: int, store_id: Optional[int]) -> Dict:
+    """재고 요약/부족 재고/상품 수/최근 입출고/유통기한 알림 (store_id가 없으면 전체)."""
+    if store_id:
+        product_count = fetch_one(
+            "SELECT COUNT(DISTINCT i.product_id) AS cnt FROM stk_inventory i "
+            "WHERE i.store_id=%s AND i.quantity > 0",
+            (store_id,),
+        )
+        recent_tx = fetch_all(
+            "SELECT t.*, p.name AS product_name, p.code AS product_code "
+            "FROM stk_transactions t "
+            "JOIN stk_products p ON t.product_id = p.id "
+            "WHERE t.store_id = %s ORDER BY t.created_at DESC LIMIT 10",
+            (store_id,),
+        )
+    else:
+        product_count = fetch_one(
+            "SELECT COUNT(*) AS cnt FROM stk_products WHERE business_id=%s AND is_active=1",
+            (business_id,),
+        )
+        recent_tx = fetch_all(
+            "SELECT t.*, p.name AS product_name, p.code AS product_code "
+            "FROM stk_transactions t "
+            "JOIN stk_products p ON t.product_id = p.id "
+            "JOIN stk_stores s ON t.store_id = s.id "
+            "WHERE s.business_id = %s ORDER BY t.created_at DESC LIMIT 10",
+            (business_id,),
+        )
+    return {
+        "summary": load_inventory_summary(business_id, store_id=store_id),
+        "low_stock": load_low_stock_products(business_id, store_id=store_id)[:10],
+        "product_count": product_count["cnt"] if product_count else 0,
+        "recent_transactions": recent_tx,
+        "expiry_alerts": load_expiry_alerts(business_id, store_id=store_id),
+    }
@@ -1,7 +1,8 @@
 """재고 관리 비즈니스 로직 (유통기한/FEFO 지원)"""
 from datetime import date
-from typing import Dict, List, Optional
-from app.db import fetch_one, fetch_all, insert, execute
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.db import BATCH_SIZE, fetch_one, fetch_all, insert, insert_many, execute, stream_all, transaction
+from app.services import inventory_totals_service
 
 
 def load_inventory(store_id: int, category_id: Optional[int] = None,
@@ -35,8 +36,8 @@ def load_inventory_summary(business_id: int, store_id: int = None) -> Dict:
     if store_id:
         total = fetch_one(
             "SELECT COUNT(DISTINCT i.product_id) AS product_count, "
-            "COALESCE(SUM(i.quantity), 0) AS total_quantity "
-            "FROM stk_inventory i "
+            "COALESCE(SUM(i.qty), 0) AS total_quantity "
+            "FROM stk_inventory_totals i "
             "JOIN stk_products p ON i.product_id = p.id "
             "WHERE i.store_id = %s AND p.is_active = 1",
             (store_id,),
@@ -44,8 +45,8 @@ def load_inventory_summary(business_id: int, store_id: int = None) -> Dict:
     else:
         total = fetch_one(
             "SELECT COUNT(DISTINCT i.product_id) AS product_count, "
-            "COALESCE(SUM(i.quantity), 0) AS total_quantity "
-            "FROM stk_inventory i "
+            "COALESCE(SUM(i.qty), 0) AS total_quantity "
+            "FROM stk_inventory_totals i "
             "JOIN stk_products p ON i.product_id = p.id "
             "JOIN stk_stores s ON i.store_id = s.id "
             "WHERE s.business_id = %s AND p.is_active = 1",
@@ -93,6 +94,16 @@ def load_expiry_alerts(business_id: int, days: int = 30, store_id: int = None) -
 
 def load_expiry_report(business_id: int, filter_type: str = "all") -> List[Dict]:
     """유통기한 리포트를 조회합니다."""
+    return fetch_all(*_expiry_report_query(business_id, filter_type))
+
+
+def iter_expiry_report(business_id: int, filter_type: str = "all") -> Iterator[Dict]:
+    """유통기한 리포트를 서버 측 커서로 한 행씩 돌려줍니다 (내보내기용)."""
+    for chunk in stream_all(*_expiry_report_query(business_id, filter_type)):
+        yield from chunk
+
+
+def _expiry_report_query(business_id: int, filter_type: str = "all") -> Tuple[str, tuple]:
     today = date.today()
     sql = (
         "SELECT i.id, i.quantity, i.expiry_date, i.location, "
@@ -117,7 +128,7 @@ def load_expiry_report(business_id: int, filter_type: str = "all") -> List[Dict]
         sql += " AND i.expiry_date >= %s AND i.expiry_date <= DATE_ADD(%s, INTERVAL 30 DAY)"
         params.extend([today, today])
     sql += " ORDER BY i.expiry_date ASC, p.name"
-    return fetch_all(sql, tuple(params))
+    return sql, tuple(params)
 
 
 def load_product_lots(product_id: int, store_id: int,
@@ -144,14 +155,15 @@ def process_stock_in(product_id: int, store_id: int, quantity: float,
                      reference_id: Optional[int] = None, reference_type: str = "",
                      expiry_date: Optional[str] = None) -> int:
     """입고를 처리합니다 (유통기한별 로트 관리)."""
-    _upsert_inventory(product_id, store_id, location, quantity, expiry_date=expiry_date)
-    tx_id = _record_transaction(
-        product_id=product_id, store_id=store_id, tx_type="in",
-        to_location=location, quantity=quantity, unit_price=unit_price,
-        reason=reason, user_id=user_id, reference_id=reference_id,
-        reference_type=reference_type,
-    )
-    _sync_to_pos(product_id, store_id)
+    with transaction():
+        _upsert_inventory(product_id, store_id, location, quantity, expiry_date=expiry_date)
+        tx_id = _record_transaction(
+            product_id=product_id, store_id=store_id, tx_type="in",
+            to_location=location, quantity=quantity, unit_price=unit_price,
+            reason=reason, user_id=user_id, reference_id=reference_id,
+            reference_type=reference_type,
+        )
+        _sync_to_pos(product_id, store_id)
     return tx_id
 
 
@@ -160,17 +172,88 @@ def process_stock_in(product_id: int, store_id: int, quantity: float,
 def process_stock_out(product_id: int, store_id: int, quantity: float,
                       location: str = "warehouse", unit_price: float = 0,
                       reason: str = "", user_id: Optional[int] = None,
-                      reference_id: Optional[int] = None, reference_type: str = "") -> int:
-    """출고를 처리합니다 (FEFO: 유통기한 빠른 것부터 차감)."""
-    _fefo_deduct(product_id, store_id, location, quantity)
-    tx_id = _record_transaction(
-        product_id=product_id, store_id=store_id, tx_type="out",
-        from_location=location, quantity=quantity, unit_price=unit_price,
-        reason=reason, user_id=user_id, reference_id=reference_id,
-        reference_type=reference_type,
-    )
-    _sync_to_pos(product_id, store_id)
-    return tx_id
+                      reference_id: Optional[int] = None,
+                      reference_type: str = "") -> Tuple[int, List[Dict]]:
+    """출고를 처리합니다 (FEFO: 유통기한 빠른 것부터 차감).
+
+    반환: (stk_transactions ID, 로트별 차감 내역 [{"inventory_id", "quantity", "expiry_date"}])
+    """
+    with transaction():
+        allocations = _fefo_deduct(product_id, store_id, location, quantity)
+        tx_id = _record_transaction(
+            product_id=product_id, store_id=store_id, tx_type="out",
+            from_location=location, quantity=quantity, unit_price=unit_price,
+            reason=reason, user_id=user_id, reference_id=reference_id,
+            reference_type=reference_type,
+        )
+        _sync_to_pos(product_id, store_id)
+    return tx_id, allocations
+
+
+def process_stock_out_batch(lines: List[Dict], store_id: int,
+                            reason: str = "", user_id: Optional[int] = None,
+                            reference_id: Optional[int] = None,
+                            reference_type: str = "") -> Tuple[List[int], List[List[Dict]]]:
+    """여러 품목 출고를 한 번에 처리합니다 (FEFO, 로트 일괄 조회/차감/기록).
+
+    lines: [{"product_id", "quantity", "location"(기본 warehouse),
+             "unit_price"(선택), "reason"(선택, 라인별 사유)}]
+    반환: (lines 순서대로 생성된 stk_transactions ID 목록,
+           lines 순서대로 로트별 차감 내역 [{"inventory_id", "quantity", "expiry_date"}] 목록)
+    """
+    if not lines:
+        return [], []
+    product_ids = sorted({int(line["product_id"]) for line in lines})
+    with transaction():
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        lots = fetch_all(
+            f"SELECT id, product_id, location, quantity, expiry_date FROM stk_inventory "
+            f"WHERE store_id = %s AND product_id IN ({placeholders}) AND quantity > 0 "
+            f"ORDER BY product_id, location, expiry_date IS NULL, expiry_date ASC, id ASC "
+            f"FOR UPDATE",
+            (store_id, *product_ids),
+        )
+        lots_by_key: Dict[Tuple[int, str], List[Dict]] = {}
+        for lot in lots:
+            lot["quantity"] = float(lot["quantity"])
+            lots_by_key.setdefault((lot["product_id"], lot["location"]), []).append(lot)
+        deductions: Dict[int, float] = {}
+        total_deltas = []
+        entries = []
+        line_allocations: List[List[Dict]] = []
+        for line in lines:
+            product_id = int(line["product_id"])
+            location = line.get("location") or "warehouse"
+            quantity = float(line["quantity"])
+            allocations = []
+            if quantity > 0:
+                key_lots = lots_by_key.get((product_id, location), [])
+                allocations, shortage = _allocate_fefo(key_lots, quantity)
+                lot_by_id = {lot["id"]: lot for lot in key_lots}
+                for alloc in allocations:
+                    lot_by_id[alloc["inventory_id"]]["quantity"] -= alloc["quantity"]
+                    deductions[alloc["inventory_id"]] = (
+                        deductions.get(alloc["inventory_id"], 0.0) + alloc["quantity"]
+                    )
+                    total_deltas.append((product_id, store_id, location, -alloc["quantity"]))
+                if shortage > 0:
+                    print(f"⚠️ FEFO 부족: product_id={product_id}, 부족량={shortage}")
+            line_allocations.append(allocations)
+            entries.append({
+                "product_id": product_id, "store_id": store_id, "tx_type": "out",
+                "from_location": location, "quantity": quantity,
+                "unit_price": float(line.get("unit_price") or 0),
+                "reason": line.get("reason") or reason, "user_id": user_id,
+                "reference_id": reference_id, "reference_type": reference_type,
+            })
+        _apply_lot_deductions([
+            {"inventory_id": inv_id, "quantity": qty} for inv_id, qty in deductions.items()
+        ])
+        inventory_totals_service.apply_deltas(total_deltas)
+        tx_ids = _record_transactions(entries)
+        for product_id in product_ids:
+            _sync_to_pos(product_id, store_id)
+    return tx_ids, line_allocations
 
 
 def process_lot_stock_out(lot_deductions: List[Dict], store_id: int,
@@ -178,64 +261,74 @@ def process_lot_stock_out(lot_deductions: List[Dict], store_id: int,
                           reference_id: Optional[int] = None,
                           reference_type: str = "") -> List[int]:
     """로트 지정 출고: 사용자가 선택한 로트별로 차감합니다."""
-    tx_ids = []
-    synced_products = set()
-    for lot in lot_deductions:
-        inv_id = lot["inventory_id"]
-        qty = float(lot["quantity"])
-        if qty <= 0:
-            continue
-        inv = fetch_one("SELECT product_id, location FROM stk_inventory WHERE id = %s", (inv_id,))
-        if not inv:
-            continue
-        execute(
-            "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
-            (qty, inv_id),
-        )
-        tx_id = _record_transaction(
-            product_id=inv["product_id"], store_id=store_id, tx_type="out",
-            from_location=inv["location"], quantity=qty,
-            reason=reason, user_id=user_id,
-            reference_id=reference_id, reference_type=reference_type,
-        )
-        tx_ids.append(tx_id)
-        synced_products.add(inv["product_id"])
-    for pid in synced_products:
-        _sync_to_pos(pid, store_id)
+    with transaction():
+        tx_ids = []
+        synced_products = set()
+        for lot in lot_deductions:
+            inv_id = lot["inventory_id"]
+            qty = float(lot["quantity"])
+            if qty <= 0:
+                continue
+            inv = fetch_one(
+                "SELECT product_id, store_id, location FROM stk_inventory WHERE id = %s", (inv_id,),
+            )
+            if not inv:
+                continue
+            execute(
+                "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
+                (qty, inv_id),
+            )
+            inventory_totals_service.apply_deltas(
+                [(inv["product_id"], inv["store_id"], inv["location"], -qty)]
+            )
+            tx_id = _record_transaction(
+                product_id=inv["product_id"], store_id=store_id, tx_type="out",
+                from_location=inv["location"], quantity=qty,
+                reason=reason, user_id=user_id,
+                reference_id=reference_id, reference_type=reference_type,
+            )
+            tx_ids.append(tx_id)
+            synced_products.add(inv["product_id"])
+        for pid in synced_products:
+            _sync_to_pos(pid, store_id)
     return tx_ids
 
 
 def process_lot_stock_move(lot_deductions: List[Dict], store_id: int,
                            to_location: str, user_id: Optional[int] = None) -> List[int]:
     """로트 지정 이동: 사용자가 선택한 로트별로 이동합니다."""
-    tx_ids = []
-    synced_products = set()
-    for lot in lot_deductions:
-        inv_id = lot["inventory_id"]
-        qty = float(lot["quantity"])
-        if qty <= 0:
-            continue
-        inv = fetch_one(
-            "SELECT product_id, location, expiry_date FROM stk_inventory WHERE id = %s",
-            (inv_id,),
-        )
-        if not inv:
-            continue
-        execute(
-            "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
-            (qty, inv_id),
-        )
-        expiry_str = str(inv["expiry_date"]) if inv["expiry_date"] else None
-        _upsert_inventory(inv["product_id"], store_id, to_location, qty, expiry_date=expiry_str)
-        tx_id = _record_transaction(
-            product_id=inv["product_id"], store_id=store_id, tx_type="move",
-            from_location=inv["location"], to_location=to_location,
-            quantity=qty, user_id=user_id,
-        )
-        tx_ids.append(tx_id)
-        synced_products.add(inv["product_id"])
-    for pid in synced_products:
-        _sync_to_pos(pid, store_id)
+    with transaction():
+        tx_ids = []
+        synced_products = set()
+        for lot in lot_deductions:
+            inv_id = lot["inventory_id"]
+            qty = float(lot["quantity"])
+            if qty <= 0:
+                continue
+            inv = fetch_one(
+                "SELECT product_id, store_id, location, expiry_date FROM stk_inventory WHERE id = %s",
+                (inv_id,),
+            )
+            if not inv:
+                continue
+            execute(
+                "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
+                (qty, inv_id),
+            )
+            inventory_totals_service.apply_deltas(
+                [(inv["product_id"], inv["store_id"], inv["location"], -qty)]
+            )
+            expiry_str = str(inv["expiry_date"]) if inv["expiry_date"] else None
+            _upsert_inventory(inv["product_id"], store_id, to_location, qty, expiry_date=expiry_str)
+            tx_id = _record_transaction(
+                product_id=inv["product_id"], store_id=store_id, tx_type="move",
+                from_location=inv["location"], to_location=to_location,
+                quantity=qty, user_id=user_id,
+            )
+            tx_ids.append(tx_id)
+            synced_products.add(inv["product_id"])
+        for pid in synced_products:
+            _sync_to_pos(pid, store_id)
     return tx_ids
 
 
@@ -243,32 +336,43 @@ def process_stock_adjust(product_id: int, store_id: int, new_quantity: float,
                          location: str = "warehouse", reason: str = "",
                          user_id: Optional[int] = None,
                          inventory_id: Optional[int] = None) -> int:
-    """재고를 조정합니다 (특정 로트 지정 가능)."""
-    if inventory_id:
-        row = fetch_one("SELECT quantity FROM stk_inventory WHERE id = %s", (inventory_id,))
-        current_qty = float(row["quantity"]) if row else 0
-        diff = new_quantity - current_qty
-        execute("UPDATE stk_inventory SET quantity = %s WHERE id = %s", (new_quantity, inventory_id))
-    else:
-        rows = fetch_all(
-            "SELECT id, quantity FROM stk_inventory "
-            "WHERE product_id=%s AND store_id=%s AND location=%s",
-            (product_id, store_id, location),
-        )
-        current_qty = sum(float(r["quantity"]) for r in rows)
-        diff = new_quantity - current_qty
-        if rows:
-            execute(
-                "UPDATE stk_inventory SET quantity = quantity + %s WHERE id = %s",
-                (diff, rows[0]["id"]),
+    """재고를 조정합니다 (특정 로트 지정 가능).
+
+    inventory_id가 이 매장/상품의 로트가 아니면 ValueError를 냅니다.
+    """
+    with transaction():
+        if inventory_id:
+            row = fetch_one(
+                "SELECT quantity FROM stk_inventory "
+                "WHERE id = %s AND product_id = %s AND store_id = %s FOR UPDATE",
+                (inventory_id, product_id, store_id),
             )
+            if not row:
+                raise ValueError(f"Inventory lot not found: {inventory_id}")
+            diff = new_quantity - float(row["quantity"])
+            execute("UPDATE stk_inventory SET quantity = %s WHERE id = %s", (new_quantity, inventory_id))
+            inventory_totals_service.apply_lot_deltas([(inventory_id, diff)])
         else:
-            _set_inventory(product_id, store_id, location, new_quantity)
-    tx_id = _record_transaction(
-        product_id=product_id, store_id=store_id, tx_type="adjust",
-        to_location=location, quantity=diff, reason=reason, user_id=user_id,
-    )
-    _sync_to_pos(product_id, store_id)
+            rows = fetch_all(
+                "SELECT id, quantity FROM stk_inventory "
+                "WHERE product_id=%s AND store_id=%s AND location=%s FOR UPDATE",
+                (product_id, store_id, location),
+            )
+            current_qty = sum(float(r["quantity"]) for r in rows)
+            diff = new_quantity - current_qty
+            if rows:
+                execute(
+                    "UPDATE stk_inventory SET quantity = quantity + %s WHERE id = %s",
+                    (diff, rows[0]["id"]),
+                )
+                inventory_totals_service.apply_deltas([(product_id, store_id, location, diff)])
+            else:
+                _set_inventory(product_id, store_id, location, new_quantity)
+        tx_id = _record_transaction(
+            product_id=product_id, store_id=store_id, tx_type="adjust",
+            to_location=location, quantity=diff, reason=reason, user_id=user_id,
+        )
+        _sync_to_pos(product_id, store_id)
     return tx_id
 
 
@@ -278,35 +382,44 @@ def process_stock_discard(product_id: int, store_id: int, quantity: float,
                           expiry_date: Optional[str] = None,
                           inventory_id: Optional[int] = None) -> int:
     """폐기를 처리합니다 (특정 로트 지정 가능)."""
-    if inventory_id:
-        execute(
-            "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
-            (quantity, inventory_id),
+    with transaction():
+        if inventory_id:
+            execute(
+                "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
+                (quantity, inventory_id),
+            )
+            inventory_totals_service.apply_lot_deltas([(inventory_id, -quantity)])
+        elif expiry_date:
+            _upsert_inventory(product_id, store_id, location, -quantity, expiry_date=expiry_date)
+        else:
+            _fefo_deduct(product_id, store_id, location, quantity)
+        tx_id = _record_transaction(
+            product_id=product_id, store_id=store_id, tx_type="discard",
+            from_location=location, quantity=quantity, reason=reason, user_id=user_id,
         )
-    elif expiry_date:
-        _upsert_inventory(product_id, store_id, location, -quantity, expiry_date=expiry_date)
-    else:
-        _fefo_deduct(product_id, store_id, location, quantity)
-    tx_id = _record_transaction(
-        product_id=product_id, store_id=store_id, tx_type="discard",
-        from_location=location, quantity=quantity, reason=reason, user_id=user_id,
-    )
-    _sync_to_pos(product_id, store_id)
+        _sync_to_pos(product_id, store_id)
     return tx_id
 
 
 def process_stock_move(product_id: int, store_id: int,
                        from_location: str, to_location: str,
                        quantity: float, user_id: Optional[int] = None) -> int:
-    """위치 간 재고를 이동합니다."""
-    _fefo_deduct(product_id, store_id, from_location, quantity)
-    _upsert_inventory(product_id, store_id, to_location, quantity)
-    tx_id = _record_transaction(
-        product_id=product_id, store_id=store_id, tx_type="move",
-        from_location=from_location, to_location=to_location,
-        quantity=quantity, user_id=user_id,
-    )
-    _sync_to_pos(product_id, store_id)
+    """위치 간 재고를 이동합니다.
+
+    FEFO로 차감한 로트별 수량을 유통기한 그대로 도착 위치 로트에 더하므로
+    재고가 부족하면 실제 차감한 만큼만 이동합니다.
+    """
+    with transaction():
+        allocations = _fefo_deduct(product_id, store_id, from_location, quantity)
+        for alloc in allocations:
+            expiry_str = str(alloc["expiry_date"]) if alloc["expiry_date"] else None
+            _upsert_inventory(product_id, store_id, to_location, alloc["quantity"], expiry_date=expiry_str)
+        tx_id = _record_transaction(
+            product_id=product_id, store_id=store_id, tx_type="move",
+            from_location=from_location, to_location=to_location,
+            quantity=sum(alloc["quantity"] for alloc in allocations), user_id=user_id,
+        )
+        _sync_to_pos(product_id, store_id)
     return tx_id
 
 
@@ -330,12 +443,9 @@ def load_transactions(store_id: int, limit: int = 50, tx_type: str = "") -> List
 # ── POS 동기화 헬퍼 ──
 
 def _sync_to_pos(product_id: int, store_id: int) -> None:
-    """재고 변동 후 POS menulist 재고를 동기화합니다 (실패 시 무시)."""
-    try:
-        from app.controllers.pos_sync_controller import sync_inventory_to_pos
-        sync_inventory_to_pos(product_id, store_id)
-    except Exception as e:
-        print(f"POS 동기화 스킵: {e}")
+    """재고 변동을 POS write-back 큐에 표시합니다 (커밋 후 모아서 반영)."""
+    from app.services.pos_writeback_service import mark_dirty
+    mark_dirty(product_id, store_id)
 
 
 # ── 내부 헬퍼 ──
@@ -361,34 +471,73 @@ def _upsert_inventory(product_id: int, store_id: int, location: str,
             (qty_delta, existing["id"]),
         )
     else:
+        qty_delta = max(0, qty_delta)
         insert(
             "INSERT INTO stk_inventory (product_id, store_id, location, quantity, expiry_date) "
             "VALUES (%s, %s, %s, %s, %s)",
-            (product_id, store_id, location, max(0, qty_delta), expiry_date),
+            (product_id, store_id, location, qty_delta, expiry_date),
         )
+    inventory_totals_service.apply_deltas([(product_id, store_id, location, qty_delta)])
+
 
+def _fefo_deduct(product_id: int, store_id: int, location: str, quantity: float) -> List[Dict]:
+    """FEFO: 유통기한 빠른 로트부터 차감하고 로트별 차감 내역을 반환합니다.
 
-def _fefo_deduct(product_id: int, store_id: int, location: str, quantity: float) -> None:
-    """FEFO: 유통기한 빠른 로트부터 차감합니다."""
+    transaction() 안에서 호출해야 FOR UPDATE 잠금이 커밋까지 유지됩니다.
+    """
     lots = fetch_all(
         "SELECT id, quantity, expiry_date FROM stk_inventory "
         "WHERE product_id=%s AND store_id=%s AND location=%s AND quantity > 0 "
-        "ORDER BY expiry_date IS NULL, expiry_date ASC",
+        "ORDER BY expiry_date IS NULL, expiry_date ASC, id ASC FOR UPDATE",
         (product_id, store_id, location),
     )
+    allocations, shortage = _allocate_fefo(lots, quantity)
+    _apply_lot_deductions(allocations)
+    inventory_totals_service.apply_deltas(
+        [(product_id, store_id, location, -sum(alloc["quantity"] for alloc in allocations))]
+    )
+    if shortage > 0:
+        print(f"⚠️ FEFO 부족: product_id={product_id}, 부족량={shortage}")
+    return allocations
+
+
+def _allocate_fefo(lots: List[Dict], quantity: float) -> Tuple[List[Dict], float]:
+    """FEFO 순으로 정렬된 로트에서 quantity만큼의 차감 계획을 계산합니다.
+
+    반환: ([{"inventory_id", "quantity", "expiry_date"}], 부족량)
+    """
+    allocations = []
     remaining = quantity
     for lot in lots:
         if remaining <= 0:
             break
-        lot_qty = float(lot["quantity"])
-        deduct = min(lot_qty, remaining)
+        deduct = min(float(lot["quantity"]), remaining)
+        if deduct <= 0:
+            continue
+        allocations.append({
+            "inventory_id": lot["id"],
+            "quantity": deduct,
+            "expiry_date": lot.get("expiry_date"),
+        })
+        remaining -= deduct
+    return allocations, max(0.0, remaining)
+
+
+def _apply_lot_deductions(allocations: List[Dict]) -> None:
+    """로트별 차감량을 CASE id 다중 UPDATE 한 문장으로 반영합니다."""
+    for start in range(0, len(allocations), BATCH_SIZE):
+        chunk = allocations[start:start + BATCH_SIZE]
+        cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+        placeholders = ", ".join(["%s"] * len(chunk))
+        params: list = []
+        for alloc in chunk:
+            params.extend([alloc["inventory_id"], alloc["quantity"]])
+        params.extend(alloc["inventory_id"] for alloc in chunk)
         execute(
-            "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
-            (deduct, lot["id"]),
+            f"UPDATE stk_inventory SET quantity = quantity - CASE id {cases} END "
+            f"WHERE id IN ({placeholders})",
+            tuple(params),
         )
-        remaining -= deduct
-    if remaining > 0:
-        print(f"⚠️ FEFO 부족: product_id={product_id}, 부족량={remaining}")
 
 
 def _set_inventory(product_id: int, store_id: int, location: str,
@@ -396,12 +545,12 @@ def _set_inventory(product_id: int, store_id: int, location: str,
     """재고를 특정 수량으로 설정합니다."""
     if expiry_date:
         existing = fetch_one(
-            "SELECT id FROM stk_inventory WHERE product_id=%s AND store_id=%s AND location=%s AND expiry_date=%s",
+            "SELECT id, quantity FROM stk_inventory WHERE product_id=%s AND store_id=%s AND location=%s AND expiry_date=%s",
             (product_id, store_id, location, expiry_date),
         )
     else:
         existing = fetch_one(
-            "SELECT id FROM stk_inventory WHERE product_id=%s AND store_id=%s AND location=%s AND expiry_date IS NULL",
+            "SELECT id, quantity FROM stk_inventory WHERE product_id=%s AND store_id=%s AND location=%s AND expiry_date IS NULL",
             (product_id, store_id, location),
         )
     if existing:
@@ -412,6 +561,24 @@ def _set_inventory(product_id: int, store_id: int, location: str,
             "VALUES (%s, %s, %s, %s, %s)",
             (product_id, store_id, location, quantity, expiry_date),
         )
+    old_qty = float(existing["quantity"]) if existing else 0
+    inventory_totals_service.apply_deltas([(product_id, store_id, location, quantity - old_qty)])
+
+
+def _record_transactions(entries: List[Dict]) -> List[int]:
+    """입출고 트랜잭션 여러 건을 다중 행 INSERT로 기록합니다 (_record_transaction 인자 dict 목록)."""
+    tx_ids = insert_many(
+        "INSERT INTO stk_transactions "
+        "(product_id, store_id, type, from_location, to_location, quantity, "
+        "unit_price, total_amount, reason, user_id, reference_id, reference_type) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        [(e["product_id"], e["store_id"], e["tx_type"], e.get("from_location", ""),
+          e.get("to_location", ""), e["quantity"], e.get("unit_price", 0),
+          abs(e["quantity"] * e.get("unit_price", 0)), e.get("reason", ""),
+          e.get("user_id"), e.get("reference_id"), e.get("reference_type", ""))
+         for e in entries],
+    )
+    return tx_ids
 
 
 def _record_transaction(product_id: int, store_id: int, tx_type: str,
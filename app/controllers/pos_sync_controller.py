@@ -1,15 +1,15 @@
 """POS 연동 비즈니스 로직 — Webhook 수신 및 폴링 동기화"""
-from typing import Dict, List, Optional
-from app.db import fetch_one, fetch_all, insert, execute, execute_pos_db
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.db import (
+    BATCH_SIZE, fetch_one, fetch_all, insert, execute, execute_many,
+    execute_pos_db, stream_pos_db, transaction,
+)
+from app.services import catalog_cache_service, dashboard_cache_service, inventory_totals_service
 
 
 def find_product_by_mcode(business_id: int, menu_code: str) -> Optional[Dict]:
-    """mcode(상품코드)로 Hana StockMaster 상품을 조회합니다."""
-    return fetch_one(
-        "SELECT id, code, name, unit, sell_price, unit_price FROM stk_products "
-        "WHERE business_id = %s AND code = %s AND is_active = 1",
-        (business_id, menu_code),
-    )
+    """mcode(상품코드)로 Hana StockMaster 상품을 조회합니다 (상품 캐시 사용)."""
+    return catalog_cache_service.get_product_by_code(business_id, menu_code)
 
 
 def find_recipe_by_pos_menu_id(business_id: int, pos_menu_id: int) -> Optional[Dict]:
@@ -35,12 +35,123 @@ def find_recipe_by_menu_code(business_id: int, menu_code: str) -> Optional[Dict]
     )
 
 
+WEBHOOK_TYPES = (
+    "sale", "stock_in", "loss", "product_sync",
+    "store_sync", "employee_sync", "stock_restore",
+)
+BAEKWON_WEBHOOK_TYPES = ("baekwon_sale", "baekwon_sale_batch", "baekwon_products")
+
+
+def webhook_idempotency_key(sync_type: str, data: Dict,
+                            header_key: str = "") -> Optional[str]:
+    """Webhook 중복 판정 키를 만듭니다 (Idempotency-Key 헤더 > pos_record_id).
+
+    키를 만들 근거가 없으면 None (중복 검사 없이 처리). baekwon_sale_batch는 영수증별
+    키로 중복을 거르므로 항상 None입니다.
+    """
+    from app.services.idempotency_service import make_key
+    if sync_type == "baekwon_sale_batch":
+        # 영수증마다 키를 선점하므로 배치 단위 키는 쓰지 않는다 (실패한 영수증만 재전송 시 처리)
+        return None
+    if header_key:
+        return make_key(f"header:{header_key}")
+    if sync_type == "baekwon_sale" and data.get("receipt_no"):
+        return baekwon_receipt_key(data["receipt_no"], data.get("pos_no", 1))
+    if data.get("pos_record_id"):
+        return make_key(f"{sync_type}:{data['pos_record_id']}")
+    record_ids = [str(item.get("pos_record_id") or "") for item in data.get("items", [])]
+    if record_ids and all(record_ids):
+        return make_key(f"{sync_type}:{','.join(sorted(record_ids))}")
+    return None
+
+
+class WebhookFailed(Exception):
+    """처리 중 오류가 난 라인이 있어 Webhook 전체를 되돌렸음 (재전송 시 다시 처리)."""
+
+    def __init__(self, result: Dict) -> None:
+        super().__init__("; ".join(result["errors"][:5]))
+        self.result = result
+
+
+def baekwon_receipt_key(receipt_no, pos_no) -> str:
+    """백원 POS 영수증 중복 판정 키 (단건/일괄 Webhook 공용)."""
+    from app.services.idempotency_service import make_key
+    return make_key(f"baekwon_sale:{receipt_no}:{pos_no}")
+
+
+def process_webhook(business_id: int, business_type: str, store_id: int,
+                    sync_type: str, data: Dict,
+                    idempotency_key: Optional[str] = None) -> Dict:
+    """Webhook 페이로드를 유형별 핸들러로 처리합니다 (즉시 처리/인박스 워커 공용).
+
+    idempotency_key가 있으면 같은 트랜잭션에서 키를 선점하며, 이미 처리된 키면
+    재고를 건드리지 않고 duplicate 결과를 반환합니다. 핸들러가 오류 라인을 보고하면
+    키와 재고 변경을 함께 되돌리고 WebhookFailed를 발생시켜 재전송을 받을 수 있게 합니다.
+    """
+    if not idempotency_key:
+        return _dispatch_webhook(business_id, business_type, store_id, sync_type, data)
+    from app.services.idempotency_service import claim
+    with transaction():
+        if not claim(business_id, sync_type, idempotency_key):
+            print(f"  ⏭️ 중복 Webhook 무시: type={sync_type}, biz={business_id}")
+            return {"processed": 0, "skipped": len(data.get("items", [])),
+                    "errors": [], "duplicate": True}
+        result = _dispatch_webhook(business_id, business_type, store_id, sync_type, data)
+        if result.get("errors"):
+            print(f"  ↩️ Webhook 오류 {len(result['errors'])}건 - 키 선점 취소 후 롤백: type={sync_type}")
+            raise WebhookFailed(result)
+        return result
+
+
+def _dispatch_webhook(business_id: int, business_type: str, store_id: int,
+                      sync_type: str, data: Dict) -> Dict:
+    if sync_type == "baekwon_sale":
+        return handle_baekwon_sale(business_id, business_type, store_id, data)
+    if sync_type == "baekwon_sale_batch":
+        return handle_baekwon_sale_batch(business_id, business_type, store_id, data)
+    if sync_type == "baekwon_products":
+        return handle_baekwon_products(business_id, data)
+    items = data.get("items", [])
+    if sync_type == "sale":
+        result = handle_sale(business_id, business_type, store_id, items)
+    elif sync_type == "stock_in":
+        result = handle_stock_in(business_id, store_id, items)
+    elif sync_type == "loss":
+        result = handle_loss(business_id, store_id, items)
+    elif sync_type == "product_sync":
+        result = handle_product_sync(business_id, items)
+    elif sync_type == "store_sync":
+        result = handle_store_sync(business_id, items)
+    elif sync_type == "employee_sync":
+        result = handle_employee_sync(business_id, items)
+    elif sync_type == "stock_restore":
+        result = handle_stock_restore(business_id, store_id, items)
+    else:
+        raise ValueError(f"Unknown type: {sync_type}")
+    # 동기화 상세 로그 기록 (다중 행 INSERT 한 번) — 라인별 상태가 있으면 그대로 사용
+    status = "success" if result["processed"] > 0 else "skipped"
+    line_status = result.get("line_status") or [(status, "")] * len(items)
+    log_sync_details(business_id, [
+        {"pos_table": f"webhook_{sync_type}",
+         "pos_record_id": int(item.get("pos_record_id", 0) or 0),
+         "sync_type": sync_type,
+         "menu_code": item.get("menu_code") or item.get("mcode") or item.get("employee_id") or "",
+         "quantity": float(item.get("quantity", 0) or 0),
+         "status": item_status, "error_message": error_message}
+        for item, (item_status, error_message) in zip(items, line_status)
+    ])
+    return result
+
+
 def handle_sale(business_id: int, business_type: str, store_id: int,
                 items: List[Dict], user_id: Optional[int] = None) -> Dict:
-    """POS 판매 처리 — 업종별 자동 분기."""
-    from app.controllers.inventory_controller import process_stock_out
-    from app.controllers.recipe_controller import deduct_by_recipe
+    """POS 판매 처리 — 업종별 자동 분기 (전체 품목을 한 번에 일괄 차감).
+
+    result["line_status"]에 items 순서대로 (상태, 오류 메시지)를 담아 반환합니다.
+    """
     result = {"processed": 0, "skipped": 0, "errors": []}
+    lines = []
+    item_lines: List[Optional[Dict]] = []
     for item in items:
         menu_code = str(item.get("menu_code", "")).strip()
         quantity = float(item.get("quantity", 0))
@@ -52,137 +163,206 @@ def handle_sale(business_id: int, business_type: str, store_id: int,
                 lot_id = None
         if not menu_code or quantity <= 0:
             result["skipped"] += 1
+            item_lines.append(None)
             continue
-        try:
-            if business_type == "restaurant":
-                _handle_restaurant_sale(
-                    business_id, store_id, menu_code, quantity, user_id,
-                    deduct_by_recipe, result,
-                )
-            else:
-                _handle_mart_sale(
-                    business_id, store_id, menu_code, quantity, user_id,
-                    process_stock_out, result, lot_id=lot_id,
-                )
-        except Exception as e:
-            result["errors"].append(f"{menu_code}: {str(e)}")
+        line = {"menu_code": menu_code, "quantity": quantity, "lot_id": lot_id}
+        lines.append(line)
+        item_lines.append(line)
+    with transaction():
+        _apply_sale_lines(business_id, business_type, store_id, lines, user_id, result)
+    result["line_status"] = [
+        (line.get("status", "skipped"), line.get("error", "")) if line else ("skipped", "")
+        for line in item_lines
+    ]
     return result
 
 
-def _handle_restaurant_sale(business_id: int, store_id: int,
-                            menu_code: str, quantity: float,
-                            user_id: Optional[int],
-                            deduct_by_recipe, result: Dict) -> None:
-    """식당: 레시피 기반 원재료 차감."""
-    product = find_product_by_mcode(business_id, menu_code)
-    recipe = None
-    if product:
-        recipe = fetch_one(
-            "SELECT r.id, r.name FROM stk_recipes r "
-            "WHERE r.business_id = %s AND r.is_active = 1 "
-            "AND (r.pos_menu_id = %s OR r.name = %s)",
-            (business_id, product["id"], product["name"]),
-        )
-    if recipe:
-        deduct_by_recipe(recipe["id"], quantity, store_id, user_id)
-        result["processed"] += 1
-        print(f"  🍳 레시피 차감: {recipe['name']} x{quantity}")
+def _apply_sale_lines(business_id: int, business_type: str, store_id: int,
+                      lines: List[Dict], user_id: Optional[int], result: Dict) -> None:
+    """판매 라인의 mcode를 한 번에 해석하고 업종별로 일괄 차감합니다.
+
+    lines: [{"menu_code", "quantity", "lot_id"(선택)}] — 유효성 검사를 마친 라인
+    처리 후 각 라인에 "status"(success/skipped/error)를 기록합니다.
+    """
+    if not lines:
+        return
+    products = catalog_cache_service.get_products_by_codes(
+        business_id, {line["menu_code"] for line in lines},
+    )
+    if business_type == "restaurant":
+        _deduct_restaurant_sales(business_id, store_id, lines, products, user_id, result)
     else:
-        result["skipped"] += 1
-        print(f"  ⚠️ 레시피 없음 (mcode={menu_code}) - 건너뜀")
+        _deduct_mart_sales(store_id, lines, products, user_id, result)
 
 
-def _handle_mart_sale(business_id: int, store_id: int,
-                      menu_code: str, quantity: float,
-                      user_id: Optional[int],
-                      process_stock_out, result: Dict,
-                      lot_id: Optional[int] = None) -> None:
-    """마트: mcode로 상품 직접 차감. lot_id가 있으면 해당 로트에서 지정 차감."""
-    product = find_product_by_mcode(business_id, menu_code)
-    if not product:
-        result["skipped"] += 1
-        print(f"  ⚠️ 상품 없음 (mcode={menu_code}) - 건너뜀")
+def _deduct_restaurant_sales(business_id: int, store_id: int, lines: List[Dict],
+                             products: Dict[str, Dict], user_id: Optional[int],
+                             result: Dict) -> None:
+    """식당: 레시피별 판매 수량을 합산해 원재료 수요로 펼친 뒤 한 번에 차감."""
+    demand: Dict[int, Dict] = {}
+    for line in lines:
+        product = products.get(line["menu_code"])
+        recipe = catalog_cache_service.get_recipe_for_product(business_id, product) if product else None
+        if not recipe:
+            result["skipped"] += 1
+            line["status"] = "skipped"
+            print(f"  ⚠️ 레시피 없음 (mcode={line['menu_code']}) - 건너뜀")
+            continue
+        entry = demand.setdefault(recipe["id"], {"recipe": recipe, "quantity": 0.0, "lines": []})
+        entry["quantity"] += line["quantity"]
+        entry["lines"].append(line)
+    stock_lines = [
+        {"product_id": ingredient["product_id"],
+         "quantity": float(ingredient["quantity"]) * entry["quantity"],
+         "location": "kitchen",
+         "reason": f"Recipe: {entry['recipe']['name']} x{entry['quantity']}"}
+        for entry in demand.values()
+        for ingredient in entry["recipe"]["ingredients"]
+    ]
+    sale_lines = [line for entry in demand.values() for line in entry["lines"]]
+    if not _deduct_batch(stock_lines, sale_lines, store_id, user_id, result):
         return
-    if lot_id:
-        from app.controllers.inventory_controller import process_lot_stock_out
-        process_lot_stock_out(
-            lot_deductions=[{"inventory_id": lot_id, "quantity": quantity}],
-            store_id=store_id,
-            reason=f"POS Sale (mcode={menu_code}, lot={lot_id})",
-            user_id=user_id,
-        )
-        result["processed"] += 1
-        print(f"  🛒 로트 지정 차감: {product['name']} x{quantity} (lot_id={lot_id})")
-    else:
-        process_stock_out(
-            product_id=product["id"], store_id=store_id,
-            quantity=quantity, reason=f"POS Sale (mcode={menu_code})",
-            user_id=user_id,
-        )
-        result["processed"] += 1
-        print(f"  🛒 FEFO 자동 차감: {product['name']} x{quantity}")
+    for entry in demand.values():
+        result["processed"] += len(entry["lines"])
+        for line in entry["lines"]:
+            line["status"] = "success"
+        print(f"  🍳 레시피 차감: {entry['recipe']['name']} x{entry['quantity']}")
 
 
-def handle_stock_in(business_id: int, store_id: int,
-                    items: List[Dict], user_id: Optional[int] = None) -> Dict:
-    """POS 입고 처리 → Hana StockMaster 재고 증가."""
-    from app.controllers.inventory_controller import process_stock_in
-    result = {"processed": 0, "skipped": 0, "errors": []}
-    for item in items:
-        menu_code = str(item.get("menu_code", "")).strip()
-        quantity = float(item.get("quantity", 0))
-        if not menu_code or quantity <= 0:
+def _deduct_mart_sales(store_id: int, lines: List[Dict], products: Dict[str, Dict],
+                       user_id: Optional[int], result: Dict) -> None:
+    """마트: mcode별 수량을 합산해 FEFO 일괄 차감. lot_id가 있는 라인은 해당 로트에서 지정 차감."""
+    from app.controllers.inventory_controller import process_lot_stock_out
+    demand: Dict[str, Dict] = {}
+    for line in lines:
+        product = products.get(line["menu_code"])
+        if not product:
             result["skipped"] += 1
+            line["status"] = "skipped"
+            print(f"  ⚠️ 상품 없음 (mcode={line['menu_code']}) - 건너뜀")
             continue
-        try:
-            product = find_product_by_mcode(business_id, menu_code)
-            if product:
-                unit_price = float(item.get("unit_cost", 0))
-                process_stock_in(
-                    product_id=product["id"], store_id=store_id,
-                    quantity=quantity, location="warehouse",
-                    unit_price=unit_price,
-                    reason=f"POS Stock In (mcode={menu_code})",
+        if line["lot_id"]:
+            try:
+                process_lot_stock_out(
+                    lot_deductions=[{"inventory_id": line["lot_id"], "quantity": line["quantity"]}],
+                    store_id=store_id,
+                    reason=f"POS Sale (mcode={line['menu_code']}, lot={line['lot_id']})",
                     user_id=user_id,
                 )
-                result["processed"] += 1
-                print(f"  📦 입고 반영: {product['name']} +{quantity}")
-            else:
+            except Exception as e:
+                result["errors"].append(f"{line['menu_code']}: {str(e)}")
+                line["status"] = "error"
+                line["error"] = str(e)
+                continue
+            result["processed"] += 1
+            line["status"] = "success"
+            print(f"  🛒 로트 지정 차감: {product['name']} x{line['quantity']} (lot_id={line['lot_id']})")
+            continue
+        entry = demand.setdefault(line["menu_code"], {"product": product, "quantity": 0.0, "lines": []})
+        entry["quantity"] += line["quantity"]
+        entry["lines"].append(line)
+    stock_lines = [
+        {"product_id": entry["product"]["id"], "quantity": entry["quantity"],
+         "reason": f"POS Sale (mcode={menu_code})"}
+        for menu_code, entry in demand.items()
+    ]
+    sale_lines = [line for entry in demand.values() for line in entry["lines"]]
+    if not _deduct_batch(stock_lines, sale_lines, store_id, user_id, result):
+        return
+    for entry in demand.values():
+        result["processed"] += len(entry["lines"])
+        for line in entry["lines"]:
+            line["status"] = "success"
+        print(f"  🛒 FEFO 자동 차감: {entry['product']['name']} x{entry['quantity']}")
+
+
+def _deduct_batch(stock_lines: List[Dict], sale_lines: List[Dict], store_id: int,
+                  user_id: Optional[int], result: Dict) -> bool:
+    """일괄 출고를 실행합니다. 실패하면 해당 판매 라인 모두를 오류로 기록하고 False."""
+    if not stock_lines:
+        return True
+    from app.controllers.inventory_controller import process_stock_out_batch
+    try:
+        process_stock_out_batch(stock_lines, store_id=store_id, user_id=user_id)
+    except Exception as e:
+        for line in sale_lines:
+            result["errors"].append(f"{line['menu_code']}: {str(e)}")
+            line["status"] = "error"
+            line["error"] = str(e)
+        return False
+    return True
+
+
+def handle_stock_in(business_id: int, store_id: int,
+                    items: List[Dict], user_id: Optional[int] = None) -> Dict:
+    """POS 입고 처리 → Hana StockMaster 재고 증가 (line_status는 handle_sale과 같음)."""
+    from app.controllers.inventory_controller import process_stock_in
+    result = {"processed": 0, "skipped": 0, "errors": [], "line_status": []}
+    with transaction():
+        for item in items:
+            menu_code = str(item.get("menu_code", "")).strip()
+            quantity = float(item.get("quantity", 0))
+            if not menu_code or quantity <= 0:
                 result["skipped"] += 1
-                print(f"  ⚠️ 상품 없음 (mcode={menu_code}) - 건너뜀")
-        except Exception as e:
-            result["errors"].append(f"{menu_code}: {str(e)}")
+                result["line_status"].append(("skipped", ""))
+                continue
+            try:
+                product = find_product_by_mcode(business_id, menu_code)
+                if product:
+                    unit_price = float(item.get("unit_cost", 0))
+                    process_stock_in(
+                        product_id=product["id"], store_id=store_id,
+                        quantity=quantity, location="warehouse",
+                        unit_price=unit_price,
+                        reason=f"POS Stock In (mcode={menu_code})",
+                        user_id=user_id,
+                    )
+                    result["processed"] += 1
+                    result["line_status"].append(("success", ""))
+                    print(f"  📦 입고 반영: {product['name']} +{quantity}")
+                else:
+                    result["skipped"] += 1
+                    result["line_status"].append(("skipped", ""))
+                    print(f"  ⚠️ 상품 없음 (mcode={menu_code}) - 건너뜀")
+            except Exception as e:
+                result["errors"].append(f"{menu_code}: {str(e)}")
+                result["line_status"].append(("error", str(e)))
     return result
 
 
 def handle_loss(business_id: int, store_id: int,
                 items: List[Dict], user_id: Optional[int] = None) -> Dict:
-    """POS Loss/폐기 처리 → Hana StockMaster 재고 차감 (FEFO 자동)."""
+    """POS Loss/폐기 처리 → Hana StockMaster 재고 차감 (FEFO 자동, line_status는 handle_sale과 같음)."""
     from app.controllers.inventory_controller import process_stock_out
-    result = {"processed": 0, "skipped": 0, "errors": []}
-    for item in items:
-        menu_code = str(item.get("menu_code", "")).strip()
-        quantity = float(item.get("quantity", 0))
-        if not menu_code or quantity <= 0:
-            result["skipped"] += 1
-            continue
-        try:
-            product = find_product_by_mcode(business_id, menu_code)
-            if product:
-                reason = item.get("reason", "POS Loss")
-                process_stock_out(
-                    product_id=product["id"], store_id=store_id,
-                    quantity=quantity,
-                    reason=f"POS Loss: {reason} (mcode={menu_code})",
-                    user_id=user_id,
-                )
-                result["processed"] += 1
-                print(f"  🗑️ Loss 반영: {product['name']} -{quantity}")
-            else:
+    result = {"processed": 0, "skipped": 0, "errors": [], "line_status": []}
+    with transaction():
+        for item in items:
+            menu_code = str(item.get("menu_code", "")).strip()
+            quantity = float(item.get("quantity", 0))
+            if not menu_code or quantity <= 0:
                 result["skipped"] += 1
-                print(f"  ⚠️ 상품 없음 (mcode={menu_code}) - 건너뜀")
-        except Exception as e:
-            result["errors"].append(f"{menu_code}: {str(e)}")
+                result["line_status"].append(("skipped", ""))
+                continue
+            try:
+                product = find_product_by_mcode(business_id, menu_code)
+                if product:
+                    reason = item.get("reason", "POS Loss")
+                    process_stock_out(
+                        product_id=product["id"], store_id=store_id,
+                        quantity=quantity,
+                        reason=f"POS Loss: {reason} (mcode={menu_code})",
+                        user_id=user_id,
+                    )
+                    result["processed"] += 1
+                    result["line_status"].append(("success", ""))
+                    print(f"  🗑️ Loss 반영: {product['name']} -{quantity}")
+                else:
+                    result["skipped"] += 1
+                    result["line_status"].append(("skipped", ""))
+                    print(f"  ⚠️ 상품 없음 (mcode={menu_code}) - 건너뜀")
+            except Exception as e:
+                result["errors"].append(f"{menu_code}: {str(e)}")
+                result["line_status"].append(("error", str(e)))
     return result
 
 
@@ -191,27 +371,37 @@ def handle_stock_restore(business_id: int, store_id: int,
     """POS Void/Refund 시 재고 복원. lot_id가 있으면 해당 로트에 입고, 없으면 일반 입고."""
     from app.controllers.inventory_controller import process_stock_in, _upsert_inventory, _sync_to_pos
     result = {"processed": 0, "skipped": 0, "errors": []}
-    for item in items:
-        menu_code = str(item.get("menu_code", "")).strip()
-        quantity = float(item.get("quantity", 0))
-        lot_id = item.get("lot_id")
-        if not menu_code or quantity <= 0:
-            result["skipped"] += 1
-            continue
-        try:
-            product = find_product_by_mcode(business_id, menu_code)
-            if not product:
+    with transaction():
+        for item in items:
+            menu_code = str(item.get("menu_code", "")).strip()
+            quantity = float(item.get("quantity", 0))
+            lot_id = item.get("lot_id")
+            if not menu_code or quantity <= 0:
                 result["skipped"] += 1
-                print(f"  ⚠️ 복원 스킵 - 상품 없음 (mcode={menu_code})")
                 continue
-            if lot_id:
-                from app.db import fetch_one as _fone, execute as _exec
-                lot = _fone("SELECT id, product_id FROM stk_inventory WHERE id = %s", (lot_id,))
-                if lot:
-                    _exec("UPDATE stk_inventory SET quantity = quantity + %s WHERE id = %s", (quantity, lot_id))
-                    _sync_to_pos(product["id"], store_id)
-                    result["processed"] += 1
-                    print(f"  ♻️ 로트 복원: {product['name']} +{quantity} (lot_id={lot_id})")
+            try:
+                product = find_product_by_mcode(business_id, menu_code)
+                if not product:
+                    result["skipped"] += 1
+                    print(f"  ⚠️ 복원 스킵 - 상품 없음 (mcode={menu_code})")
+                    continue
+                if lot_id:
+                    lot = fetch_one("SELECT id, product_id FROM stk_inventory WHERE id = %s", (lot_id,))
+                    if lot:
+                        execute("UPDATE stk_inventory SET quantity = quantity + %s WHERE id = %s", (quantity, lot_id))
+                        inventory_totals_service.apply_lot_deltas([(lot_id, quantity)])
+                        _sync_to_pos(product["id"], store_id)
+                        result["processed"] += 1
+                        print(f"  ♻️ 로트 복원: {product['name']} +{quantity} (lot_id={lot_id})")
+                    else:
+                        process_stock_in(
+                            product_id=product["id"], store_id=store_id,
+                            quantity=quantity, location="warehouse",
+                            reason=f"POS Restore (mcode={menu_code})",
+                            user_id=user_id,
+                        )
+                        result["processed"] += 1
+                        print(f"  ♻️ 일반 복원 (로트 미발견): {product['name']} +{quantity}")
                 else:
                     process_stock_in(
                         product_id=product["id"], store_id=store_id,
@@ -220,18 +410,9 @@ def handle_stock_restore(business_id: int, store_id: int,
                         user_id=user_id,
                     )
                     result["processed"] += 1
-                    print(f"  ♻️ 일반 복원 (로트 미발견): {product['name']} +{quantity}")
-            else:
-                process_stock_in(
-                    product_id=product["id"], store_id=store_id,
-                    quantity=quantity, location="warehouse",
-                    reason=f"POS Restore (mcode={menu_code})",
-                    user_id=user_id,
-                )
-                result["processed"] += 1
-                print(f"  ♻️ 일반 복원: {product['name']} +{quantity}")
-        except Exception as e:
-            result["errors"].append(f"{menu_code}: {str(e)}")
+                    print(f"  ♻️ 일반 복원: {product['name']} +{quantity}")
+            except Exception as e:
+                result["errors"].append(f"{menu_code}: {str(e)}")
     return result
 
 
@@ -278,6 +459,8 @@ def handle_product_sync(business_id: int, items: List[Dict]) -> Dict:
             result["created"] += 1
             print(f"  상품 생성: {mcode} - {mname}")
         result["processed"] += 1
+    if result["processed"]:
+        catalog_cache_service.invalidate_products(business_id)
     return result
 
 
@@ -396,6 +579,33 @@ def log_sync_detail(business_id: int, pos_table: str, pos_record_id: int,
         "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
         (business_id, pos_table, pos_record_id, sync_type, menu_code, quantity, status, error_message),
     )
+    dashboard_cache_service.invalidate_business(business_id, "sync")
+
+
+def log_sync_details(business_id: int, rows: List[Dict]) -> None:
+    """동기화 상세 로그 여러 건을 다중 행 INSERT로 기록합니다.
+
+    rows: [{"pos_table", "pos_record_id", "sync_type", "menu_code", "quantity",
+            "status"(선택), "error_message"(선택)}]
+    """
+    execute_many(
+        "INSERT INTO stk_pos_sync_detail "
+        "(business_id, pos_table, pos_record_id, sync_type, menu_code, quantity, status, error_message) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        [(business_id, r["pos_table"], r["pos_record_id"], r["sync_type"], r["menu_code"],
+          r["quantity"], r.get("status", "success"), r.get("error_message", "")) for r in rows],
+    )
+    dashboard_cache_service.invalidate_business(business_id, "sync")
+
+
+def load_sync_checkpoint(business_id: int, pos_table: str) -> int:
+    """마지막으로 동기화한 POS 레코드 ID를 조회합니다 (없으면 0)."""
+    checkpoint = fetch_one(
+        "SELECT pos_last_id FROM stk_pos_sync_log "
+        "WHERE business_id = %s AND pos_table = %s",
+        (business_id, pos_table),
+    )
+    return checkpoint["pos_last_id"] if checkpoint else 0
 
 
 def update_sync_checkpoint(business_id: int, pos_table: str,
@@ -417,16 +627,17 @@ def update_sync_checkpoint(business_id: int, pos_table: str,
             "VALUES (%s, %s, %s, %s)",
             (business_id, pos_table, pos_last_id, record_count),
         )
+    dashboard_cache_service.invalidate_business(business_id, "sync")
 
 
-def sync_categories_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
-    """POS menuclass → stk_categories 동기화 (신규 추가, 이름 변경 반영)."""
-    import config
-    db_name = pos_db_name or config.POS_DB_NAME
-    pos_classes = execute_pos_db(
-        "SELECT id, classcode, classname FROM menuclass ORDER BY id",
-        db_name=db_name,
-    )
+def sync_categories_from_pos(business_id: int, pos_db_name: str = "",
+                             pos_classes: Optional[List[Dict]] = None) -> Dict:
+    """POS menuclass → stk_categories 동기화 (신규 추가, 이름 변경 반영).
+
+    pos_classes를 넘기면 POS 조회 없이 미리 읽어 둔 행을 사용합니다.
+    """
+    if pos_classes is None:
+        pos_classes = fetch_pos_classes(pos_db_name)
     existing = fetch_all(
         "SELECT id, name FROM stk_categories WHERE business_id = %s",
         (business_id,),
@@ -454,163 +665,412 @@ def sync_categories_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
     return {"created": created, "updated": updated, "total_pos": len(pos_classes)}
 
 
-def sync_products_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
-    """POS menulist → stk_products 동기화 (신규 추가, 가격 변경 반영)."""
+def sync_products_from_pos(business_id: int, pos_db_name: str = "",
+                           pos_items: Optional[List[Dict]] = None,
+                           full: bool = False,
+                           fingerprint: Optional[Dict] = None) -> Dict:
+    """POS menulist → stk_products 동기화 (신규 추가, 가격 변경 반영).
+
+    기본은 증분 모드입니다. menulist 전체의 지문(행 수 + CRC 합)이
+    stk_pos_product_fingerprint에 저장된 지난번 값과 같으면 바로 끝내고, 다르면
+    행별 해시를 stk_pos_product_hashes와 비교해 바뀐 행만 읽어 다중 행 upsert로 반영합니다.
+    반영에 실패한 행은 해시와 지문을 저장하지 않아 다음 동기화에서 다시 시도합니다.
+    full=True이거나 pos_items를 넘기면 전체 행을 비교합니다.
+    fingerprint는 미리 조회한 fetch_pos_products_fingerprint() 결과입니다.
+    """
     import config
     db_name = pos_db_name or config.POS_DB_NAME
-    pos_items = execute_pos_db(
-        "SELECT id, mcode, mname, mprice1, barcode, cost_price FROM menulist ORDER BY mname",
-        db_name=db_name,
-    )
-    existing = fetch_all(
-        "SELECT id, code, name, sell_price, unit_price FROM stk_products "
-        "WHERE business_id = %s AND is_active = 1",
-        (business_id,),
-    )
-    existing_by_code = {p["code"]: p for p in existing}
-    categories = fetch_all(
-        "SELECT id, name FROM stk_categories WHERE business_id = %s",
-        (business_id,),
-    )
-    cat_by_name = {c["name"]: c["id"] for c in categories}
-    # POS menuclass 매핑 (mprn → classname)
-    pos_classes = execute_pos_db(
-        "SELECT id, classcode, classname FROM menuclass ORDER BY id",
-        db_name=db_name,
-    )
-    created = 0
-    updated = 0
-    skipped = 0
+    if fingerprint is None:
+        fingerprint = fetch_pos_products_fingerprint(db_name)
+    if pos_items is None and not full:
+        stored = fetch_one(
+            "SELECT row_count, fingerprint FROM stk_pos_product_fingerprint WHERE business_id = %s",
+            (business_id,),
+        )
+        if (stored and stored["fingerprint"] == fingerprint["fp"]
+                and stored["row_count"] == fingerprint["cnt"]):
+            print(f"📡 상품 동기화: 변경 없음 (POS 전체 {fingerprint['cnt']}건)")
+            return {"created": 0, "updated": 0, "skipped": 0, "total_pos": fingerprint["cnt"]}
+        pos_hashes = fetch_pos_product_hashes(db_name)
+        known = {
+            row["pos_id"]: row["row_hash"]
+            for row in fetch_all(
+                "SELECT pos_id, row_hash FROM stk_pos_product_hashes WHERE business_id = %s",
+                (business_id,),
+            )
+        }
+        changed_ids = [pos_id for pos_id, row_hash in pos_hashes.items() if known.get(pos_id) != row_hash]
+        removed_ids = [pos_id for pos_id in known if pos_id not in pos_hashes]
+        pos_items = fetch_pos_products_by_ids(db_name, changed_ids)
+    else:
+        if pos_items is None:
+            pos_items = fetch_pos_products(db_name)
+        pos_hashes = fetch_pos_product_hashes(db_name)
+        removed_ids = None
+    with transaction():
+        result = _upsert_pos_products(business_id, pos_items)
+        failed_ids = result.pop("failed_ids")
+        _store_pos_product_hashes(
+            business_id, [item for item in pos_items if item["id"] not in failed_ids],
+            pos_hashes, removed_ids,
+        )
+        if not failed_ids:
+            _store_pos_product_fingerprint(business_id, fingerprint)
+    if result["created"] or result["updated"]:
+        catalog_cache_service.invalidate_products(business_id)
+    print(f"📡 상품 동기화: 신규 {result['created']}건, 변경 {result['updated']}건, "
+          f"스킵 {result['skipped']}건, 오류 {result['errors']}건, "
+          f"비교 {len(pos_items)}건, POS 전체 {fingerprint['cnt']}건")
+    result["total_pos"] = fingerprint["cnt"]
+    return result
+
+
+def _upsert_pos_products(business_id: int, pos_items: List[Dict]) -> Dict:
+    """menulist 행을 stk_products에 다중 행 INSERT ... ON DUPLICATE KEY UPDATE로 반영합니다.
+
+    기존 상품은 판매가/원가가 바뀐 경우에만 갱신합니다. 다중 행 upsert가 실패하면
+    행별 upsert로 다시 반영하고, 실패한 행의 menulist.id를 failed_ids로 돌려줍니다.
+    """
+    result = {"created": 0, "updated": 0, "skipped": 0, "errors": 0, "failed_ids": set()}
+    candidates = {}
     for item in pos_items:
         mname = (item.get("mname") or "").strip()
         if not mname:
-            skipped += 1
+            result["skipped"] += 1
             continue
         mcode = (item["mcode"] or "").strip() if item.get("mcode") else f"{item['id']:04d}"
-        sell_price = float(item.get("mprice1") or 0)
-        cost_price = float(item.get("cost_price") or 0)
-        barcode = (item.get("barcode") or "").strip()
-        if mcode in existing_by_code:
-            # 기존 상품 — 가격 변경 확인
-            ex = existing_by_code[mcode]
-            is_price_changed = (
-                abs(float(ex["sell_price"] or 0) - sell_price) > 0.001 or
-                abs(float(ex["unit_price"] or 0) - cost_price) > 0.001
-            )
-            if is_price_changed:
-                execute(
-                    "UPDATE stk_products SET sell_price = %s, unit_price = %s WHERE id = %s",
-                    (sell_price, cost_price, ex["id"]),
-                )
-                updated += 1
-                print(f"  🔄 가격 변경: {mname} (sell:{sell_price}, cost:{cost_price})")
+        candidates[mcode] = {
+            "pos_id": item["id"], "name": mname, "barcode": (item.get("barcode") or "").strip(),
+            "sell_price": float(item.get("mprice1") or 0),
+            "cost_price": float(item.get("cost_price") or 0),
+        }
+    existing = {}
+    codes = list(candidates)
+    for start in range(0, len(codes), BATCH_SIZE):
+        chunk = codes[start:start + BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        for row in fetch_all(
+            f"SELECT code, sell_price, unit_price FROM stk_products "
+            f"WHERE business_id = %s AND code IN ({placeholders})",
+            (business_id, *chunk),
+        ):
+            existing[row["code"]] = row
+    rows = []  # (상품 행, 결과 칸, menulist.id)
+    for mcode, item in candidates.items():
+        ex = existing.get(mcode)
+        if ex is None:
+            outcome = "created"
+        elif (abs(float(ex["sell_price"] or 0) - item["sell_price"]) > 0.001 or
+              abs(float(ex["unit_price"] or 0) - item["cost_price"]) > 0.001):
+            outcome = "updated"
         else:
-            # 신규 상품
-            cat_id = None
-            try:
-                insert(
-                    "INSERT INTO stk_products "
-                    "(business_id, category_id, code, barcode, name, unit, unit_price, sell_price, min_stock) "
-                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
-                    (business_id, cat_id, mcode, barcode, mname, "ea", cost_price, sell_price, 5),
-                )
-                created += 1
-                print(f"  ➕ 상품 추가: {mname} (code:{mcode})")
-            except Exception as e:
-                skipped += 1
-                print(f"  ⚠️ 상품 추가 실패: {mname} - {e}")
-    print(f"📡 상품 동기화: 신규 {created}건, 변경 {updated}건, 스킵 {skipped}건, POS 전체 {len(pos_items)}건")
-    return {"created": created, "updated": updated, "skipped": skipped, "total_pos": len(pos_items)}
+            continue
+        rows.append(((business_id, None, mcode, item["barcode"], item["name"], "ea",
+                      item["cost_price"], item["sell_price"], 5), outcome, item["pos_id"]))
+    sql = (
+        "INSERT INTO stk_products "
+        "(business_id, category_id, code, barcode, name, unit, unit_price, sell_price, min_stock) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE sell_price = VALUES(sell_price), unit_price = VALUES(unit_price)"
+    )
+    try:
+        with transaction():
+            execute_many(sql, [row for row, _, _ in rows])
+        for _, outcome, _ in rows:
+            result[outcome] += 1
+        return result
+    except Exception as e:
+        print(f"⚠️ 상품 일괄 반영 실패, 행별로 재시도: {e}")
+    for row, outcome, pos_id in rows:
+        try:
+            with transaction():
+                execute(sql, row)
+            result[outcome] += 1
+        except Exception as e:
+            result["errors"] += 1
+            result["failed_ids"].add(pos_id)
+            print(f"  ❌ 상품 반영 실패 ({row[2]}): {e}")
+    return result
+
+
+def _store_pos_product_hashes(business_id: int, pos_items: List[Dict],
+                              pos_hashes: Dict[int, str],
+                              removed_ids: Optional[List[int]]) -> None:
+    """반영한 menulist 행의 해시를 저장합니다.
+
+    removed_ids가 None이면(전체 비교) 해시 테이블을 새로 채웁니다.
+    """
+    if removed_ids is None:
+        execute("DELETE FROM stk_pos_product_hashes WHERE business_id = %s", (business_id,))
+        removed_ids = []
+    execute_many(
+        "INSERT INTO stk_pos_product_hashes (business_id, pos_id, row_hash) "
+        "VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE row_hash = VALUES(row_hash)",
+        [(business_id, item["id"], pos_hashes[item["id"]])
+         for item in pos_items if item["id"] in pos_hashes],
+    )
+    for start in range(0, len(removed_ids), BATCH_SIZE):
+        chunk = removed_ids[start:start + BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        execute(
+            f"DELETE FROM stk_pos_product_hashes "
+            f"WHERE business_id = %s AND pos_id IN ({placeholders})",
+            (business_id, *chunk),
+        )
+
+
+def _store_pos_product_fingerprint(business_id: int, fingerprint: Dict) -> None:
+    """반영을 마친 menulist 전체 지문을 저장합니다."""
+    execute(
+        "INSERT INTO stk_pos_product_fingerprint (business_id, row_count, fingerprint) "
+        "VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE row_count = VALUES(row_count), fingerprint = VALUES(fingerprint), "
+        "synced_at = NOW()",
+        (business_id, fingerprint["cnt"], fingerprint["fp"]),
+    )
 
 
-def sync_master_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
+def sync_master_from_pos(business_id: int, pos_db_name: str = "",
+                         pos_classes: Optional[List[Dict]] = None,
+                         pos_items: Optional[List[Dict]] = None,
+                         fingerprint: Optional[Dict] = None) -> Dict:
     """카테고리 + 상품 마스터 데이터를 POS에서 동기화합니다."""
-    cat_result = sync_categories_from_pos(business_id, pos_db_name)
-    prod_result = sync_products_from_pos(business_id, pos_db_name)
+    cat_result = sync_categories_from_pos(business_id, pos_db_name, pos_classes)
+    prod_result = sync_products_from_pos(
+        business_id, pos_db_name, pos_items, fingerprint=fingerprint,
+    )
     return {"categories": cat_result, "products": prod_result}
 
 
 def sync_sales_from_pos(business_id: int, business_type: str,
-                        store_id: int, pos_db_name: str = "") -> Dict:
-    """POS DB에서 미동기화 판매 건을 폴링합니다."""
+                        store_id: int, pos_db_name: str = "",
+                        rows: Optional[List[Dict]] = None,
+                        progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """POS DB에서 미동기화 판매 건을 폴링합니다.
+
+    POS_SYNC_CHUNK_SIZE 행씩 서버 측 커서로 읽으며, 청크마다 재고 반영과
+    체크포인트 갱신을 한 트랜잭션으로 커밋합니다 (중단되면 마지막 청크부터 재개).
+    rows를 넘기면 미리 읽어 둔 첫 청크를 먼저 처리하고 이어서 스트리밍합니다.
+    """
     import config
     db_name = pos_db_name or config.POS_DB_NAME
-    checkpoint = fetch_one(
-        "SELECT pos_last_id FROM stk_pos_sync_log "
-        "WHERE business_id = %s AND pos_table = 'sale_items'",
-        (business_id,),
+    last_id = load_sync_checkpoint(business_id, "sale_items")
+    chunks = _iter_pos_chunks(
+        rows, last_id, config.POS_SYNC_CHUNK_SIZE,
+        lambda after: stream_pos_db(
+            "SELECT id, menu_code, quantity, unit_price, receipt_id "
+            "FROM sale_items WHERE id > %s ORDER BY id",
+            (after,), db_name=db_name, chunk_size=config.POS_SYNC_CHUNK_SIZE,
+        ),
     )
-    last_id = checkpoint["pos_last_id"] if checkpoint else 0
-    rows = execute_pos_db(
-        "SELECT id, menu_code, quantity, unit_price, receipt_id "
-        "FROM sale_items WHERE id > %s ORDER BY id",
-        (last_id,), db_name=db_name,
-    )
-    if not rows:
-        return {"synced": 0, "skipped": 0, "errors": []}
-    items = [{"menu_code": r["menu_code"], "quantity": float(r["quantity"])} for r in rows]
-    result = handle_sale(business_id, business_type, store_id, items)
-    max_id = max(r["id"] for r in rows)
-    for r in rows:
-        status = "success"
-        log_sync_detail(business_id, "sale_items", r["id"], "sale",
-                        r["menu_code"], float(r["quantity"]), status)
-    update_sync_checkpoint(business_id, "sale_items", max_id, len(rows))
-    print(f"📡 판매 폴링 동기화: {len(rows)}건 (last_id: {last_id} → {max_id})")
-    return {"synced": result["processed"], "skipped": result["skipped"],
-            "errors": result["errors"], "total": len(rows)}
+    totals = _start_progress(business_id, "sale_items", last_id)
+    for chunk in chunks:
+        result = _apply_sales_chunk(business_id, business_type, store_id, db_name, chunk,
+                                    totals["recorded"], totals["held_at"])
+        _advance_progress(totals, chunk, result, progress)
+    return _finish_progress(business_id, "sale_items", totals, "판매")
+
+
+def _apply_sales_chunk(business_id: int, business_type: str, store_id: int,
+                       db_name: str, rows: List[Dict], recorded: int = 0,
+                       held_at: Optional[int] = None) -> Dict:
+    """판매 청크 하나를 반영하고 체크포인트를 청크 끝으로 옮깁니다 (한 트랜잭션).
+
+    recorded는 이번 실행에서 앞 청크까지 반영한 건수로, 체크포인트의 record_count에 누적합니다.
+    오류가 난 행은 error로 기록하고 키를 풀며, 체크포인트는 그 앞에 멈춰(held_at) 다음
+    폴링에서 다시 읽습니다. 이미 반영된 뒤 행은 키로 걸러집니다.
+    """
+    from app.services.idempotency_service import claim_many, make_key
+    with transaction():
+        # 동시에 실행된 폴링이 같은 체크포인트를 읽어도 행마다 한 번만 차감
+        keys = {r["id"]: make_key(f"poll:sale_items:{db_name}:{r['id']}") for r in rows}
+        claimed = claim_many(business_id, "poll_sale", keys.values())
+        new_rows = [r for r in rows if keys[r["id"]] in claimed]
+        items = [{"menu_code": r["menu_code"], "quantity": float(r["quantity"])} for r in new_rows]
+        result = handle_sale(business_id, business_type, store_id, items)
+        held_at, recorded_now = _finish_poll_chunk(
+            business_id, "sale_items", rows, new_rows, keys, result["line_status"],
+            lambda r: {"sync_type": "sale", "menu_code": r["menu_code"],
+                       "quantity": float(r["quantity"])},
+            recorded, held_at,
+        )
+    result["skipped"] += len(rows) - len(new_rows)
+    result["recorded"] = recorded_now
+    result["held_at"] = held_at
+    return result
 
 
 def sync_stock_transactions_from_pos(business_id: int, store_id: int,
-                                     pos_db_name: str = "") -> Dict:
-    """POS DB에서 미동기화 입고/Loss 건을 폴링합니다."""
-    import config
-    db_name = pos_db_name or config.POS_DB_NAME
-    checkpoint = fetch_one(
-        "SELECT pos_last_id FROM stk_pos_sync_log "
-        "WHERE business_id = %s AND pos_table = 'stock_transactions'",
-        (business_id,),
-    )
-    last_id = checkpoint["pos_last_id"] if checkpoint else 0
-    rows = execute_pos_db(
-        "SELECT id, transaction_type, menu_code, quantity, unit_cost, reason "
-        "FROM stock_transactions WHERE id > %s ORDER BY id",
-        (last_id,), db_name=db_name,
-    )
-    if not rows:
-        return {"synced": 0, "skipped": 0, "errors": []}
-    in_items = []
-    out_items = []
-    for r in rows:
-        item = {"menu_code": r["menu_code"], "quantity": abs(float(r["quantity"])),
-                "unit_cost": float(r["unit_cost"] or 0), "reason": r.get("reason", "")}
-        if r["transaction_type"] == "IN":
-            in_items.append(item)
-        elif r["transaction_type"] in ("OUT", "ADJUST"):
-            out_items.append(item)
-    result_in = handle_stock_in(business_id, store_id, in_items) if in_items else {"processed": 0, "skipped": 0, "errors": []}
-    result_out = handle_loss(business_id, store_id, out_items) if out_items else {"processed": 0, "skipped": 0, "errors": []}
-    max_id = max(r["id"] for r in rows)
-    for r in rows:
-        sync_type = "stock_in" if r["transaction_type"] == "IN" else "loss"
-        log_sync_detail(business_id, "stock_transactions", r["id"], sync_type,
-                        r["menu_code"], abs(float(r["quantity"])))
-    update_sync_checkpoint(business_id, "stock_transactions", max_id, len(rows))
-    total_processed = result_in["processed"] + result_out["processed"]
-    total_skipped = result_in["skipped"] + result_out["skipped"]
-    print(f"📡 재고거래 폴링 동기화: {len(rows)}건 (IN:{len(in_items)}, OUT:{len(out_items)})")
-    return {"synced": total_processed, "skipped": total_skipped,
-            "errors": result_in["errors"] + result_out["errors"], "total": len(rows)}
-
-
-def sync_stores_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
-    """POS store_info -> stk_stores 동기화 (신규 추가, 정보 업데이트)."""
+                                     pos_db_name: str = "",
+                                     rows: Optional[List[Dict]] = None,
+                                     progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """POS DB에서 미동기화 입고/Loss 건을 폴링합니다.
+
+    판매 폴링과 같이 청크 단위로 읽고 청크마다 커밋/체크포인트를 갱신합니다.
+    """
     import config
     db_name = pos_db_name or config.POS_DB_NAME
-    pos_stores = execute_pos_db(
-        "SELECT store_number, store_name, address, phone FROM store_info WHERE enabled = 1",
-        db_name=db_name,
+    last_id = load_sync_checkpoint(business_id, "stock_transactions")
+    chunks = _iter_pos_chunks(
+        rows, last_id, config.POS_SYNC_CHUNK_SIZE,
+        lambda after: stream_pos_db(
+            "SELECT id, transaction_type, menu_code, quantity, unit_cost, reason "
+            "FROM stock_transactions WHERE id > %s ORDER BY id",
+            (after,), db_name=db_name, chunk_size=config.POS_SYNC_CHUNK_SIZE,
+        ),
     )
+    totals = _start_progress(business_id, "stock_transactions", last_id)
+    for chunk in chunks:
+        result = _apply_stock_chunk(business_id, store_id, db_name, chunk, totals["recorded"],
+                                    totals["held_at"])
+        _advance_progress(totals, chunk, result, progress)
+    return _finish_progress(business_id, "stock_transactions", totals, "재고거래")
+
+
+def _apply_stock_chunk(business_id: int, store_id: int, db_name: str,
+                       rows: List[Dict], recorded: int = 0,
+                       held_at: Optional[int] = None) -> Dict:
+    """입고/Loss 청크 하나를 반영하고 체크포인트를 청크 끝으로 옮깁니다 (한 트랜잭션).
+
+    recorded와 held_at은 _apply_sales_chunk와 같습니다.
+    """
+    from app.services.idempotency_service import claim_many, make_key
+    empty = {"processed": 0, "skipped": 0, "errors": [], "line_status": []}
+    with transaction():
+        keys = {r["id"]: make_key(f"poll:stock_transactions:{db_name}:{r['id']}") for r in rows}
+        claimed = claim_many(business_id, "poll_stock", keys.values())
+        new_rows = [r for r in rows if keys[r["id"]] in claimed]
+        in_rows = [r for r in new_rows if r["transaction_type"] == "IN"]
+        out_rows = [r for r in new_rows if r["transaction_type"] in ("OUT", "ADJUST")]
+        other_rows = [r for r in new_rows if r["transaction_type"] not in ("IN", "OUT", "ADJUST")]
+        result_in = (handle_stock_in(business_id, store_id, [_stock_item(r) for r in in_rows])
+                     if in_rows else empty)
+        result_out = (handle_loss(business_id, store_id, [_stock_item(r) for r in out_rows])
+                      if out_rows else empty)
+        # new_rows 순서로 라인별 상태를 맞춘다 (다른 유형은 건너뜀)
+        status_by_id = {r["id"]: status for r, status in zip(in_rows, result_in["line_status"])}
+        status_by_id.update(zip((r["id"] for r in out_rows), result_out["line_status"]))
+        status_by_id.update((r["id"], ("skipped", "")) for r in other_rows)
+        held_at, recorded_now = _finish_poll_chunk(
+            business_id, "stock_transactions", rows, new_rows, keys,
+            [status_by_id[r["id"]] for r in new_rows],
+            lambda r: {"sync_type": "stock_in" if r["transaction_type"] == "IN" else "loss",
+                       "menu_code": r["menu_code"], "quantity": abs(float(r["quantity"]))},
+            recorded, held_at,
+        )
+    return {
+        "processed": result_in["processed"] + result_out["processed"],
+        "skipped": result_in["skipped"] + result_out["skipped"] + len(rows) - len(new_rows),
+        "errors": result_in["errors"] + result_out["errors"],
+        "recorded": recorded_now,
+        "held_at": held_at,
+    }
+
+
+def _stock_item(row: Dict) -> Dict:
+    return {"menu_code": row["menu_code"], "quantity": abs(float(row["quantity"])),
+            "unit_cost": float(row["unit_cost"] or 0), "reason": row.get("reason", "")}
+
+
+def _finish_poll_chunk(business_id: int, pos_table: str, rows: List[Dict],
+                       new_rows: List[Dict], keys: Dict[int, str],
+                       line_status: List[Tuple[str, str]],
+                       detail: Callable[[Dict], Dict], recorded: int,
+                       held_at: Optional[int]) -> Tuple[Optional[int], int]:
+    """폴링 청크의 상세 로그(라인별 상태)와 체크포인트를 기록합니다 (청크 트랜잭션 안에서 호출).
+
+    오류 행은 키를 풀고, 체크포인트는 첫 오류 행 앞(이미 멈춰 있으면 그 위치)에 둡니다.
+    반환: (멈춘 체크포인트 또는 None, 이번 청크에서 반영한 건수)
+    """
+    from app.services.idempotency_service import release_many
+    log_sync_details(business_id, [
+        {"pos_table": pos_table, "pos_record_id": r["id"], **detail(r),
+         "status": status, "error_message": error_message}
+        for r, (status, error_message) in zip(new_rows, line_status)
+    ])
+    failed = [r["id"] for r, (status, _) in zip(new_rows, line_status) if status == "error"]
+    if failed:
+        release_many(business_id, [keys[row_id] for row_id in failed])
+        if held_at is None:
+            held_at = min(failed) - 1
+        print(f"  ↩️ {pos_table} 오류 {len(failed)}건 - 키를 풀고 체크포인트를 id {held_at}에 멈춤")
+    recorded_now = len(new_rows) - len(failed)
+    checkpoint = held_at if held_at is not None else max(r["id"] for r in rows)
+    update_sync_checkpoint(business_id, pos_table, checkpoint, recorded + recorded_now)
+    return held_at, recorded_now
+
+
+# ── 폴링 청크/진행 상황 ──
+
+# 실행 중 진행 상황(청크 수, 누적 건수)은 이 프로세스 메모리에만 있다. 재시작하면 사라지고
+# 다른 워커 프로세스가 돌린 폴링은 보이지 않는다. 재개 지점(pos_last_id)과 실행별 누적
+# 반영 건수(record_count)는 청크마다 stk_pos_sync_log에 커밋된다.
+_sync_progress: Dict[Tuple[int, str], Dict] = {}
+
+
+def _iter_pos_chunks(prefetched: Optional[List[Dict]], last_id: int, chunk_size: int,
+                     stream_from: Callable[[int], Iterator[List[Dict]]]) -> Iterator[List[Dict]]:
+    """미리 읽은 행을 청크로 나눠 내보낸 뒤, 남은 행은 stream_from(마지막 ID)으로 이어 읽습니다."""
+    if prefetched is not None:
+        rows = [r for r in prefetched if r["id"] > last_id]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+        if len(prefetched) < chunk_size:
+            return  # LIMIT보다 적게 읽혔으면 남은 행 없음
+        last_id = max([last_id] + [r["id"] for r in prefetched])
+    yield from stream_from(last_id)
+
+
+def _start_progress(business_id: int, pos_table: str, last_id: int) -> Dict:
+    totals = {"synced": 0, "skipped": 0, "errors": [], "total": 0, "chunks": 0, "recorded": 0,
+              "held_at": None, "from_id": last_id, "last_id": last_id, "running": True}
+    _sync_progress[(business_id, pos_table)] = totals
+    return totals
+
+
+def _advance_progress(totals: Dict, rows: List[Dict], result: Dict,
+                      progress: Optional[Callable[[Dict], None]]) -> None:
+    totals["synced"] += result["processed"]
+    totals["skipped"] += result["skipped"]
+    totals["errors"].extend(result["errors"])
+    totals["total"] += len(rows)
+    totals["recorded"] += result["recorded"]
+    totals["held_at"] = result["held_at"]
+    totals["chunks"] += 1
+    totals["last_id"] = max(r["id"] for r in rows)
+    print(f"  📦 청크 {totals['chunks']}: {len(rows)}건 반영 (누적 {totals['total']}건, "
+          f"last_id → {totals['last_id']})")
+    if progress:
+        progress(dict(totals))
+
+
+def _finish_progress(business_id: int, pos_table: str, totals: Dict, label: str) -> Dict:
+    totals["running"] = False
+    if totals["total"]:
+        print(f"📡 {label} 폴링 동기화: {totals['total']}건, 청크 {totals['chunks']}개 "
+              f"(last_id: {totals['from_id']} → {totals['last_id']})")
+    return {"synced": totals["synced"], "skipped": totals["skipped"],
+            "errors": totals["errors"], "total": totals["total"]}
+
+
+def load_sync_progress(business_id: int) -> Dict[str, Dict]:
+    """진행 중이거나 마지막으로 끝난 폴링의 청크 진행 상황을 반환합니다 (이 프로세스에서 실행한 것만)."""
+    return {
+        pos_table: {k: v for k, v in totals.items() if k != "errors"}
+        for (biz_id, pos_table), totals in list(_sync_progress.items())
+        if biz_id == business_id
+    }
+
+
+def sync_stores_from_pos(business_id: int, pos_db_name: str = "",
+                         pos_stores: Optional[List[Dict]] = None) -> Dict:
+    """POS store_info -> stk_stores 동기화 (신규 추가, 정보 업데이트).
+
+    pos_stores를 넘기면 POS 조회 없이 미리 읽어 둔 행을 사용합니다.
+    """
+    if pos_stores is None:
+        pos_stores = fetch_pos_stores(pos_db_name)
     result = {"synced": 0, "created": 0, "updated": 0}
     for ps in pos_stores:
         store_number = ps["store_number"]
@@ -641,11 +1101,37 @@ def sync_stores_from_pos(business_id: int, pos_db_name: str = "") -> Dict:
 
 def run_full_sync(business_id: int, business_type: str,
                   store_id: int, pos_db_name: str = "") -> Dict:
-    """전체 폴링 동기화를 실행합니다 (마스터 + 거래)."""
-    store_result = sync_stores_from_pos(business_id, pos_db_name)
-    master_result = sync_master_from_pos(business_id, pos_db_name)
-    sales_result = sync_sales_from_pos(business_id, business_type, store_id, pos_db_name)
-    stock_result = sync_stock_transactions_from_pos(business_id, store_id, pos_db_name)
+    """전체 폴링 동기화를 실행합니다 (마스터 + 거래).
+
+    서로 독립적인 POS 조회(store_info, menuclass, menulist, sale_items,
+    stock_transactions)는 스레드 풀에서 동시에 읽고, 반영은 의존 순서
+    (매장 → 카테고리 → 상품 → 판매 → 입고/Loss)대로 현재 요청에서 수행합니다.
+    """
+    import config
+    from concurrent.futures import ThreadPoolExecutor
+    db_name = pos_db_name or config.POS_DB_NAME
+    # 체크포인트는 앱 컨텍스트가 필요하므로 조회 스레드를 띄우기 전에 읽는다
+    sales_last_id = load_sync_checkpoint(business_id, "sale_items")
+    stock_last_id = load_sync_checkpoint(business_id, "stock_transactions")
+    with ThreadPoolExecutor(max_workers=5, thread_name_prefix="pos-fetch") as pool:
+        stores_f = pool.submit(fetch_pos_stores, db_name)
+        classes_f = pool.submit(fetch_pos_classes, db_name)
+        fingerprint_f = pool.submit(fetch_pos_products_fingerprint, db_name)
+        # 거래는 첫 청크만 미리 읽고, 나머지는 각 단계에서 청크 단위로 이어 읽는다
+        sales_f = pool.submit(fetch_pos_sales, db_name, sales_last_id, config.POS_SYNC_CHUNK_SIZE)
+        stock_f = pool.submit(
+            fetch_pos_stock_transactions, db_name, stock_last_id, config.POS_SYNC_CHUNK_SIZE,
+        )
+    store_result = sync_stores_from_pos(business_id, db_name, stores_f.result())
+    master_result = sync_master_from_pos(
+        business_id, db_name, classes_f.result(), fingerprint=fingerprint_f.result(),
+    )
+    sales_result = sync_sales_from_pos(
+        business_id, business_type, store_id, db_name, sales_f.result(),
+    )
+    stock_result = sync_stock_transactions_from_pos(
+        business_id, store_id, db_name, stock_f.result(),
+    )
     return {
         "stores": store_result,
         "master": master_result,
@@ -654,6 +1140,96 @@ def run_full_sync(business_id: int, business_type: str,
     }
 
 
+# ── POS 조회 (앱 컨텍스트 불필요 — 조회 스레드에서 호출 가능) ──
+
+def fetch_pos_stores(pos_db_name: str = "") -> List[Dict]:
+    """POS store_info에서 사용 중인 매장을 조회합니다."""
+    import config
+    return execute_pos_db(
+        "SELECT store_number, store_name, address, phone FROM store_info WHERE enabled = 1",
+        db_name=pos_db_name or config.POS_DB_NAME,
+    )
+
+
+def fetch_pos_classes(pos_db_name: str = "") -> List[Dict]:
+    """POS menuclass(카테고리)를 조회합니다."""
+    import config
+    return execute_pos_db(
+        "SELECT id, classcode, classname FROM menuclass ORDER BY id",
+        db_name=pos_db_name or config.POS_DB_NAME,
+    )
+
+
+def fetch_pos_products(pos_db_name: str = "") -> List[Dict]:
+    """POS menulist(상품)를 조회합니다."""
+    import config
+    return execute_pos_db(
+        "SELECT id, mcode, mname, mprice1, barcode, cost_price FROM menulist ORDER BY mname",
+        db_name=pos_db_name or config.POS_DB_NAME,
+    )
+
+
+# menulist 행 해시 — 값 사이 구분자를 넣고 NULL은 빈 문자열로 맞춘다
+_POS_PRODUCT_HASH_SQL = (
+    "MD5(CONCAT_WS('|', COALESCE(mcode, ''), COALESCE(mname, ''), COALESCE(mprice1, ''), "
+    "COALESCE(barcode, ''), COALESCE(cost_price, '')))"
+)
+
+
+def fetch_pos_products_fingerprint(pos_db_name: str = "") -> Dict:
+    """menulist 전체 지문(행 수, 행 해시 CRC32의 XOR)을 조회합니다."""
+    import config
+    rows = execute_pos_db(
+        f"SELECT COUNT(*) AS cnt, "
+        f"COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', id, {_POS_PRODUCT_HASH_SQL}))), 0) & 0x7FFFFFFF AS fp "
+        f"FROM menulist",
+        db_name=pos_db_name or config.POS_DB_NAME,
+    )
+    return {"cnt": int(rows[0]["cnt"]), "fp": int(rows[0]["fp"])}
+
+
+def fetch_pos_product_hashes(pos_db_name: str = "") -> Dict[int, str]:
+    """menulist 행별 해시를 조회합니다 (id → md5)."""
+    import config
+    rows = execute_pos_db(
+        f"SELECT id, {_POS_PRODUCT_HASH_SQL} AS row_hash FROM menulist",
+        db_name=pos_db_name or config.POS_DB_NAME,
+    )
+    return {row["id"]: row["row_hash"] for row in rows}
+
+
+def fetch_pos_products_by_ids(pos_db_name: str, pos_ids: List[int]) -> List[Dict]:
+    """지정한 menulist 행을 조회합니다 (BATCH_SIZE씩 IN 조회)."""
+    items = []
+    for start in range(0, len(pos_ids), BATCH_SIZE):
+        chunk = pos_ids[start:start + BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        items.extend(execute_pos_db(
+            f"SELECT id, mcode, mname, mprice1, barcode, cost_price FROM menulist "
+            f"WHERE id IN ({placeholders})",
+            tuple(chunk), db_name=pos_db_name,
+        ))
+    return items
+
+
+def fetch_pos_sales(pos_db_name: str, last_id: int, limit: int) -> List[Dict]:
+    """POS sale_items에서 last_id 이후 판매 건을 최대 limit건 조회합니다."""
+    return execute_pos_db(
+        "SELECT id, menu_code, quantity, unit_price, receipt_id "
+        "FROM sale_items WHERE id > %s ORDER BY id LIMIT %s",
+        (last_id, limit), db_name=pos_db_name,
+    )
+
+
+def fetch_pos_stock_transactions(pos_db_name: str, last_id: int, limit: int) -> List[Dict]:
+    """POS stock_transactions에서 last_id 이후 입고/Loss 건을 최대 limit건 조회합니다."""
+    return execute_pos_db(
+        "SELECT id, transaction_type, menu_code, quantity, unit_cost, reason "
+        "FROM stock_transactions WHERE id > %s ORDER BY id LIMIT %s",
+        (last_id, limit), db_name=pos_db_name,
+    )
+
+
 def handle_baekwon_sale(business_id: int, business_type: str, store_id: int,
                         data: Dict) -> Dict:
     """백원 POS 판매 데이터 처리 — Firebird Bridge 수신.
@@ -666,8 +1242,6 @@ def handle_baekwon_sale(business_id: int, business_type: str, store_id: int,
         "items": [{"menu_code": "0101", "quantity": 2, "sale_amount": 10000, "sname": "CASH"}]
     }
     """
-    from app.controllers.inventory_controller import process_stock_out
-    from app.controllers.recipe_controller import deduct_by_recipe
     receipt_no = data.get("receipt_no", 0)
     sale_date_raw = data.get("sale_date", "")
     pos_no = data.get("pos_no", 1)
@@ -678,40 +1252,188 @@ def handle_baekwon_sale(business_id: int, business_type: str, store_id: int,
     existing = fetch_one(
         "SELECT id FROM stk_pos_sync_detail "
         "WHERE business_id = %s AND pos_table = 'baekwon_rdata' "
-        "AND pos_record_id = %s",
-        (business_id, receipt_no),
+        "AND status <> 'error' AND pos_record_id = %s AND menu_code = %s",
+        (business_id, receipt_no, f"POS{pos_no}"),
     )
     if existing:
         print(f"  ⏭️ 백원POS 영수증 #{receipt_no} 이미 동기화됨 — 스킵")
         result["skipped"] = len(items)
         return result
+    lines = _baekwon_sale_lines(items, result)
+    with transaction():
+        _apply_sale_lines(business_id, business_type, store_id, lines, None, result)
+        # 동기화 로그 기록
+        log_sync_detail(
+            business_id, "baekwon_rdata", receipt_no,
+            "baekwon_sale", f"POS{pos_no}", float(len(items)),
+            "success" if result["processed"] > 0 else "skipped",
+        )
+    print(f"  🔶 백원POS 영수증 #{receipt_no}: {result['processed']}건 처리, {result['skipped']}건 스킵")
+    return result
+
+
+def handle_baekwon_sale_batch(business_id: int, business_type: str, store_id: int,
+                              data: Dict) -> Dict:
+    """백원 POS 판매 여러 영수증 일괄 처리 — 브리지가 밀린 영수증을 한 번에 보낼 때 사용.
+
+    data 구조:
+    {
+        "receipts": [{"receipt_no": 123, "sale_date": "...", "pos_no": 1, "items": [...]}]
+    }
+    영수증마다 단건 Webhook과 같은 키((receipt_no, pos_no))를 같은 트랜잭션에서 선점하므로
+    같은 배치가 동시에 들어와도 한 번만 차감됩니다. 선점한 영수증의 품목은 상품별로 합산해
+    한 번에 차감하고, 오류 라인이 생기면 영수증별로 다시 처리해 실패한 영수증만 되돌립니다.
+    영수증 단위 실패(잘못된 receipt_no 포함)는 errors가 아닌 receipt_errors로 보고하므로
+    나머지 영수증의 반영은 유지되고, 재전송하면 실패한 영수증만 다시 처리됩니다.
+    """
+    receipts = data.get("receipts", [])
+    result = {"processed": 0, "skipped": 0, "errors": [], "receipt_errors": [],
+              "receipts": len(receipts), "duplicates": 0}
+    # 배치 안 중복 영수증((receipt_no, pos_no)가 같은 건)은 첫 건만 사용
+    by_key: Dict[str, Tuple[int, Dict]] = {}
+    for receipt in receipts:
+        receipt_no = _parse_receipt_no(receipt.get("receipt_no"))
+        if receipt_no is None:
+            result["receipt_errors"].append(f"receipt {receipt.get('receipt_no')!r}: invalid receipt_no")
+            result["skipped"] += len(receipt.get("items", []))
+            continue
+        key = baekwon_receipt_key(receipt_no, receipt.get("pos_no", 1))
+        if key in by_key:
+            result["duplicates"] += 1
+            result["skipped"] += len(receipt.get("items", []))
+            continue
+        by_key[key] = (receipt_no, receipt)
+    # 키 도입 전에 동기화된 영수증은 동기화 로그(pos_record_id=영수증, menu_code=POS번호)로 거른다
+    synced = set()
+    receipt_nos = sorted({receipt_no for receipt_no, _ in by_key.values()})
+    for start in range(0, len(receipt_nos), BATCH_SIZE):
+        chunk = receipt_nos[start:start + BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        synced.update(
+            (row["pos_record_id"], row["menu_code"])
+            for row in fetch_all(
+                f"SELECT DISTINCT pos_record_id, menu_code FROM stk_pos_sync_detail "
+                f"WHERE business_id = %s AND pos_table = 'baekwon_rdata' "
+                f"AND status <> 'error' AND pos_record_id IN ({placeholders})",
+                (business_id, *chunk),
+            )
+        )
+    pending = []
+    for key, (receipt_no, receipt) in by_key.items():
+        if (receipt_no, f"POS{receipt.get('pos_no', 1)}") in synced:
+            result["duplicates"] += 1
+            result["skipped"] += len(receipt.get("items", []))
+            continue
+        pending.append((key, receipt_no, receipt))
+    with transaction():
+        outcomes = _apply_baekwon_receipts(business_id, business_type, store_id, pending, result)
+        log_sync_details(business_id, [
+            {"pos_table": "baekwon_rdata",
+             "pos_record_id": receipt_no,
+             "sync_type": "baekwon_sale",
+             "menu_code": f"POS{receipt.get('pos_no', 1)}",
+             "quantity": float(len(receipt.get("items", []))),
+             "status": outcomes[key][0],
+             "error_message": outcomes[key][1]}
+            for key, receipt_no, receipt in pending if key in outcomes
+        ])
+    print(f"  🔶 백원POS 영수증 일괄: {len(outcomes)}장 반영, {result['duplicates']}장 중복, "
+          f"{result['processed']}건 처리, {result['skipped']}건 스킵, "
+          f"영수증 오류 {len(result['receipt_errors'])}건")
+    return result
+
+
+def _apply_baekwon_receipts(business_id: int, business_type: str, store_id: int,
+                            pending: List[Tuple[str, int, Dict]],
+                            result: Dict) -> Dict[str, Tuple[str, str]]:
+    """영수증 키를 선점하고 차감합니다. 선점한 영수증 키 → (상태, 오류 메시지)를 반환합니다.
+
+    먼저 전체를 한 번에 차감하고, 오류 라인이 있으면 그 시도를 되돌린 뒤 영수증마다
+    SAVEPOINT를 나눠 다시 처리합니다. 실패한 영수증은 차감과 키 선점이 함께 되돌려지고
+    result["receipt_errors"]에 기록됩니다.
+    """
+    from app.services.idempotency_service import claim, claim_many
+    batch = {"processed": 0, "skipped": 0, "errors": []}
+    lines_by_key: Dict[str, List[Dict]] = {}
+    try:
+        with transaction():
+            claimed = claim_many(business_id, "baekwon_sale", [key for key, _, _ in pending])
+            for key, _, receipt in pending:
+                if key in claimed:
+                    lines_by_key[key] = _baekwon_sale_lines(receipt.get("items", []), batch)
+            lines = [line for receipt_lines in lines_by_key.values() for line in receipt_lines]
+            _apply_sale_lines(business_id, business_type, store_id, lines, None, batch)
+            if batch["errors"]:
+                raise WebhookFailed(batch)
+    except WebhookFailed:
+        print(f"  ↩️ 백원POS 일괄 차감 오류 {len(batch['errors'])}건 - 영수증별로 다시 처리")
+    else:
+        _merge_result(result, batch)
+        for key, _, receipt in pending:
+            if key not in lines_by_key:
+                result["duplicates"] += 1
+                result["skipped"] += len(receipt.get("items", []))
+        return {key: (_lines_status(lines), "") for key, lines in lines_by_key.items()}
+    outcomes: Dict[str, Tuple[str, str]] = {}
+    for key, receipt_no, receipt in pending:
+        single = {"processed": 0, "skipped": 0, "errors": []}
+        try:
+            with transaction():
+                if not claim(business_id, "baekwon_sale", key):
+                    result["duplicates"] += 1
+                    result["skipped"] += len(receipt.get("items", []))
+                    continue
+                lines = _baekwon_sale_lines(receipt.get("items", []), single)
+                _apply_sale_lines(business_id, business_type, store_id, lines, None, single)
+                if single["errors"]:
+                    raise WebhookFailed(single)
+        except WebhookFailed as e:
+            result["receipt_errors"].extend(
+                f"receipt {receipt_no} (POS{receipt.get('pos_no', 1)}): {error}"
+                for error in single["errors"]
+            )
+            result["skipped"] += len(receipt.get("items", []))
+            outcomes[key] = ("error", str(e)[:1000])
+            continue
+        _merge_result(result, single)
+        outcomes[key] = (_lines_status(lines), "")
+    return outcomes
+
+
+def _lines_status(lines: List[Dict]) -> str:
+    """판매 라인 처리 결과로 영수증의 동기화 로그 상태를 정합니다."""
+    statuses = {line.get("status") for line in lines}
+    if "error" in statuses:
+        return "error"
+    return "success" if "success" in statuses else "skipped"
+
+
+def _merge_result(result: Dict, part: Dict) -> None:
+    result["processed"] += part["processed"]
+    result["skipped"] += part["skipped"]
+    result["errors"].extend(part["errors"])
+
+
+def _parse_receipt_no(value) -> Optional[int]:
+    """영수증 번호를 양의 정수로 변환합니다 (잘못된 값이면 None)."""
+    try:
+        receipt_no = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return receipt_no if receipt_no > 0 else None
+
+
+def _baekwon_sale_lines(items: List[Dict], result: Dict) -> List[Dict]:
+    """백원 POS 영수증 품목을 판매 라인으로 변환합니다 (잘못된 품목은 skipped 집계)."""
+    lines = []
     for item in items:
         menu_code = str(item.get("menu_code", "")).strip()
         quantity = float(item.get("quantity", 0))
         if not menu_code or quantity <= 0:
             result["skipped"] += 1
             continue
-        try:
-            if business_type == "restaurant":
-                _handle_restaurant_sale(
-                    business_id, store_id, menu_code, quantity, None,
-                    deduct_by_recipe, result,
-                )
-            else:
-                _handle_mart_sale(
-                    business_id, store_id, menu_code, quantity, None,
-                    process_stock_out, result,
-                )
-        except Exception as e:
-            result["errors"].append(f"{menu_code}: {str(e)}")
-    # 동기화 로그 기록
-    log_sync_detail(
-        business_id, "baekwon_rdata", receipt_no,
-        "baekwon_sale", f"POS{pos_no}", float(len(items)),
-        "success" if result["processed"] > 0 else "skipped",
-    )
-    print(f"  🔶 백원POS 영수증 #{receipt_no}: {result['processed']}건 처리, {result['skipped']}건 스킵")
-    return result
+        lines.append({"menu_code": menu_code, "quantity": quantity, "lot_id": None})
+    return lines
 
 
 def handle_baekwon_products(business_id: int, data: Dict) -> Dict:
@@ -724,41 +1446,49 @@ def handle_baekwon_products(business_id: int, data: Dict) -> Dict:
     """
     items = data.get("items", [])
     result = {"created": 0, "updated": 0, "skipped": 0, "total": len(items)}
+    # 브리지는 매번 전체 카탈로그를 보내므로 기존 상품을 한 번에 읽어 메모리에서 비교
+    existing_by_code = {
+        row["code"]: row
+        for row in fetch_all(
+            "SELECT code, sell_price, is_active FROM stk_products WHERE business_id = %s",
+            (business_id,),
+        )
+    }
+    pushed = {}
     for item in items:
         code = str(item.get("code", "")).strip()
-        name = str(item.get("name", "")).strip()
-        sell_price = float(item.get("sell_price", 0))
         if not code:
             result["skipped"] += 1
             continue
-        if not name:
-            name = code
-        existing = find_product_by_mcode(business_id, code)
-        if existing:
-            # 가격 변동 체크
-            is_price_changed = abs(float(existing.get("sell_price", 0) or 0) - sell_price) > 0.01
-            if is_price_changed:
-                execute(
-                    "UPDATE stk_products SET sell_price = %s WHERE id = %s",
-                    (sell_price, existing["id"]),
-                )
-                result["updated"] += 1
-                print(f"  🔄 백원상품 가격변경: {name} → {sell_price}")
-            else:
-                result["skipped"] += 1
+        if code in pushed:
+            # 같은 코드가 여러 번 오면 마지막 값만 반영
+            result["skipped"] += 1
+        pushed[code] = (str(item.get("name", "")).strip() or code, float(item.get("sell_price", 0)))
+    rows = []
+    for code, (name, sell_price) in pushed.items():
+        existing = existing_by_code.get(code)
+        if existing is None:
+            result["created"] += 1
+        elif not existing["is_active"]:
+            # 비활성 상품은 기존처럼 건드리지 않음
+            result["skipped"] += 1
+            continue
+        elif abs(float(existing["sell_price"] or 0) - sell_price) > 0.01:
+            result["updated"] += 1
         else:
-            try:
-                insert(
-                    "INSERT INTO stk_products "
-                    "(business_id, category_id, code, name, unit, sell_price, min_stock) "
-                    "VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                    (business_id, None, code, name, "ea", sell_price, 0),
-                )
-                result["created"] += 1
-                print(f"  ➕ 백원상품 추가: {name} (code:{code})")
-            except Exception as e:
-                result["skipped"] += 1
-                print(f"  ⚠️ 백원상품 추가 실패: {name} — {e}")
+            result["skipped"] += 1
+            continue
+        rows.append((business_id, None, code, name, "ea", sell_price, 0))
+    with transaction():
+        execute_many(
+            "INSERT INTO stk_products "
+            "(business_id, category_id, code, name, unit, sell_price, min_stock) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE sell_price = VALUES(sell_price)",
+            rows,
+        )
+    if result["created"] or result["updated"]:
+        catalog_cache_service.invalidate_products(business_id)
     print(f"📡 백원POS 상품 동기화: 신규 {result['created']}건, 변경 {result['updated']}건, 스킵 {result['skipped']}건")
     return result
 
@@ -785,34 +1515,6 @@ def _convert_baekwon_date(date_str: str) -> str:
     return date_str
 
 
-def sync_inventory_to_pos(product_id: int, store_id: int) -> bool:
-    """StockMaster 재고를 POS menulist.minventory에 동기화합니다."""
-    from app.db import write_pos_db
-    product = fetch_one(
-        "SELECT code FROM stk_products WHERE id = %s", (product_id,),
-    )
-    if not product or not product["code"]:
-        return False
-    mcode = product["code"]
-    total_row = fetch_one(
-        "SELECT COALESCE(SUM(quantity), 0) AS total_qty "
-        "FROM stk_inventory WHERE product_id = %s AND store_id = %s",
-        (product_id, store_id),
-    )
-    total_qty = int(float(total_row["total_qty"])) if total_row else 0
-    try:
-        affected = write_pos_db(
-            "UPDATE menulist SET minventory = %s WHERE mcode = %s",
-            (total_qty, mcode),
-        )
-        if affected > 0:
-            print(f"POS 재고 동기화: {mcode} -> {total_qty}")
-        return affected > 0
-    except Exception as e:
-        print(f"POS 재고 동기화 실패 ({mcode}): {e}")
-        return False
-
-
 def sync_product_to_pos(product_id: int) -> bool:
     """StockMaster 상품 정보를 POS menulist에 동기화합니다 (가격, 원가)."""
     from app.db import write_pos_db
@@ -852,4 +1554,5 @@ def load_sync_status(business_id: int) -> Dict:
     return {
         "checkpoints": {log["pos_table"]: log for log in logs},
         "recent_errors": error_count,
+        "progress": load_sync_progress(business_id),
     }
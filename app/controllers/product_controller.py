@@ -1,13 +1,25 @@
 """상품/식자재 비즈니스 로직"""
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from io import BytesIO
-from app.db import fetch_one, fetch_all, insert, execute
+from app.db import fetch_one, fetch_all, insert, execute, stream_all
+from app.services.catalog_cache_service import invalidate_products
 from app.services.excel_service import parse_product_excel
 
 
 def load_products(business_id: int, category_id: Optional[int] = None,
                   search: str = "", active_only: bool = True) -> List[Dict]:
     """상품 목록을 조회합니다."""
+    return fetch_all(*_products_query(business_id, category_id, search, active_only))
+
+
+def iter_products(business_id: int, active_only: bool = True) -> Iterator[Dict]:
+    """상품 목록을 서버 측 커서로 한 행씩 돌려줍니다 (내보내기용)."""
+    for chunk in stream_all(*_products_query(business_id, active_only=active_only)):
+        yield from chunk
+
+
+def _products_query(business_id: int, category_id: Optional[int] = None,
+                    search: str = "", active_only: bool = True) -> Tuple[str, tuple]:
     sql = (
         "SELECT p.*, c.name AS category_name, s.name AS supplier_name "
         "FROM stk_products p "
@@ -26,7 +38,7 @@ def load_products(business_id: int, category_id: Optional[int] = None,
         like = f"%{search}%"
         params.extend([like, like, like])
     sql += " ORDER BY p.name"
-    return fetch_all(sql, tuple(params))
+    return sql, tuple(params)
 
 
 def load_product(product_id: int) -> Optional[Dict]:
@@ -43,7 +55,7 @@ def load_product(product_id: int) -> Optional[Dict]:
 
 def save_product(data: Dict) -> int:
     """상품을 생성합니다."""
-    return insert(
+    product_id = insert(
         "INSERT INTO stk_products "
         "(business_id, category_id, supplier_id, code, barcode, name, description, "
         "storage_location, unit, unit_price, sell_price, min_stock, max_stock) "
@@ -55,11 +67,13 @@ def save_product(data: Dict) -> int:
          data.get("unit_price", 0), data.get("sell_price", 0),
          data.get("min_stock", 0), data.get("max_stock") or None),
     )
+    invalidate_products(data["business_id"])
+    return product_id
 
 
 def update_product(product_id: int, data: Dict) -> int:
     """상품 정보를 수정합니다."""
-    return execute(
+    affected = execute(
         "UPDATE stk_products SET category_id=%s, supplier_id=%s, code=%s, barcode=%s, "
         "name=%s, description=%s, storage_location=%s, unit=%s, unit_price=%s, "
         "sell_price=%s, min_stock=%s, max_stock=%s WHERE id=%s",
@@ -70,11 +84,22 @@ def update_product(product_id: int, data: Dict) -> int:
          data.get("sell_price", 0), data.get("min_stock", 0),
          data.get("max_stock") or None, product_id),
     )
+    _invalidate_product_business(product_id)
+    return affected
 
 
 def delete_product(product_id: int) -> int:
     """상품을 비활성화합니다."""
-    return execute("UPDATE stk_products SET is_active = 0 WHERE id = %s", (product_id,))
+    affected = execute("UPDATE stk_products SET is_active = 0 WHERE id = %s", (product_id,))
+    _invalidate_product_business(product_id)
+    return affected
+
+
+def _invalidate_product_business(product_id: int) -> None:
+    """상품이 속한 사업장의 상품 캐시를 비웁니다."""
+    row = fetch_one("SELECT business_id FROM stk_products WHERE id = %s", (product_id,))
+    if row:
+        invalidate_products(row["business_id"])
 
 
 def generate_product_code(business_id: int) -> str:
@@ -104,6 +129,7 @@ def import_products_from_excel(business_id: int, file_stream: BytesIO) -> Dict:
         except Exception as e:
             result["errors"].append(f"Code '{row_data.get('code', '?')}': {str(e)}")
             result["skipped"] += 1
+    invalidate_products(business_id)
     print(f"📊 엑셀 가져오기 완료 - 생성: {result['created']}, 수정: {result['updated']}, "
           f"건너뜀: {result['skipped']}, 오류: {len(result['errors'])}")
     return result
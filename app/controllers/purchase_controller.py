@@ -1,8 +1,9 @@
 """매입 관리 비즈니스 로직"""
 from typing import Dict, List, Optional
 from io import BytesIO
-from app.db import fetch_one, fetch_all, insert, execute
+from app.db import fetch_one, fetch_all, insert, insert_many, execute, transaction
 from app.controllers.inventory_controller import process_stock_in
+from app.services import rollup_service
 from app.services.excel_service import parse_purchase_excel
 
 
@@ -48,17 +49,21 @@ def load_purchase(purchase_id: int) -> Optional[Dict]:
 
 def save_purchase(data: Dict, items: List[Dict]) -> int:
     """매입을 생성합니다."""
-    purchase_number = _generate_purchase_number(data["business_id"])
-    purchase_id = insert(
-        "INSERT INTO stk_purchases "
-        "(business_id, store_id, supplier_id, purchase_number, purchase_date, memo, created_by) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
-        (data["business_id"], data["store_id"], data.get("supplier_id") or None,
-         purchase_number, data["purchase_date"], data.get("memo", ""),
-         data.get("created_by")),
-    )
-    total = _save_purchase_items(purchase_id, items)
-    execute("UPDATE stk_purchases SET total_amount = %s WHERE id = %s", (total, purchase_id))
+    with transaction():
+        purchase_number = _generate_purchase_number(data["business_id"])
+        purchase_id = insert(
+            "INSERT INTO stk_purchases "
+            "(business_id, store_id, supplier_id, purchase_number, purchase_date, memo, created_by) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            (data["business_id"], data["store_id"], data.get("supplier_id") or None,
+             purchase_number, data["purchase_date"], data.get("memo", ""),
+             data.get("created_by")),
+        )
+        total = _save_purchase_items(purchase_id, items)
+        execute("UPDATE stk_purchases SET total_amount = %s WHERE id = %s", (total, purchase_id))
+        rollup_service.record_order(
+            "purchase", None, rollup_service.load_order_for_update("purchase", purchase_id),
+        )
     return purchase_id
 
 
@@ -67,39 +72,54 @@ def receive_purchase(purchase_id: int, user_id: Optional[int] = None) -> bool:
     purchase = load_purchase(purchase_id)
     if not purchase or purchase["status"] == "received":
         return False
-    for item in purchase["line_items"]:
-        expiry = item.get("expiry_date")
-        expiry_str = str(expiry) if expiry else None
-        process_stock_in(
-            product_id=item["product_id"], store_id=purchase["store_id"],
-            quantity=float(item["quantity"]), unit_price=float(item["unit_price"]),
-            reason=f"Purchase #{purchase['purchase_number']}",
-            user_id=user_id, reference_id=purchase_id, reference_type="purchase",
-            expiry_date=expiry_str,
-        )
-    execute("UPDATE stk_purchases SET status = 'received' WHERE id = %s", (purchase_id,))
+    with transaction():
+        if not _set_purchase_status(purchase_id, "received"):
+            return False
+        for item in purchase["line_items"]:
+            expiry = item.get("expiry_date")
+            expiry_str = str(expiry) if expiry else None
+            process_stock_in(
+                product_id=item["product_id"], store_id=purchase["store_id"],
+                quantity=float(item["quantity"]), unit_price=float(item["unit_price"]),
+                reason=f"Purchase #{purchase['purchase_number']}",
+                user_id=user_id, reference_id=purchase_id, reference_type="purchase",
+                expiry_date=expiry_str,
+            )
     return True
 
 
 def cancel_purchase(purchase_id: int) -> int:
     """매입을 취소합니다."""
-    return execute("UPDATE stk_purchases SET status = 'cancelled' WHERE id = %s", (purchase_id,))
+    return int(_set_purchase_status(purchase_id, "cancelled"))
+
+
+def _set_purchase_status(purchase_id: int, status: str) -> bool:
+    """매입 상태를 바꾸고 일별 집계를 옮깁니다 (이미 같은 상태면 False)."""
+    with transaction():
+        before = rollup_service.load_order_for_update("purchase", purchase_id)
+        if not before or before["status"] == status:
+            return False
+        execute("UPDATE stk_purchases SET status = %s WHERE id = %s", (status, purchase_id))
+        rollup_service.record_order("purchase", before, {**before, "status": status})
+    return True
 
 
 def _save_purchase_items(purchase_id: int, items: List[Dict]) -> float:
     """매입 상세 항목을 저장하고 합계를 반환합니다 (유통기한 포함)."""
     total = 0.0
+    rows = []
     for item in items:
         qty = float(item["quantity"])
         price = float(item["unit_price"])
         amount = qty * price
         total += amount
         expiry = item.get("expiry_date") or None
-        insert(
-            "INSERT INTO stk_purchase_items (purchase_id, product_id, quantity, unit_price, amount, expiry_date) "
-            "VALUES (%s, %s, %s, %s, %s, %s)",
-            (purchase_id, item["product_id"], qty, price, amount, expiry),
-        )
+        rows.append((purchase_id, item["product_id"], qty, price, amount, expiry))
+    insert_many(
+        "INSERT INTO stk_purchase_items (purchase_id, product_id, quantity, unit_price, amount, expiry_date) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        rows,
+    )
     return total
 
 
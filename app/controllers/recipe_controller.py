@@ -1,8 +1,9 @@
 """레시피 관리 비즈니스 로직 (식당용)"""
 from typing import Dict, List, Optional
 from io import BytesIO
-from app.db import fetch_one, fetch_all, insert, execute, execute_pos_db
-from app.controllers.inventory_controller import process_stock_out
+from app.db import fetch_one, fetch_all, insert, insert_many, execute, execute_pos_db
+from app.controllers.inventory_controller import process_stock_out_batch
+from app.services.catalog_cache_service import invalidate_recipes
 from app.services.excel_service import parse_recipe_excel
 
 
@@ -39,6 +40,7 @@ def save_recipe(data: Dict, items: List[Dict]) -> int:
          data.get("yield_unit", "ea")),
     )
     _save_recipe_items(recipe_id, items)
+    invalidate_recipes(data["business_id"])
     return recipe_id
 
 
@@ -52,30 +54,46 @@ def update_recipe(recipe_id: int, data: Dict, items: List[Dict]) -> None:
     )
     execute("DELETE FROM stk_recipe_items WHERE recipe_id = %s", (recipe_id,))
     _save_recipe_items(recipe_id, items)
+    _invalidate_recipe_business(recipe_id)
 
 
 def delete_recipe(recipe_id: int) -> int:
     """레시피를 비활성화합니다."""
-    return execute("UPDATE stk_recipes SET is_active = 0 WHERE id = %s", (recipe_id,))
+    affected = execute("UPDATE stk_recipes SET is_active = 0 WHERE id = %s", (recipe_id,))
+    _invalidate_recipe_business(recipe_id)
+    return affected
+
+
+def _invalidate_recipe_business(recipe_id: int) -> None:
+    """레시피가 속한 사업장의 레시피 캐시를 비웁니다."""
+    row = fetch_one("SELECT business_id FROM stk_recipes WHERE id = %s", (recipe_id,))
+    if row:
+        invalidate_recipes(row["business_id"])
 
 
 def deduct_by_recipe(recipe_id: int, sold_quantity: float,
-                     store_id: int, user_id: Optional[int] = None) -> List[Dict]:
-    """레시피 기반으로 재고를 차감합니다."""
-    recipe = load_recipe(recipe_id)
+                     store_id: int, user_id: Optional[int] = None,
+                     recipe: Optional[Dict] = None) -> List[Dict]:
+    """레시피 기반으로 재고를 차감합니다 (이미 조회한 레시피가 있으면 recipe로 전달)."""
+    if recipe is None:
+        recipe = load_recipe(recipe_id)
     if not recipe:
         return []
-    results = []
-    for item in recipe["ingredients"]:
-        deduct_qty = float(item["quantity"]) * sold_quantity
-        tx_id = process_stock_out(
-            product_id=item["product_id"], store_id=store_id,
-            quantity=deduct_qty, location="kitchen",
-            reason=f"Recipe: {recipe['name']} x{sold_quantity}",
-            user_id=user_id,
-        )
-        results.append({"product_id": item["product_id"], "quantity": deduct_qty, "tx_id": tx_id})
-    return results
+    lines = [
+        {"product_id": item["product_id"], "quantity": float(item["quantity"]) * sold_quantity,
+         "location": "kitchen"}
+        for item in recipe["ingredients"]
+    ]
+    tx_ids, allocations = process_stock_out_batch(
+        lines, store_id=store_id,
+        reason=f"Recipe: {recipe['name']} x{sold_quantity}",
+        user_id=user_id,
+    )
+    return [
+        {"product_id": line["product_id"], "quantity": line["quantity"], "tx_id": tx_id,
+         "allocations": line_allocations}
+        for line, tx_id, line_allocations in zip(lines, tx_ids, allocations)
+    ]
 
 
 def load_pos_menu_items(pos_db_name: str) -> List[Dict]:
@@ -127,6 +145,7 @@ def import_recipes_from_excel(business_id: int, file_stream: BytesIO) -> Dict:
         except Exception as e:
             result["errors"].append(f"Recipe '{recipe_name}': {str(e)}")
             result["skipped"] += 1
+    invalidate_recipes(business_id)
     print(f"📊 레시피 엑셀 가져오기 완료 - 생성: {result['created']}, "
           f"수정: {result['updated']}, 원재료: {result['items']}, 오류: {len(result['errors'])}")
     return result
@@ -199,9 +218,8 @@ def _process_recipe_group(business_id: int, recipe_name: str,
 
 def _save_recipe_items(recipe_id: int, items: List[Dict]) -> None:
     """레시피 원재료를 저장합니다."""
-    for item in items:
-        insert(
-            "INSERT INTO stk_recipe_items (recipe_id, product_id, quantity, unit) "
-            "VALUES (%s, %s, %s, %s)",
-            (recipe_id, item["product_id"], item["quantity"], item.get("unit", "")),
-        )
+    insert_many(
+        "INSERT INTO stk_recipe_items (recipe_id, product_id, quantity, unit) "
+        "VALUES (%s, %s, %s, %s)",
+        [(recipe_id, item["product_id"], item["quantity"], item.get("unit", "")) for item in items],
+    )
@@ -92,7 +92,7 @@ def execute_repackaging(rule_id: int, source_quantity: float,
     targets = rule.get("targets", [])
     if not targets:
         return {"success": False, "message": "No target products defined"}
-    process_stock_out(
+    _, source_lots = process_stock_out(
         product_id=rule["source_product_id"], store_id=store_id,
         quantity=source_quantity, location="warehouse",
         reason=f"소분출고: {rule['name'] or rule['source_name']}",
@@ -116,5 +116,6 @@ def execute_repackaging(rule_id: int, source_quantity: float,
         "success": True,
         "source_qty": source_quantity,
         "source_name": rule["source_name"],
+        "source_lots": source_lots,
         "targets": result_targets,
     }
@@ -1,17 +1,25 @@
 """리포트 비즈니스 로직"""
-from typing import Dict, List
-from app.db import fetch_all, fetch_one
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.db import fetch_all, fetch_one, stream_all
+from app.controllers.attachment_controller import iter_attachments_by_period
+from app.controllers.inventory_controller import iter_expiry_report
+from app.services import rollup_service
 
 
 def load_inventory_report(business_id: int, store_id: int = 0) -> List[Dict]:
     """재고 현황 리포트를 생성합니다."""
+    return fetch_all(*_inventory_report_query(business_id, store_id))
+
+
+def _inventory_report_query(business_id: int, store_id: int = 0) -> Tuple[str, tuple]:
     sql = (
         "SELECT p.code, p.name, p.unit, p.unit_price, p.sell_price, p.min_stock, "
         "c.name AS category_name, s.name AS store_name, "
-        "COALESCE(SUM(i.quantity), 0) AS total_qty, "
-        "COALESCE(SUM(i.quantity), 0) * p.unit_price AS stock_value "
+        "COALESCE(SUM(i.qty), 0) AS total_qty, "
+        "COALESCE(SUM(i.qty), 0) * p.unit_price AS stock_value "
         "FROM stk_products p "
-        "LEFT JOIN stk_inventory i ON p.id = i.product_id "
+        "LEFT JOIN stk_inventory_totals i ON p.id = i.product_id "
         "LEFT JOIN stk_stores s ON i.store_id = s.id "
         "LEFT JOIN stk_categories c ON p.category_id = c.id "
         "WHERE p.business_id = %s AND p.is_active = 1"
@@ -21,12 +29,16 @@ def load_inventory_report(business_id: int, store_id: int = 0) -> List[Dict]:
         sql += " AND i.store_id = %s"
         params.append(store_id)
     sql += " GROUP BY p.id, s.id ORDER BY c.name, p.name"
-    return fetch_all(sql, tuple(params))
+    return sql, tuple(params)
 
 
 def load_purchase_report(business_id: int, start_date: str, end_date: str) -> List[Dict]:
     """매입 리포트를 생성합니다."""
-    return fetch_all(
+    return fetch_all(*_purchase_report_query(business_id, start_date, end_date))
+
+
+def _purchase_report_query(business_id: int, start_date: str, end_date: str) -> Tuple[str, tuple]:
+    return (
         "SELECT p.purchase_date, p.purchase_number, sp.name AS supplier_name, "
         "p.total_amount, p.status, s.name AS store_name "
         "FROM stk_purchases p "
@@ -40,7 +52,11 @@ def load_purchase_report(business_id: int, start_date: str, end_date: str) -> Li
 
 def load_sales_report(business_id: int, start_date: str, end_date: str) -> List[Dict]:
     """매출 리포트를 생성합니다."""
-    return fetch_all(
+    return fetch_all(*_sales_report_query(business_id, start_date, end_date))
+
+
+def _sales_report_query(business_id: int, start_date: str, end_date: str) -> Tuple[str, tuple]:
+    return (
         "SELECT sa.sale_date, sa.sale_number, sa.customer_name, "
         "sa.total_amount, sa.status, s.name AS store_name "
         "FROM stk_sales sa "
@@ -53,7 +69,11 @@ def load_sales_report(business_id: int, start_date: str, end_date: str) -> List[
 
 def load_wholesale_report(business_id: int, start_date: str, end_date: str) -> List[Dict]:
     """도매 리포트를 생성합니다."""
-    return fetch_all(
+    return fetch_all(*_wholesale_report_query(business_id, start_date, end_date))
+
+
+def _wholesale_report_query(business_id: int, start_date: str, end_date: str) -> Tuple[str, tuple]:
+    return (
         "SELECT wo.order_date, wo.order_number, wc.name AS client_name, "
         "wo.total_amount, wo.discount_amount, wo.final_amount, wo.status "
         "FROM stk_wholesale_orders wo "
@@ -64,45 +84,193 @@ def load_wholesale_report(business_id: int, start_date: str, end_date: str) -> L
     )
 
 
+def iter_report_rows(report_type: str, business_id: int, start_date: str = "",
+                     end_date: str = "", store_id: int = 0, filter_type: str = "all") -> Iterator[Dict]:
+    """리포트 행을 서버 측 커서로 한 행씩 돌려줍니다 (내보내기용, 결과 전체를 메모리에 올리지 않음).
+
+    기간 리포트는 EXPORT_CHUNK_DAYS일 구간으로 나눠 최근 구간부터 조회하므로 쿼리마다
+    (business_id, 일자) 인덱스의 짧은 범위만 읽고, 일자 내림차순 정렬도 그대로 유지됩니다.
+    """
+    import config
+    if report_type in _PERIOD_REPORT_QUERIES:
+        build_query = _PERIOD_REPORT_QUERIES[report_type]
+        for window_start, window_end in _date_windows(start_date, end_date, config.EXPORT_CHUNK_DAYS):
+            for chunk in stream_all(*build_query(business_id, window_start, window_end)):
+                yield from chunk
+        return
+    if report_type == "expiry":
+        yield from iter_expiry_report(business_id, filter_type)
+        return
+    if report_type == "attachments":
+        yield from iter_attachments_by_period(business_id, start_date, end_date)
+        return
+    if report_type == "inventory":
+        query = _inventory_report_query(business_id, store_id)
+    elif report_type == "low-stock":
+        query = _low_stock_query(business_id, store_id)
+    else:
+        return
+    for chunk in stream_all(*query):
+        yield from chunk
+
+
+_PERIOD_REPORT_QUERIES = {
+    "purchases": _purchase_report_query,
+    "sales": _sales_report_query,
+    "wholesale": _wholesale_report_query,
+}
+
+# 기간 리포트가 내보내는 열 (데이터 버전 체크섬용)
+_PERIOD_REPORT_COLUMNS = {
+    "purchases": ("purchase_date", "purchase_number", "supplier_name", "total_amount", "status", "store_name"),
+    "sales": ("sale_date", "sale_number", "customer_name", "total_amount", "status", "store_name"),
+    "wholesale": ("order_date", "order_number", "client_name", "total_amount", "discount_amount",
+                  "final_amount", "status"),
+}
+
+
+def _date_windows(start_date: str, end_date: str, days: int) -> Iterator[Tuple[str, str]]:
+    """[start_date, end_date]를 days일 구간으로 나눠 최근 구간부터 돌려줍니다 (양 끝 포함)."""
+    start = date.fromisoformat(str(start_date)[:10])
+    end = date.fromisoformat(str(end_date)[:10])
+    if days <= 0:
+        yield start.isoformat(), end.isoformat()
+        return
+    while end >= start:
+        window_start = max(start, end - timedelta(days=days - 1))
+        yield window_start.isoformat(), end.isoformat()
+        end = window_start - timedelta(days=1)
+
+
+def load_report_data_version(report_type: str, business_id: int,
+                             start_date: str = "", end_date: str = "") -> str:
+    """리포트가 읽는 데이터의 변경 지표를 반환합니다 (리포트 결과 캐시 키용).
+
+    재고 계열은 재고 합계/상품의 최종 변경 시각과 합계, 유통기한은 오늘 날짜(남은 일수가
+    바뀜)와 로트별 유통기한/수량 체크섬, 기간 주문 리포트는 조인한 이름까지 포함한 리포트
+    행 체크섬, 첨부파일은 기간 내 건수와 최대 ID를 쓴다.
+    """
+    if report_type in ("inventory", "low-stock", "expiry"):
+        products = fetch_one(
+            "SELECT MAX(updated_at) AS changed_at, COUNT(*) AS cnt "
+            "FROM stk_products WHERE business_id = %s",
+            (business_id,),
+        )
+        product_version = f"{products['changed_at']}|{products['cnt']}"
+        if report_type == "expiry":
+            # 합계가 같아도 로트 간 이동이나 유통기한 수정은 결과를 바꾸므로 로트 단위로 본다
+            lots = fetch_one(
+                "SELECT COUNT(*) AS cnt, MAX(i.last_updated) AS changed_at, "
+                "COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', i.id, i.location, i.expiry_date, i.quantity))), 0) AS lots "
+                "FROM stk_stores s JOIN stk_inventory i ON i.store_id = s.id "
+                "WHERE s.business_id = %s",
+                (business_id,),
+            )
+            return f"{date.today().isoformat()}|{lots['cnt']}|{lots['changed_at']}|{lots['lots']}|{product_version}"
+        row = fetch_one(
+            "SELECT MAX(t.updated_at) AS changed_at, COUNT(*) AS cnt, COALESCE(SUM(t.qty), 0) AS qty "
+            "FROM stk_inventory_totals t JOIN stk_stores s ON t.store_id = s.id "
+            "WHERE s.business_id = %s",
+            (business_id,),
+        )
+        return f"{row['changed_at']}|{row['cnt']}|{row['qty']}|{product_version}"
+    if report_type in _PERIOD_REPORT_QUERIES:
+        # 거래처/공급처/매장 이름과 고객명도 내보내는 값이므로 리포트 행 전체의 체크섬으로 본다
+        sql, params = _PERIOD_REPORT_QUERIES[report_type](business_id, start_date, end_date)
+        columns = ", ".join(f"q.{column}" for column in _PERIOD_REPORT_COLUMNS[report_type])
+        row = fetch_one(
+            f"SELECT COUNT(*) AS cnt, COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', {columns}))), 0) AS rows_crc "
+            f"FROM ({sql}) q",
+            params,
+        )
+        return f"{row['cnt']}|{row['rows_crc']}"
+    if report_type == "attachments":
+        row = fetch_one(
+            "SELECT COUNT(*) AS cnt, COALESCE(MAX(id), 0) AS max_id FROM stk_attachments "
+            "WHERE business_id = %s AND created_at >= %s AND created_at < %s",
+            (business_id, *rollup_service.day_range(start_date, end_date)),
+        )
+        return f"{row['cnt']}|{row['max_id']}"
+    return ""
+
+
+def count_report_rows(report_type: str, business_id: int,
+                      start_date: str = "", end_date: str = "") -> Optional[int]:
+    """내보낼 행 수를 일별 집계로 미리 계산합니다 (기간 주문 리포트만, 나머지는 None)."""
+    if report_type not in _ORDER_KINDS:
+        return None
+    return load_order_totals(_ORDER_KINDS[report_type], business_id, start_date, end_date)["count"]
+
+
+# 기간 리포트 종류 → 주문 일별 집계의 kind
+_ORDER_KINDS = {"purchases": "purchase", "sales": "sale", "wholesale": "wholesale"}
+
+
+def load_order_totals(kind: str, business_id: int, start_date: str, end_date: str) -> Dict:
+    """기간별 주문(sale/purchase/wholesale) 합계를 일별 집계에서 조회합니다 (모든 상태 포함)."""
+    totals = {"count": 0, "total_amount": 0.0, "discount_amount": 0.0, "final_amount": 0.0}
+    for row in rollup_service.load_order_daily(kind, business_id, start_date, end_date):
+        totals["count"] += int(row["order_count"])
+        totals["total_amount"] += float(row["total_amount"])
+        totals["discount_amount"] += float(row["discount_amount"])
+        totals["final_amount"] += float(row["final_amount"])
+    return totals
+
+
 def load_transaction_summary(business_id: int, start_date: str, end_date: str) -> Dict:
-    """기간별 입출고 요약을 반환합니다."""
+    """기간별 입출고 요약을 반환합니다 (일별 집계 테이블 기준)."""
+    rows = rollup_service.load_transaction_totals(business_id, start_date, end_date)
+    return {row["type"]: {"count": int(row["count"]), "total": float(row["total"])} for row in rows}
+
+
+def load_transaction_summary_raw(business_id: int, start_date: str, end_date: str) -> Dict:
+    """기간별 입출고 요약을 원본 stk_transactions에서 집계합니다 (일별 집계 검증용).
+
+    반열린 구간으로 비교해 매장별 (store_id, created_at) 인덱스 범위 스캔을 사용합니다.
+    """
+    start, end = rollup_service.day_range(start_date, end_date)
     rows = fetch_all(
         "SELECT t.type, COUNT(*) AS count, COALESCE(SUM(t.total_amount), 0) AS total "
-        "FROM stk_transactions t "
-        "JOIN stk_stores s ON t.store_id = s.id "
-        "WHERE s.business_id = %s AND DATE(t.created_at) BETWEEN %s AND %s "
+        "FROM stk_stores s "
+        "JOIN stk_transactions t ON t.store_id = s.id "
+        "AND t.created_at >= %s AND t.created_at < %s "
+        "WHERE s.business_id = %s "
         "GROUP BY t.type",
-        (business_id, start_date, end_date),
+        (start, end, business_id),
     )
-    return {row["type"]: {"count": row["count"], "total": float(row["total"])} for row in rows}
+    return {row["type"]: {"count": int(row["count"]), "total": float(row["total"])} for row in rows}
 
 
 def load_low_stock_products(business_id: int, store_id: int = None) -> List[Dict]:
     """최소 재고 이하 상품 목록을 조회합니다 (매장별 필터 지원)."""
+    return fetch_all(*_low_stock_query(business_id, store_id))
+
+
+def _low_stock_query(business_id: int, store_id: int = None) -> Tuple[str, tuple]:
     if store_id:
-        return fetch_all(
+        return (
             "SELECT p.code, p.name, p.unit, p.min_stock, "
-            "COALESCE(SUM(i.quantity), 0) AS current_stock, "
+            "COALESCE(SUM(i.qty), 0) AS current_stock, "
             "s.name AS store_name "
             "FROM stk_products p "
-            "LEFT JOIN stk_inventory i ON p.id = i.product_id AND i.store_id = %s "
+            "LEFT JOIN stk_inventory_totals i ON p.id = i.product_id AND i.store_id = %s "
             "LEFT JOIN stk_stores s ON i.store_id = s.id "
             "WHERE p.business_id = %s AND p.is_active = 1 AND p.min_stock > 0 "
             "GROUP BY p.id "
-            "HAVING COALESCE(SUM(i.quantity), 0) <= p.min_stock "
-            "ORDER BY COALESCE(SUM(i.quantity), 0) / p.min_stock ASC",
+            "HAVING COALESCE(SUM(i.qty), 0) <= p.min_stock "
+            "ORDER BY COALESCE(SUM(i.qty), 0) / p.min_stock ASC",
             (store_id, business_id),
         )
-    return fetch_all(
+    return (
         "SELECT p.code, p.name, p.unit, p.min_stock, "
-        "COALESCE(SUM(i.quantity), 0) AS current_stock, "
+        "COALESCE(SUM(i.qty), 0) AS current_stock, "
         "s.name AS store_name "
         "FROM stk_products p "
-        "LEFT JOIN stk_inventory i ON p.id = i.product_id "
+        "LEFT JOIN stk_inventory_totals i ON p.id = i.product_id "
         "LEFT JOIN stk_stores s ON i.store_id = s.id "
         "WHERE p.business_id = %s AND p.is_active = 1 AND p.min_stock > 0 "
         "GROUP BY p.id, s.id "
-        "HAVING COALESCE(SUM(i.quantity), 0) <= p.min_stock "
-        "ORDER BY COALESCE(SUM(i.quantity), 0) / p.min_stock ASC",
+        "HAVING COALESCE(SUM(i.qty), 0) <= p.min_stock "
+        "ORDER BY COALESCE(SUM(i.qty), 0) / p.min_stock ASC",
         (business_id,),
     )
@@ -1,7 +1,8 @@
 """자체 판매 관리 비즈니스 로직 (비POS 사용자용)"""
 from typing import Dict, List, Optional, Tuple
-from app.db import fetch_one, fetch_all, insert, execute
-from app.controllers.inventory_controller import process_stock_out
+from app.db import fetch_one, fetch_all, insert, insert_many, execute, transaction
+from app.controllers.inventory_controller import process_stock_out_batch, process_lot_stock_out
+from app.services import rollup_service
 
 
 def load_sales(business_id: int, status: str = "",
@@ -36,61 +37,45 @@ def load_sales(business_id: int, status: str = "",
 
 def load_sales_summary(business_id: int, date_from: str = "",
                        date_to: str = "", store_id: int = None) -> Dict:
-    """기간별 판매 정산 요약을 조회합니다 (매장별 필터 지원)."""
-    where = "WHERE sa.business_id = %s"
-    params: list = [business_id]
-    if store_id:
-        where += " AND sa.store_id = %s"
-        params.append(store_id)
-    if date_from:
-        where += " AND sa.sale_date >= %s"
-        params.append(date_from)
-    if date_to:
-        where += " AND sa.sale_date <= %s"
-        params.append(date_to)
-    row = fetch_one(
-        f"SELECT "
-        f"COUNT(*) AS total_count, "
-        f"COALESCE(SUM(sa.total_amount), 0) AS total_amount, "
-        f"COALESCE(SUM(sa.discount_amount), 0) AS total_discount, "
-        f"COALESCE(SUM(sa.final_amount), 0) AS total_final, "
-        f"SUM(CASE WHEN sa.status='confirmed' THEN 1 ELSE 0 END) AS confirmed_count, "
-        f"COALESCE(SUM(CASE WHEN sa.status='confirmed' THEN sa.final_amount ELSE 0 END), 0) AS confirmed_amount, "
-        f"SUM(CASE WHEN sa.status='draft' THEN 1 ELSE 0 END) AS draft_count, "
-        f"COALESCE(SUM(CASE WHEN sa.status='draft' THEN sa.final_amount ELSE 0 END), 0) AS draft_amount, "
-        f"SUM(CASE WHEN sa.status='cancelled' THEN 1 ELSE 0 END) AS cancelled_count "
-        f"FROM stk_sales sa {where}",
-        tuple(params),
-    )
-    return row or {}
+    """기간별 판매 정산 요약을 조회합니다 (매장별 필터 지원, 일별 집계 기준)."""
+    summary = {
+        "total_count": 0, "total_amount": 0, "total_discount": 0, "total_final": 0,
+        "confirmed_count": 0, "confirmed_amount": 0,
+        "draft_count": 0, "draft_amount": 0, "cancelled_count": 0,
+    }
+    for row in rollup_service.load_order_daily("sale", business_id, date_from, date_to, store_id):
+        summary["total_count"] += row["order_count"]
+        summary["total_amount"] += row["total_amount"]
+        summary["total_discount"] += row["discount_amount"]
+        summary["total_final"] += row["final_amount"]
+        if row["status"] in ("confirmed", "draft"):
+            summary[f"{row['status']}_count"] += row["order_count"]
+            summary[f"{row['status']}_amount"] += row["final_amount"]
+        elif row["status"] == "cancelled":
+            summary["cancelled_count"] += row["order_count"]
+    return summary
 
 
 def load_daily_settlement(business_id: int, date_from: str = "",
                           date_to: str = "", store_id: int = None) -> List[Dict]:
-    """일별 정산 내역을 조회합니다 (매장별 필터 지원)."""
-    where = "WHERE sa.business_id = %s AND sa.status != 'cancelled'"
-    params: list = [business_id]
-    if store_id:
-        where += " AND sa.store_id = %s"
-        params.append(store_id)
-    if date_from:
-        where += " AND sa.sale_date >= %s"
-        params.append(date_from)
-    if date_to:
-        where += " AND sa.sale_date <= %s"
-        params.append(date_to)
-    return fetch_all(
-        f"SELECT sa.sale_date, "
-        f"COUNT(*) AS sale_count, "
-        f"COALESCE(SUM(sa.total_amount), 0) AS day_total, "
-        f"COALESCE(SUM(sa.discount_amount), 0) AS day_discount, "
-        f"COALESCE(SUM(sa.final_amount), 0) AS day_final, "
-        f"SUM(CASE WHEN sa.status='confirmed' THEN 1 ELSE 0 END) AS confirmed, "
-        f"SUM(CASE WHEN sa.status='draft' THEN 1 ELSE 0 END) AS draft "
-        f"FROM stk_sales sa {where} "
-        f"GROUP BY sa.sale_date ORDER BY sa.sale_date DESC",
-        tuple(params),
-    )
+    """일별 정산 내역을 조회합니다 (매장별 필터 지원, 일별 집계 기준)."""
+    days: Dict = {}
+    for row in rollup_service.load_order_daily("sale", business_id, date_from, date_to, store_id):
+        if row["status"] == "cancelled" or not row["order_count"]:
+            continue
+        day = days.setdefault(row["order_date"], {
+            "sale_date": row["order_date"], "sale_count": 0,
+            "day_total": 0, "day_discount": 0, "day_final": 0,
+            "confirmed": 0, "draft": 0,
+        })
+        day["sale_count"] += row["order_count"]
+        day["day_total"] += row["total_amount"]
+        day["day_discount"] += row["discount_amount"]
+        day["day_final"] += row["final_amount"]
+        if row["status"] in ("confirmed", "draft"):
+            day[row["status"]] += row["order_count"]
+    # load_order_daily가 일자 내림차순이므로 삽입 순서를 그대로 사용
+    return list(days.values())
 
 
 def load_sale(sale_id: int) -> Optional[Dict]:
@@ -115,25 +100,27 @@ def load_sale(sale_id: int) -> Optional[Dict]:
 
 def save_sale(data: Dict, items: List[Dict]) -> int:
     """판매를 생성합니다."""
-    sale_number = _generate_sale_number(data["business_id"])
     client_id = data.get("client_id") or None
     discount_rate = float(data.get("discount_rate", 0))
-    sale_id = insert(
-        "INSERT INTO stk_sales "
-        "(business_id, store_id, sale_number, sale_date, customer_name, client_id, discount_rate, memo, created_by) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
-        (data["business_id"], data["store_id"], sale_number,
-         data["sale_date"], data.get("customer_name", ""),
-         client_id, discount_rate,
-         data.get("memo", ""), data.get("created_by")),
-    )
-    total = _save_sale_items(sale_id, items)
-    discount_amount = total * discount_rate / 100
-    final_amount = total - discount_amount
-    execute(
-        "UPDATE stk_sales SET total_amount=%s, discount_amount=%s, final_amount=%s WHERE id=%s",
-        (total, discount_amount, final_amount, sale_id),
-    )
+    with transaction():
+        sale_number = _generate_sale_number(data["business_id"])
+        sale_id = insert(
+            "INSERT INTO stk_sales "
+            "(business_id, store_id, sale_number, sale_date, customer_name, client_id, discount_rate, memo, created_by) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (data["business_id"], data["store_id"], sale_number,
+             data["sale_date"], data.get("customer_name", ""),
+             client_id, discount_rate,
+             data.get("memo", ""), data.get("created_by")),
+        )
+        total = _save_sale_items(sale_id, items)
+        discount_amount = total * discount_rate / 100
+        final_amount = total - discount_amount
+        execute(
+            "UPDATE stk_sales SET total_amount=%s, discount_amount=%s, final_amount=%s WHERE id=%s",
+            (total, discount_amount, final_amount, sale_id),
+        )
+        rollup_service.record_order("sale", None, rollup_service.load_order_for_update("sale", sale_id))
     print(f"판매 생성: sale_id={sale_id}, total={total}, disc_rate={discount_rate}%, disc_amt={discount_amount}, final={final_amount}")
     return sale_id
 
@@ -143,20 +130,61 @@ def confirm_sale(sale_id: int, user_id: Optional[int] = None) -> bool:
     sale = load_sale(sale_id)
     if not sale or sale["status"] != "draft":
         return False
-    for item in sale["line_items"]:
-        process_stock_out(
-            product_id=item["product_id"], store_id=sale["store_id"],
-            quantity=float(item["quantity"]), unit_price=float(item["unit_price"]),
+    with transaction():
+        # 상태 전이를 먼저 선점해 동시 확정 시 이중 차감을 막습니다.
+        if not mark_sale_confirmed(sale_id):
+            return False
+        process_stock_out_batch(
+            [{"product_id": item["product_id"], "quantity": float(item["quantity"]),
+              "unit_price": float(item["unit_price"])} for item in sale["line_items"]],
+            store_id=sale["store_id"],
             reason=f"Sale #{sale['sale_number']}",
             user_id=user_id, reference_id=sale_id, reference_type="sale",
         )
-    execute("UPDATE stk_sales SET status = 'confirmed' WHERE id = %s", (sale_id,))
     return True
 
 
+def confirm_sale_lots(sale_id: int, lot_deductions: List[Dict], store_id: int,
+                      user_id: Optional[int] = None) -> bool:
+    """판매를 확정하고 사용자가 선택한 로트에서 차감합니다 (확정과 차감을 한 트랜잭션으로)."""
+    sale = load_sale(sale_id)
+    if not sale or sale["status"] != "draft":
+        return False
+    with transaction():
+        # 상태 전이를 먼저 선점해 동시 확정 시 이중 차감을 막습니다.
+        if not mark_sale_confirmed(sale_id):
+            return False
+        if lot_deductions:
+            process_lot_stock_out(
+                lot_deductions=lot_deductions,
+                store_id=store_id,
+                reason=f"Sale #{sale['sale_number']}",
+                user_id=user_id, reference_id=sale_id, reference_type="sale",
+            )
+    return True
+
+
+def mark_sale_confirmed(sale_id: int) -> bool:
+    """초안 판매를 확정 상태로 바꿉니다 (재고 차감은 호출하는 쪽에서 처리)."""
+    return _set_sale_status(sale_id, "confirmed", only_from="draft")
+
+
 def cancel_sale(sale_id: int) -> int:
     """판매를 취소합니다."""
-    return execute("UPDATE stk_sales SET status = 'cancelled' WHERE id = %s", (sale_id,))
+    return int(_set_sale_status(sale_id, "cancelled"))
+
+
+def _set_sale_status(sale_id: int, status: str, only_from: Optional[str] = None) -> bool:
+    """판매 상태를 바꾸고 일별 집계를 옮깁니다. 바뀌었으면 True."""
+    with transaction():
+        before = rollup_service.load_order_for_update("sale", sale_id)
+        if not before or before["status"] == status:
+            return False
+        if only_from and before["status"] != only_from:
+            return False
+        execute("UPDATE stk_sales SET status = %s WHERE id = %s", (status, sale_id))
+        rollup_service.record_order("sale", before, {**before, "status": status})
+    return True
 
 
 def resolve_sales_items(rows: List[Dict], business_id: int) -> Tuple[List[Dict], List[str]]:
@@ -225,9 +253,10 @@ def batch_create_sales(grouped_sales: List[Dict], business_id: int,
             for item in sale_group["line_items"]
         ]
         try:
-            sale_id = save_sale(data, items)
-            if auto_confirm:
-                confirm_sale(sale_id, user_id)
+            with transaction():
+                sale_id = save_sale(data, items)
+                if auto_confirm:
+                    confirm_sale(sale_id, user_id)
             created_ids.append(sale_id)
             print(f"판매 일괄 생성: sale_id={sale_id}, items={len(items)}, confirm={auto_confirm}")
         except Exception as e:
@@ -238,16 +267,18 @@ def batch_create_sales(grouped_sales: List[Dict], business_id: int,
 def _save_sale_items(sale_id: int, items: List[Dict]) -> float:
     """판매 상세를 저장하고 합계를 반환합니다."""
     total = 0.0
+    rows = []
     for item in items:
         qty = float(item["quantity"])
         price = float(item["unit_price"])
         amount = qty * price
         total += amount
-        insert(
-            "INSERT INTO stk_sale_items (sale_id, product_id, quantity, unit_price, amount) "
-            "VALUES (%s, %s, %s, %s, %s)",
-            (sale_id, item["product_id"], qty, price, amount),
-        )
+        rows.append((sale_id, item["product_id"], qty, price, amount))
+    insert_many(
+        "INSERT INTO stk_sale_items (sale_id, product_id, quantity, unit_price, amount) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        rows,
+    )
     return total
 
 
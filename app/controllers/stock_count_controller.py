@@ -1,7 +1,8 @@
 """실사 재고 보고 비즈니스 로직"""
 from typing import Dict, List, Optional
-from app.db import fetch_one, fetch_all, insert, execute
+from app.db import fetch_one, fetch_all, insert, execute, transaction
 from app.controllers.inventory_controller import process_stock_adjust
+from app.services import inventory_totals_service
 
 
 def load_stock_counts(business_id: int, store_id: int = None) -> List[Dict]:
@@ -92,27 +93,35 @@ def update_stock_count_items(count_id: int, items: List[Dict]) -> None:
 
 
 def approve_stock_count(count_id: int, user_id: Optional[int] = None) -> bool:
-    """실사를 승인하고 재고를 조정합니다 (사유 포함)."""
+    """실사를 승인하고 재고를 조정합니다 (사유 포함).
+
+    승인 상태 변경과 재고 조정을 한 트랜잭션으로 처리하며, 상태를 조건부 UPDATE로
+    먼저 선점해 동시에 승인해도 한 번만 조정됩니다.
+    """
     from app.services.stock_cost_service import recalculate_product_cost
-    count = load_stock_count(count_id)
-    if not count or count["status"] == "approved":
-        return False
-    adjusted_products = set()
-    for item in count["line_items"]:
-        diff = float(item["actual_quantity"]) - float(item["system_quantity"])
-        if diff != 0:
-            memo = item.get("memo", "")
-            reason = f"Stock count #{count_id}: {memo}" if memo else f"Stock count #{count_id}"
-            process_stock_adjust(
-                product_id=item["product_id"], store_id=count["store_id"],
-                new_quantity=float(item["actual_quantity"]),
-                reason=reason,
-                user_id=user_id,
-            )
-            adjusted_products.add(item["product_id"])
-    for product_id in adjusted_products:
-        recalculate_product_cost(product_id)
-    execute("UPDATE stk_stock_counts SET status = 'approved' WHERE id = %s", (count_id,))
+    with transaction():
+        claimed = execute(
+            "UPDATE stk_stock_counts SET status = 'approved' WHERE id = %s AND status <> 'approved'",
+            (count_id,),
+        )
+        if not claimed:
+            return False
+        count = load_stock_count(count_id)
+        adjusted_products = set()
+        for item in count["line_items"]:
+            diff = float(item["actual_quantity"]) - float(item["system_quantity"])
+            if diff != 0:
+                memo = item.get("memo", "")
+                reason = f"Stock count #{count_id}: {memo}" if memo else f"Stock count #{count_id}"
+                process_stock_adjust(
+                    product_id=item["product_id"], store_id=count["store_id"],
+                    new_quantity=float(item["actual_quantity"]),
+                    reason=reason,
+                    user_id=user_id,
+                )
+                adjusted_products.add(item["product_id"])
+        for product_id in adjusted_products:
+            recalculate_product_cost(product_id)
     return True
 
 
@@ -324,69 +333,81 @@ def load_combined_review(business_id: int, store_id: int, count_date: str) -> Di
 
 def approve_combined_counts(business_id: int, store_id: int, count_date: str,
                             user_id: Optional[int] = None) -> bool:
-    """같은 날짜/매장의 모든 위치별 실사를 일괄 승인합니다."""
+    """같은 날짜/매장의 모든 위치별 실사를 일괄 승인합니다.
+
+    전체를 한 트랜잭션으로 처리하고, 실사마다 상태를 조건부 UPDATE로 선점해
+    다른 요청이 먼저 승인한 실사는 건너뜁니다.
+    """
     from app.services.stock_cost_service import recalculate_product_cost
-    counts = fetch_all(
-        "SELECT id, location FROM stk_stock_counts "
-        "WHERE business_id = %s AND store_id = %s AND count_date = %s AND status = 'draft'",
-        (business_id, store_id, count_date),
-    )
-    if not counts:
-        return False
-    adjusted_products = set()
-    for count_row in counts:
-        count = load_stock_count(count_row["id"])
-        if not count:
-            continue
-        location = count_row["location"] or "warehouse"
-        for item in count["line_items"]:
-            diff = float(item["actual_quantity"]) - float(item["system_quantity"])
-            if diff != 0:
-                memo = item.get("memo", "")
-                reason = (f"Stock count [{location}] #{count_row['id']}: {memo}"
-                          if memo else f"Stock count [{location}] #{count_row['id']}")
-                _adjust_inventory_by_location(
-                    product_id=item["product_id"],
-                    store_id=store_id,
-                    location=location,
-                    new_quantity=float(item["actual_quantity"]),
-                    reason=reason,
-                    user_id=user_id,
-                )
-                adjusted_products.add(item["product_id"])
-        execute("UPDATE stk_stock_counts SET status = 'approved' WHERE id = %s",
-                (count_row["id"],))
-    for product_id in adjusted_products:
-        recalculate_product_cost(product_id)
-    print(f"📋 일괄 승인 완료: {count_date} / {len(counts)}건 / 조정 상품 {len(adjusted_products)}건")
+    with transaction():
+        counts = fetch_all(
+            "SELECT id, location FROM stk_stock_counts "
+            "WHERE business_id = %s AND store_id = %s AND count_date = %s AND status = 'draft' "
+            "ORDER BY id",
+            (business_id, store_id, count_date),
+        )
+        adjusted_products = set()
+        approved = 0
+        for count_row in counts:
+            claimed = execute(
+                "UPDATE stk_stock_counts SET status = 'approved' WHERE id = %s AND status <> 'approved'",
+                (count_row["id"],),
+            )
+            if not claimed:
+                continue
+            approved += 1
+            count = load_stock_count(count_row["id"])
+            location = count_row["location"] or "warehouse"
+            for item in count["line_items"]:
+                diff = float(item["actual_quantity"]) - float(item["system_quantity"])
+                if diff != 0:
+                    memo = item.get("memo", "")
+                    reason = (f"Stock count [{location}] #{count_row['id']}: {memo}"
+                              if memo else f"Stock count [{location}] #{count_row['id']}")
+                    _adjust_inventory_by_location(
+                        product_id=item["product_id"],
+                        store_id=store_id,
+                        location=location,
+                        new_quantity=float(item["actual_quantity"]),
+                        reason=reason,
+                        user_id=user_id,
+                    )
+                    adjusted_products.add(item["product_id"])
+        if not approved:
+            return False
+        for product_id in adjusted_products:
+            recalculate_product_cost(product_id)
+    print(f"📋 일괄 승인 완료: {count_date} / {approved}건 / 조정 상품 {len(adjusted_products)}건")
     return True
 
 
 def _adjust_inventory_by_location(product_id: int, store_id: int, location: str,
                                   new_quantity: float, reason: str = "",
                                   user_id: Optional[int] = None) -> None:
-    """특정 위치의 재고를 실사 수량으로 직접 조정합니다."""
-    existing = fetch_one(
-        "SELECT id, quantity FROM stk_inventory "
-        "WHERE product_id = %s AND store_id = %s AND location = %s",
-        (product_id, store_id, location),
-    )
-    old_qty = float(existing["quantity"]) if existing else 0
-    diff = new_quantity - old_qty
-    if existing:
-        execute(
-            "UPDATE stk_inventory SET quantity = %s WHERE id = %s",
-            (new_quantity, existing["id"]),
+    """특정 위치의 재고를 실사 수량으로 직접 조정합니다 (로트 잠금 후 같은 트랜잭션에서 기록)."""
+    with transaction():
+        existing = fetch_one(
+            "SELECT id, quantity FROM stk_inventory "
+            "WHERE product_id = %s AND store_id = %s AND location = %s FOR UPDATE",
+            (product_id, store_id, location),
         )
-    else:
+        old_qty = float(existing["quantity"]) if existing else 0
+        diff = new_quantity - old_qty
+        if existing:
+            execute(
+                "UPDATE stk_inventory SET quantity = %s WHERE id = %s",
+                (new_quantity, existing["id"]),
+            )
+        else:
+            insert(
+                "INSERT INTO stk_inventory (product_id, store_id, location, quantity) "
+                "VALUES (%s, %s, %s, %s)",
+                (product_id, store_id, location, new_quantity),
+            )
+        inventory_totals_service.apply_deltas([(product_id, store_id, location, diff)])
         insert(
-            "INSERT INTO stk_inventory (product_id, store_id, location, quantity) "
-            "VALUES (%s, %s, %s, %s)",
-            (product_id, store_id, location, new_quantity),
+            "INSERT INTO stk_transactions "
+            "(product_id, store_id, type, quantity, reason, user_id) "
+            "VALUES (%s, %s, 'adjust', %s, %s, %s)",
+            (product_id, store_id, diff, reason, user_id),
         )
-    insert(
-        "INSERT INTO stk_transactions "
-        "(product_id, store_id, type, quantity, reason, user_id) "
-        "VALUES (%s, %s, 'adjust', %s, %s, %s)",
-        (product_id, store_id, diff, reason, user_id),
-    )
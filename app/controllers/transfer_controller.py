@@ -1,38 +1,85 @@
 """매장 간 이동(Inter-Store Transfer) 비즈니스 로직"""
 from datetime import datetime
 from typing import Dict, List, Optional
-from app.db import fetch_one, fetch_all, insert, execute
+from app.db import fetch_one, fetch_all, insert, insert_many, execute, transaction
+from app.services import dashboard_cache_service, inventory_totals_service
 
 
 def create_transfer(business_id: int, from_store_id: int, to_store_id: int,
                     items: List[Dict], user_id: int, memo: str = "") -> int:
-    """매장 간 이동 요청을 생성합니다 (status=pending)."""
-    transfer_id = insert(
-        "INSERT INTO stk_transfers "
-        "(business_id, from_store_id, to_store_id, requested_by, memo) "
-        "VALUES (%s, %s, %s, %s, %s)",
-        (business_id, from_store_id, to_store_id, user_id, memo),
-    )
+    """매장 간 이동 요청을 생성합니다 (status=pending).
+
+    inventory_id가 비었거나 정수가 아니거나 출발 매장의 로트가 아닌 항목, 수량이 0 이하인
+    항목은 건너뛰고, 남는 항목이 없으면 ValueError를 냅니다.
+    """
+    valid_items = []
     for item in items:
-        inv = fetch_one(
-            "SELECT product_id, expiry_date, location FROM stk_inventory WHERE id = %s",
-            (item["inventory_id"],),
-        )
-        if not inv:
+        inventory_id = _parse_positive_int(item.get("inventory_id"))
+        quantity = _parse_quantity(item.get("quantity"))
+        if inventory_id is None or quantity is None:
+            print(f"⚠️ 이동 항목 건너뜀 (잘못된 로트/수량): {item}")
             continue
-        insert(
+        valid_items.append((inventory_id, quantity))
+    with transaction():
+        lots = {}
+        if valid_items:
+            inventory_ids = sorted({inventory_id for inventory_id, _ in valid_items})
+            placeholders = ", ".join(["%s"] * len(inventory_ids))
+            lots = {
+                row["id"]: row for row in fetch_all(
+                    f"SELECT id, product_id, expiry_date, location FROM stk_inventory "
+                    f"WHERE store_id = %s AND id IN ({placeholders})",
+                    (from_store_id, *inventory_ids),
+                )
+            }
+        rows = []
+        for inventory_id, quantity in valid_items:
+            inv = lots.get(inventory_id)
+            if not inv:
+                print(f"⚠️ 이동 항목 건너뜀 (출발 매장 로트 아님): inventory_id={inventory_id}")
+                continue
+            rows.append((
+                inv["product_id"], inventory_id, quantity,
+                str(inv["expiry_date"]) if inv["expiry_date"] else None,
+                inv["location"],
+            ))
+        if not rows:
+            raise ValueError("No valid items for transfer")
+        transfer_id = insert(
+            "INSERT INTO stk_transfers "
+            "(business_id, from_store_id, to_store_id, requested_by, memo) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (business_id, from_store_id, to_store_id, user_id, memo),
+        )
+        insert_many(
             "INSERT INTO stk_transfer_items "
             "(transfer_id, product_id, inventory_id, quantity, expiry_date, location) "
             "VALUES (%s, %s, %s, %s, %s, %s)",
-            (transfer_id, inv["product_id"], item["inventory_id"],
-             item["quantity"],
-             str(inv["expiry_date"]) if inv["expiry_date"] else None,
-             inv["location"]),
+            [(transfer_id, *row) for row in rows],
         )
+        dashboard_cache_service.invalidate_stores([from_store_id, to_store_id], "transfers")
     print(f"📦 이동 요청 생성: transfer_id={transfer_id}, 출발={from_store_id}, 도착={to_store_id}")
     return transfer_id
 
 
+def _parse_positive_int(value) -> Optional[int]:
+    """양의 정수로 변환합니다 (비었거나 잘못된 값이면 None)."""
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def _parse_quantity(value) -> Optional[float]:
+    """이동 수량을 양수로 변환합니다 (잘못된 값이면 None)."""
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        return None
+    return quantity if quantity > 0 else None
+
+
 def ship_transfer(transfer_id: int, user_id: int) -> bool:
     """이동 요청을 발송 처리합니다 (pending -> shipped, 출발매장 재고 차감)."""
     transfer = fetch_one(
@@ -43,28 +90,37 @@ def ship_transfer(transfer_id: int, user_id: int) -> bool:
     items = fetch_all(
         "SELECT * FROM stk_transfer_items WHERE transfer_id = %s", (transfer_id,),
     )
-    for item in items:
-        if item["inventory_id"]:
-            execute(
-                "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
-                (item["quantity"], item["inventory_id"]),
-            )
-        _record_transfer_transaction(
-            product_id=item["product_id"],
-            store_id=transfer["from_store_id"],
-            tx_type="transfer_out",
-            from_location=item["location"],
-            quantity=item["quantity"],
-            user_id=user_id,
-            reference_id=transfer_id,
+    with transaction():
+        claimed = execute(
+            "UPDATE stk_transfers SET status='shipped', shipped_by=%s, shipped_at=NOW() "
+            "WHERE id=%s AND status='pending'",
+            (user_id, transfer_id),
         )
-    execute(
-        "UPDATE stk_transfers SET status='shipped', shipped_by=%s, shipped_at=NOW() "
-        "WHERE id=%s",
-        (user_id, transfer_id),
-    )
-    for item in items:
-        _sync_to_pos(item["product_id"], transfer["from_store_id"])
+        if not claimed:
+            return False
+        dashboard_cache_service.invalidate_stores(
+            [transfer["from_store_id"], transfer["to_store_id"]], "transfers",
+        )
+        for item in items:
+            if item["inventory_id"]:
+                execute(
+                    "UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s",
+                    (item["quantity"], item["inventory_id"]),
+                )
+                inventory_totals_service.apply_lot_deltas(
+                    [(item["inventory_id"], -float(item["quantity"]))]
+                )
+            _record_transfer_transaction(
+                product_id=item["product_id"],
+                store_id=transfer["from_store_id"],
+                tx_type="transfer_out",
+                from_location=item["location"],
+                quantity=item["quantity"],
+                user_id=user_id,
+                reference_id=transfer_id,
+            )
+        for item in items:
+            _sync_to_pos(item["product_id"], transfer["from_store_id"])
     print(f"🚚 이동 발송 완료: transfer_id={transfer_id}")
     return True
 
@@ -84,38 +140,41 @@ def receive_transfer(transfer_id: int, user_id: int,
     if received_items:
         for ri in received_items:
             received_map[int(ri["item_id"])] = float(ri["received_quantity"])
-    for item in items:
-        recv_qty = received_map.get(item["id"], float(item["quantity"]))
-        execute(
-            "UPDATE stk_transfer_items SET received_quantity = %s WHERE id = %s",
-            (recv_qty, item["id"]),
+    with transaction():
+        claimed = execute(
+            "UPDATE stk_transfers SET status='received', received_by=%s, received_at=NOW() "
+            "WHERE id=%s AND status='shipped'",
+            (user_id, transfer_id),
         )
-        if recv_qty > 0:
-            _upsert_inventory_for_transfer(
-                product_id=item["product_id"],
-                store_id=transfer["to_store_id"],
-                location=item["location"],
-                quantity=recv_qty,
-                expiry_date=str(item["expiry_date"]) if item["expiry_date"] else None,
-            )
-            _record_transfer_transaction(
-                product_id=item["product_id"],
-                store_id=transfer["to_store_id"],
-                tx_type="transfer_in",
-                to_location=item["location"],
-                quantity=recv_qty,
-                user_id=user_id,
-                reference_id=transfer_id,
+        if not claimed:
+            return False
+        dashboard_cache_service.invalidate_stores(
+            [transfer["from_store_id"], transfer["to_store_id"]], "transfers",
+        )
+        for item in items:
+            recv_qty = received_map.get(item["id"], float(item["quantity"]))
+            execute(
+                "UPDATE stk_transfer_items SET received_quantity = %s WHERE id = %s",
+                (recv_qty, item["id"]),
             )
-    execute(
-        "UPDATE stk_transfers SET status='received', received_by=%s, received_at=NOW() "
-        "WHERE id=%s",
-        (user_id, transfer_id),
-    )
-    for item in items:
-        recv_qty = received_map.get(item["id"], float(item["quantity"]))
-        if recv_qty > 0:
-            _sync_to_pos(item["product_id"], transfer["to_store_id"])
+            if recv_qty > 0:
+                _upsert_inventory_for_transfer(
+                    product_id=item["product_id"],
+                    store_id=transfer["to_store_id"],
+                    location=item["location"],
+                    quantity=recv_qty,
+                    expiry_date=str(item["expiry_date"]) if item["expiry_date"] else None,
+                )
+                _record_transfer_transaction(
+                    product_id=item["product_id"],
+                    store_id=transfer["to_store_id"],
+                    tx_type="transfer_in",
+                    to_location=item["location"],
+                    quantity=recv_qty,
+                    user_id=user_id,
+                    reference_id=transfer_id,
+                )
+                _sync_to_pos(item["product_id"], transfer["to_store_id"])
     print(f"✅ 이동 수령 완료: transfer_id={transfer_id}")
     return True
 
@@ -131,6 +190,9 @@ def cancel_transfer(transfer_id: int, user_id: int) -> bool:
         "UPDATE stk_transfers SET status='cancelled' WHERE id=%s",
         (transfer_id,),
     )
+    dashboard_cache_service.invalidate_stores(
+        [transfer["from_store_id"], transfer["to_store_id"]], "transfers",
+    )
     print(f"❌ 이동 취소: transfer_id={transfer_id}")
     return True
 
@@ -215,9 +277,9 @@ def load_all_stores_inventory(business_id: int, search: str = "",
     sql = (
         "SELECT p.id AS product_id, p.code AS product_code, p.name AS product_name, "
         "p.unit, c.name AS category_name, "
-        "COALESCE(SUM(i.quantity), 0) AS total_quantity "
+        "COALESCE(SUM(i.qty), 0) AS total_quantity "
         "FROM stk_products p "
-        "LEFT JOIN stk_inventory i ON i.product_id = p.id "
+        "LEFT JOIN stk_inventory_totals i ON i.product_id = p.id "
         "LEFT JOIN stk_categories c ON p.category_id = c.id "
         "WHERE p.business_id = %s AND p.is_active = 1"
     )
@@ -237,9 +299,9 @@ def load_store_breakdown(business_id: int, product_id: int) -> List[Dict]:
     """특정 상품의 매장별 재고 분포를 조회합니다."""
     return fetch_all(
         "SELECT s.id AS store_id, s.name AS store_name, s.is_warehouse, "
-        "COALESCE(SUM(i.quantity), 0) AS quantity "
+        "COALESCE(SUM(i.qty), 0) AS quantity "
         "FROM stk_stores s "
-        "LEFT JOIN stk_inventory i ON i.store_id = s.id AND i.product_id = %s "
+        "LEFT JOIN stk_inventory_totals i ON i.store_id = s.id AND i.product_id = %s "
         "WHERE s.business_id = %s AND s.is_active = 1 "
         "GROUP BY s.id ORDER BY s.is_warehouse DESC, s.name",
         (product_id, business_id),
@@ -251,9 +313,9 @@ def load_store_inventory_summary(business_id: int) -> List[Dict]:
     return fetch_all(
         "SELECT s.id, s.name, s.is_warehouse, "
         "COUNT(DISTINCT i.product_id) AS product_count, "
-        "COALESCE(SUM(i.quantity), 0) AS total_quantity "
+        "COALESCE(SUM(i.qty), 0) AS total_quantity "
         "FROM stk_stores s "
-        "LEFT JOIN stk_inventory i ON i.store_id = s.id "
+        "LEFT JOIN stk_inventory_totals i ON i.store_id = s.id "
         "WHERE s.business_id = %s AND s.is_active = 1 "
         "GROUP BY s.id ORDER BY s.is_warehouse DESC, s.name",
         (business_id,),
@@ -263,12 +325,9 @@ def load_store_inventory_summary(business_id: int) -> List[Dict]:
 # ── POS 동기화 헬퍼 ──
 
 def _sync_to_pos(product_id: int, store_id: int) -> None:
-    """재고 변동 후 POS menulist 재고를 동기화합니다 (실패 시 무시)."""
-    try:
-        from app.controllers.pos_sync_controller import sync_inventory_to_pos
-        sync_inventory_to_pos(product_id, store_id)
-    except Exception as e:
-        print(f"POS 동기화 스킵: {e}")
+    """재고 변동을 POS write-back 큐에 표시합니다 (커밋 후 모아서 반영)."""
+    from app.services.pos_writeback_service import mark_dirty
+    mark_dirty(product_id, store_id)
 
 
 # ── 내부 헬퍼 ──
@@ -295,11 +354,13 @@ def _upsert_inventory_for_transfer(product_id: int, store_id: int,
             (quantity, existing["id"]),
         )
     else:
+        quantity = max(0, quantity)
         insert(
             "INSERT INTO stk_inventory (product_id, store_id, location, quantity, expiry_date) "
             "VALUES (%s, %s, %s, %s, %s)",
-            (product_id, store_id, location, max(0, quantity), expiry_date),
+            (product_id, store_id, location, quantity, expiry_date),
         )
+    inventory_totals_service.apply_deltas([(product_id, store_id, location, quantity)])
 
 
 def _record_transfer_transaction(product_id: int, store_id: int, tx_type: str,
@@ -1,7 +1,8 @@
 """도매 관리 비즈니스 로직 (마트용)"""
 from typing import Dict, List, Optional
-from app.db import fetch_one, fetch_all, insert, execute
-from app.controllers.inventory_controller import process_stock_out
+from app.db import fetch_one, fetch_all, insert, insert_many, execute, transaction
+from app.controllers.inventory_controller import process_stock_out_batch
+from app.services import rollup_service
 
 
 # ── 도매 거래처 ──
@@ -111,20 +112,24 @@ def load_wholesale_order(order_id: int) -> Optional[Dict]:
 
 def save_wholesale_order(data: Dict, items: List[Dict]) -> int:
     """도매 주문을 생성합니다."""
-    order_number = _generate_order_number(data["business_id"])
-    order_id = insert(
-        "INSERT INTO stk_wholesale_orders "
-        "(business_id, store_id, client_id, order_number, order_date, delivery_date, memo, created_by) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-        (data["business_id"], data["store_id"], data["client_id"],
-         order_number, data["order_date"], data.get("delivery_date"),
-         data.get("memo", ""), data.get("created_by")),
-    )
-    totals = _save_order_items(order_id, data["client_id"], items)
-    execute(
-        "UPDATE stk_wholesale_orders SET total_amount=%s, discount_amount=%s, final_amount=%s WHERE id=%s",
-        (totals["total"], totals["discount"], totals["final"], order_id),
-    )
+    with transaction():
+        order_number = _generate_order_number(data["business_id"])
+        order_id = insert(
+            "INSERT INTO stk_wholesale_orders "
+            "(business_id, store_id, client_id, order_number, order_date, delivery_date, memo, created_by) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (data["business_id"], data["store_id"], data["client_id"],
+             order_number, data["order_date"], data.get("delivery_date"),
+             data.get("memo", ""), data.get("created_by")),
+        )
+        totals = _save_order_items(order_id, data["client_id"], items)
+        execute(
+            "UPDATE stk_wholesale_orders SET total_amount=%s, discount_amount=%s, final_amount=%s WHERE id=%s",
+            (totals["total"], totals["discount"], totals["final"], order_id),
+        )
+        rollup_service.record_order(
+            "wholesale", None, rollup_service.load_order_for_update("wholesale", order_id),
+        )
     return order_id
 
 
@@ -133,14 +138,20 @@ def ship_wholesale_order(order_id: int, user_id: Optional[int] = None) -> bool:
     order = load_wholesale_order(order_id)
     if not order or order["status"] in ("shipped", "delivered", "cancelled"):
         return False
-    for item in order["line_items"]:
-        process_stock_out(
-            product_id=item["product_id"], store_id=order["store_id"],
-            quantity=float(item["quantity"]), unit_price=float(item["unit_price"]),
+    with transaction():
+        # 행을 잠가 이전 상태를 읽은 뒤 전이해야 일별 집계를 정확히 옮길 수 있습니다.
+        before = rollup_service.load_order_for_update("wholesale", order_id)
+        if not before or before["status"] in ("shipped", "delivered", "cancelled"):
+            return False
+        execute("UPDATE stk_wholesale_orders SET status = 'shipped' WHERE id = %s", (order_id,))
+        rollup_service.record_order("wholesale", before, {**before, "status": "shipped"})
+        process_stock_out_batch(
+            [{"product_id": item["product_id"], "quantity": float(item["quantity"]),
+              "unit_price": float(item["unit_price"])} for item in order["line_items"]],
+            store_id=order["store_id"],
             reason=f"Wholesale #{order['order_number']} → {order['client_name']}",
             user_id=user_id, reference_id=order_id, reference_type="wholesale_order",
         )
-    execute("UPDATE stk_wholesale_orders SET status = 'shipped' WHERE id = %s", (order_id,))
     return True
 
 
@@ -148,18 +159,19 @@ def ship_wholesale_order(order_id: int, user_id: Optional[int] = None) -> bool:
 
 def record_payment(order_id: int, data: Dict) -> int:
     """결제를 등록하고 주문의 결제 상태를 갱신합니다."""
-    payment_id = insert(
-        "INSERT INTO stk_wholesale_payments "
-        "(order_id, business_id, client_id, payment_method, amount, "
-        "check_date, check_number, bank_name, bank_ref, memo, paid_by) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-        (order_id, data["business_id"], data["client_id"],
-         data["payment_method"], data["amount"],
-         data.get("check_date") or None, data.get("check_number") or None,
-         data.get("bank_name") or None, data.get("bank_ref") or None,
-         data.get("memo", ""), data.get("paid_by")),
-    )
-    _update_payment_status(order_id)
+    with transaction():
+        payment_id = insert(
+            "INSERT INTO stk_wholesale_payments "
+            "(order_id, business_id, client_id, payment_method, amount, "
+            "check_date, check_number, bank_name, bank_ref, memo, paid_by) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (order_id, data["business_id"], data["client_id"],
+             data["payment_method"], data["amount"],
+             data.get("check_date") or None, data.get("check_number") or None,
+             data.get("bank_name") or None, data.get("bank_ref") or None,
+             data.get("memo", ""), data.get("paid_by")),
+        )
+        _update_payment_status(order_id)
     print(f"결제 등록: order_id={order_id}, method={data['payment_method']}, amount={data['amount']}")
     return payment_id
 
@@ -283,15 +295,18 @@ def _save_order_items(order_id: int, client_id: int, items: List[Dict]) -> Dict:
         (client_id,),
     )
     default_rate = float(client["default_discount_rate"]) if client and client["default_discount_rate"] else 0
+    pricing_map = {
+        row["product_id"]: row for row in fetch_all(
+            "SELECT * FROM stk_wholesale_pricing WHERE client_id=%s", (client_id,),
+        )
+    }
     total = 0.0
     discount_total = 0.0
+    rows = []
     for item in items:
         qty = float(item["quantity"])
         price = float(item["unit_price"])
-        pricing = fetch_one(
-            "SELECT * FROM stk_wholesale_pricing WHERE client_id=%s AND product_id=%s",
-            (client_id, item["product_id"]),
-        )
+        pricing = pricing_map.get(int(item["product_id"]))
         if pricing and pricing["discount_type"] == "fixed_price" and pricing["fixed_price"]:
             price = float(pricing["fixed_price"])
             disc_rate = 0
@@ -303,12 +318,13 @@ def _save_order_items(order_id: int, client_id: int, items: List[Dict]) -> Dict:
         amount = qty * price - disc_amount
         total += qty * price
         discount_total += disc_amount
-        insert(
-            "INSERT INTO stk_wholesale_order_items "
-            "(order_id, product_id, quantity, unit_price, discount_rate, discount_amount, amount) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
-            (order_id, item["product_id"], qty, price, disc_rate, disc_amount, amount),
-        )
+        rows.append((order_id, item["product_id"], qty, price, disc_rate, disc_amount, amount))
+    insert_many(
+        "INSERT INTO stk_wholesale_order_items "
+        "(order_id, product_id, quantity, unit_price, discount_rate, discount_amount, amount) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        rows,
+    )
     return {"total": total, "discount": discount_total, "final": total - discount_total}
 
 
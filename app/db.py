@@ -1,10 +1,154 @@
 """MariaDB 데이터베이스 연결 관리"""
-from typing import Optional, Dict, List, Any
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Dict, List, Any
 import pymysql
 import pymysql.cursors
 from flask import Flask, g
 
 _db_config: Dict[str, Any] = {}
+_pool: Optional["_ConnectionPool"] = None
+_pos_pools: Dict[str, "_ConnectionPool"] = {}
+_pos_pools_lock = threading.Lock()
+# 2006: server has gone away, 2013: lost connection, 2055: lost connection (SSL/IO)
+_CONNECTION_LOST_CODES = (2006, 2013, 2055)
+BATCH_SIZE = 500
+# INSERT ... VALUES (%s, ...) [ON DUPLICATE KEY UPDATE ...] 를 다중 행으로 펼치기 위한 패턴
+_RE_INSERT_VALUES = re.compile(
+    r"\s*((?:INSERT|REPLACE)\b.+\bVALUES?\s*)"
+    r"(\(\s*%s\s*(?:,\s*%s\s*)*\))"
+    r"(\s*(?:ON DUPLICATE.*)?);?\s*\Z",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class _ConnectionPool:
+    """스레드 안전 커넥션 풀 (체크아웃 시 헬스체크, 유휴 커넥션 정리)."""
+
+    def __init__(self, config: Dict[str, Any], min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float = 300, checkout_timeout: float = 10) -> None:
+        self._config = config
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle: deque = deque()  # (conn, 반납 시각)
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "waits": 0, "timeouts": 0}
+
+    def warm_up(self) -> None:
+        """최소 커넥션 수만큼 미리 연결합니다."""
+        conns = []
+        try:
+            while self._open + len(conns) < self.min_size:
+                conns.append(self._connect())
+        finally:
+            with self._cond:
+                for conn in conns:
+                    self._open += 1
+                    self._idle.append((conn, time.monotonic()))
+                self._cond.notify_all()
+
+    def acquire(self) -> pymysql.connections.Connection:
+        """풀에서 커넥션을 꺼냅니다 (없으면 생성, 최대치면 대기)."""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            conn = None
+            with self._cond:
+                self._reap_idle()
+                while not self._idle and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError(
+                            f"DB 커넥션 풀 대기 시간 초과 (max_size={self.max_size})"
+                        )
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                else:
+                    self._open += 1
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._forget()
+                    raise
+                return conn
+            if self._is_healthy(conn):
+                with self._cond:
+                    self._stats["reused"] += 1
+                return conn
+            self.discard(conn)
+
+    def release(self, conn: pymysql.connections.Connection) -> None:
+        """커넥션을 풀에 반납합니다."""
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def discard(self, conn: pymysql.connections.Connection) -> None:
+        """끊기거나 오염된 커넥션을 닫고 풀에서 제외합니다."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["discarded"] += 1
+        self._forget()
+
+    def stats(self) -> Dict[str, Any]:
+        """모니터링용 풀 상태를 반환합니다."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                **self._stats,
+            }
+
+    def _connect(self) -> pymysql.connections.Connection:
+        conn = pymysql.connect(**self._config)
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, conn: pymysql.connections.Connection) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _reap_idle(self) -> None:
+        """idle_timeout을 넘긴 유휴 커넥션을 닫습니다 (min_size는 유지). 락 보유 상태에서 호출."""
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        while self._idle and self._open > self.min_size:
+            conn, released_at = self._idle[0]
+            if now - released_at < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._open -= 1
+            self._stats["discarded"] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
 
 
 def init_db(application: Flask) -> None:
@@ -20,26 +164,104 @@ def init_db(application: Flask) -> None:
         "cursorclass": pymysql.cursors.DictCursor,
         "autocommit": True,
     })
+    global _pool
+    _pool = _ConnectionPool(
+        _db_config,
+        min_size=config.DB_POOL_MIN_SIZE,
+        max_size=config.DB_POOL_MAX_SIZE,
+        idle_timeout=config.DB_POOL_IDLE_TIMEOUT,
+        checkout_timeout=config.DB_POOL_CHECKOUT_TIMEOUT,
+    )
+    try:
+        _pool.warm_up()
+    except Exception as e:
+        print(f"⚠️ DB 커넥션 풀 예열 실패 (요청 시 재시도): {e}")
     application.teardown_appcontext(_close_db)
 
 
 def get_db() -> pymysql.connections.Connection:
-    """현재 요청의 DB 연결을 반환합니다 (없으면 새로 생성, 끊기면 재연결)."""
+    """현재 요청의 DB 연결을 반환합니다 (요청당 한 번 풀에서 체크아웃)."""
     if "db" not in g:
-        g.db = pymysql.connect(**_db_config)
-    else:
-        try:
-            g.db.ping(reconnect=True)
-        except Exception:
-            g.db = pymysql.connect(**_db_config)
+        g.db = _pool.acquire()
     return g.db
 
 
 def _close_db(exception: Optional[Exception] = None) -> None:
-    """요청 종료 시 DB 연결을 닫습니다."""
+    """요청 종료 시 DB 연결을 풀에 반납합니다."""
     db = g.pop("db", None)
-    if db is not None:
-        db.close()
+    if db is None:
+        return
+    if exception is not None:
+        try:
+            db.rollback()
+        except Exception:
+            _pool.discard(db)
+            return
+    _pool.release(db)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """DB 커넥션 풀 상태를 반환합니다 (모니터링용)."""
+    with _pos_pools_lock:
+        pos_pools = dict(_pos_pools)
+    return {
+        "main": _pool.stats() if _pool else {},
+        "pos": {name: pool.stats() for name, pool in pos_pools.items()},
+    }
+
+
+@contextmanager
+def transaction() -> Iterator[pymysql.connections.Connection]:
+    """여러 쿼리를 하나의 트랜잭션으로 묶어 한 번에 커밋합니다.
+
+    중첩 호출 시 바깥 트랜잭션에 합류하며 SAVEPOINT로 감싸므로,
+    안쪽 블록의 예외는 해당 블록의 변경분만 되돌립니다.
+    """
+    conn = get_db()
+    depth = g.get("db_tx_depth", 0)
+    if depth == 0:
+        conn.begin()
+        g.db_after_commit = []
+    else:
+        with conn.cursor() as cur:
+            cur.execute(f"SAVEPOINT sp_{depth}")
+    hook_mark = len(g.db_after_commit)
+    g.db_tx_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        g.db_tx_depth = depth
+        if depth == 0:
+            g.pop("db_after_commit", None)
+            conn.rollback()
+        else:
+            del g.db_after_commit[hook_mark:]
+            with conn.cursor() as cur:
+                cur.execute(f"ROLLBACK TO SAVEPOINT sp_{depth}")
+        raise
+    g.db_tx_depth = depth
+    if depth > 0:
+        with conn.cursor() as cur:
+            cur.execute(f"RELEASE SAVEPOINT sp_{depth}")
+        return
+    try:
+        conn.commit()
+    except BaseException:
+        g.pop("db_after_commit", None)
+        raise
+    for callback in g.pop("db_after_commit", []):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ 커밋 후 작업 실패: {e}")
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """트랜잭션 커밋 후 실행할 작업을 등록합니다 (트랜잭션 밖이면 즉시 실행)."""
+    if g.get("db_tx_depth", 0) > 0:
+        g.db_after_commit.append(callback)
+    else:
+        callback()
 
 
 def fetch_one(sql: str, params: tuple = ()) -> Optional[Dict]:
@@ -58,6 +280,33 @@ def fetch_all(sql: str, params: tuple = ()) -> List[Dict]:
         return cur.fetchall()
 
 
+def stream_all(sql: str, params: tuple = (), chunk_size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    """조회 결과를 서버 측 커서로 chunk_size 행씩 나눠 돌려줍니다 (읽기 전용, 대용량 내보내기용).
+
+    요청 커넥션(get_db)과 별개로 풀에서 커넥션을 하나 꺼내 스트림이 끝날 때까지 점유하므로,
+    스트리밍 응답 도중에도 같은 요청의 다른 조회를 막지 않습니다.
+    중간에 멈추면 남은 결과를 버리기 위해 커넥션을 닫습니다.
+    """
+    conn = _pool.acquire()
+    completed = False
+    try:
+        # 남은 행을 끝까지 읽어 버리는 cursor.close()를 피하려고 with 블록을 쓰지 않는다
+        cur = conn.cursor(pymysql.cursors.SSDictCursor)
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        cur.close()
+        completed = True
+    finally:
+        if completed:
+            _pool.release(conn)
+        else:
+            _pool.discard(conn)
+
+
 def execute(sql: str, params: tuple = ()) -> int:
     """INSERT/UPDATE/DELETE를 실행하고 영향받은 행 수를 반환합니다."""
     conn = get_db()
@@ -74,30 +323,143 @@ def insert(sql: str, params: tuple = ()) -> int:
         return cur.lastrowid
 
 
-def execute_pos_db(sql: str, params: tuple = (), db_name: Optional[str] = None) -> List[Dict]:
-    """POS 데이터베이스에서 조회합니다 (읽기 전용)."""
+def execute_many(sql: str, rows: List[tuple], chunk_size: int = BATCH_SIZE) -> int:
+    """여러 행에 대해 같은 SQL을 실행하고 영향받은 행 수 합계를 반환합니다.
+
+    INSERT ... VALUES 문은 chunk_size 행씩 다중 VALUES 한 문장으로 보냅니다.
+    """
+    total = 0
+    for cur, _ in _execute_chunks(sql, rows, chunk_size):
+        total += cur.rowcount
+    return total
+
+
+def insert_many(sql: str, rows: List[tuple], chunk_size: int = BATCH_SIZE) -> List[int]:
+    """여러 행을 청크 단위 다중 VALUES INSERT로 저장하고 생성된 ID 목록을 반환합니다.
+
+    한 문장이 만든 AUTO_INCREMENT 값은 연속 할당되므로
+    (innodb_autoinc_lock_mode 0/1) 청크별 첫 ID부터 행 수만큼을 ID로 계산합니다.
+    """
+    ids: List[int] = []
+    for cur, count in _execute_chunks(sql, rows, chunk_size):
+        first_id = cur.lastrowid
+        ids.extend(range(first_id, first_id + count))
+    return ids
+
+
+def _execute_chunks(sql: str, rows: List[tuple], chunk_size: int):
+    """rows를 chunk_size씩 나눠 실행하며 (cursor, 청크 행 수)를 돌려줍니다."""
+    if not rows:
+        return
+    match = _RE_INSERT_VALUES.match(sql)
+    if match and "%s" in match.group(3):
+        match = None  # UPDATE 절에 행별 파라미터가 있으면 펼칠 수 없음
+    conn = get_db()
+    with conn.cursor() as cur:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if match:
+                prefix, values, suffix = match.group(1), match.group(2), match.group(3)
+                cur.execute(
+                    prefix + ", ".join([values] * len(chunk)) + suffix,
+                    tuple(value for row in chunk for value in row),
+                )
+            else:
+                cur.executemany(sql, chunk)
+            yield cur, len(chunk)
+
+
+def _get_pos_pool(db_name: Optional[str] = None) -> _ConnectionPool:
+    """POS DB 이름별 커넥션 풀을 반환합니다 (없으면 생성)."""
     import config
     pos_db = db_name or config.POS_DB_NAME
-    pos_config = {**_db_config, "database": pos_db}
-    conn = pymysql.connect(**pos_config)
-    try:
+    with _pos_pools_lock:
+        pool = _pos_pools.get(pos_db)
+        if pool is None:
+            pool = _ConnectionPool(
+                {**_db_config, "database": pos_db},
+                min_size=0,
+                max_size=config.POS_DB_POOL_MAX_SIZE,
+                idle_timeout=config.DB_POOL_IDLE_TIMEOUT,
+                checkout_timeout=config.DB_POOL_CHECKOUT_TIMEOUT,
+            )
+            _pos_pools[pos_db] = pool
+    return pool
+
+
+def _run_on_pos(db_name: Optional[str], work) -> Any:
+    """POS 풀 커넥션으로 작업을 실행합니다 (연결 오류 시 새 커넥션으로 1회 재시도)."""
+    pool = _get_pos_pool(db_name)
+    for attempt in (1, 2):
+        conn = pool.acquire()
+        try:
+            result = work(conn)
+        except pymysql.err.MySQLError as e:
+            if not _is_connection_lost(e):
+                pool.release(conn)
+                raise
+            pool.discard(conn)
+            if attempt == 2:
+                raise
+            print(f"POS DB 연결 끊김, 재연결 후 재시도: {e}")
+            continue
+        except Exception:
+            pool.discard(conn)
+            raise
+        pool.release(conn)
+        return result
+
+
+def _is_connection_lost(error: Exception) -> bool:
+    """연결 자체가 끊긴 오류인지 판별합니다 (재시도 대상)."""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    code = error.args[0] if error.args else None
+    return isinstance(error, pymysql.err.OperationalError) and code in _CONNECTION_LOST_CODES
+
+
+def execute_pos_db(sql: str, params: tuple = (), db_name: Optional[str] = None) -> List[Dict]:
+    """POS 데이터베이스에서 조회합니다 (읽기 전용)."""
+    def work(conn):
         with conn.cursor() as cur:
             cur.execute(sql, params)
             return cur.fetchall()
+    return _run_on_pos(db_name, work)
+
+
+def stream_pos_db(sql: str, params: tuple = (), db_name: Optional[str] = None,
+                  chunk_size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    """POS DB 조회 결과를 서버 측 커서로 chunk_size 행씩 나눠 돌려줍니다 (읽기 전용).
+
+    결과 전체를 메모리에 올리지 않으며, 스트림이 끝날 때까지 POS 커넥션 하나를 점유합니다.
+    중간에 멈추면 남은 결과를 버리기 위해 커넥션을 닫습니다.
+    """
+    pool = _get_pos_pool(db_name)
+    conn = pool.acquire()
+    completed = False
+    try:
+        # 남은 행을 끝까지 읽어 버리는 cursor.close()를 피하려고 with 블록을 쓰지 않는다
+        cur = conn.cursor(pymysql.cursors.SSDictCursor)
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        cur.close()
+        completed = True
     finally:
-        conn.close()
+        if completed:
+            pool.release(conn)
+        else:
+            pool.discard(conn)
 
 
 def write_pos_db(sql: str, params: tuple = (), db_name: Optional[str] = None) -> int:
     """POS 데이터베이스에 INSERT/UPDATE/DELETE를 실행합니다."""
-    import config
-    pos_db = db_name or config.POS_DB_NAME
-    pos_config = {**_db_config, "database": pos_db}
-    conn = pymysql.connect(**pos_config)
-    try:
+    def work(conn):
         with conn.cursor() as cur:
             cur.execute(sql, params)
             conn.commit()
             return cur.rowcount
-    finally:
-        conn.close()
+    return _run_on_pos(db_name, work)
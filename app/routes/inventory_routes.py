@@ -99,15 +99,19 @@ def stock_adjust():
     """재고 조정 (특정 로트)"""
     store = session.get("store")
     inventory_id = request.form.get("inventory_id", type=int)
-    inventory_controller.process_stock_adjust(
-        product_id=int(request.form["product_id"]),
-        store_id=store["id"],
-        new_quantity=float(request.form["new_quantity"]),
-        location=request.form.get("location", "warehouse"),
-        reason=request.form.get("reason", ""),
-        user_id=session["user"]["id"],
-        inventory_id=inventory_id,
-    )
+    try:
+        inventory_controller.process_stock_adjust(
+            product_id=int(request.form["product_id"]),
+            store_id=store["id"],
+            new_quantity=float(request.form["new_quantity"]),
+            location=request.form.get("location", "warehouse"),
+            reason=request.form.get("reason", ""),
+            user_id=session["user"]["id"],
+            inventory_id=inventory_id,
+        )
+    except ValueError as e:
+        flash(f"Stock adjust failed: {e}", "danger")
+        return redirect(url_for("inventory.list_inventory"))
     flash("Stock adjusted successfully", "success")
     return redirect(url_for("inventory.list_inventory"))
 
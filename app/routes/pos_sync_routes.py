@@ -4,7 +4,8 @@ from flask import Blueprint, request, jsonify, session
 import config
 from app.controllers import pos_sync_controller
 from app.controllers.inventory_controller import load_product_lots
-from app.db import fetch_one, fetch_all
+from app.db import fetch_one, fetch_all, get_pool_stats
+from app.services import idempotency_service, pos_inbox_service, pos_sync_scheduler
 
 pos_sync_bp = Blueprint("pos_sync", __name__, url_prefix="/api/pos")
 
@@ -73,6 +74,12 @@ def webhook():
             {"menu_code": "0101", "quantity": 2, "unit_cost": 1000, "reason": "..."}
         ]
     }
+
+    Idempotency-Key 헤더(없으면 pos_record_id)로 중복 수신을 걸러내며,
+    이미 처리된 키는 재고 잠금 없이 {"duplicate": true}로 응답합니다.
+    오류 라인이 있으면 전체를 되돌리고 500으로 응답하므로 POS는 같은 키로 재전송합니다.
+    POS_WEBHOOK_ASYNC가 켜져 있으면 검증 후 stk_pos_inbox에 적재하고 202로 즉시 응답하며,
+    실제 처리는 인박스 워커가 매장별 수신 순서대로 수행합니다.
     """
     if not _verify_api_key():
         return jsonify({"success": False, "error": "Invalid API key"}), 401
@@ -83,86 +90,61 @@ def webhook():
     if not sync_type:
         return jsonify({"success": False, "error": "type required"}), 400
     # ── 백원 POS 타입 처리 (Firebird Bridge) ──────────────
-    if sync_type in ("baekwon_sale", "baekwon_products"):
+    if sync_type in pos_sync_controller.BAEKWON_WEBHOOK_TYPES:
         if not config.BAEKWON_SYNC_ENABLED:
             return jsonify({"success": False, "error": "Baekwon sync disabled"}), 403
-        return _handle_baekwon_webhook(sync_type, data)
+        biz = _resolve_business(data)
+        if not biz.get("business_id"):
+            # business_id가 없으면 기본 비즈니스 사용
+            biz = _resolve_business({})
+        if sync_type == "baekwon_sale_batch" and not data.get("receipts"):
+            return jsonify({"success": False, "error": "receipts required"}), 400
+        print(f"🔶 백원POS Webhook 수신: type={sync_type}, "
+              f"items={len(data.get('items', []))}, receipts={len(data.get('receipts', []))}, "
+              f"biz={biz.get('business_id')}")
     # ── 일반 POS 타입 처리 ──────────────────────────────
-    items = data.get("items", [])
-    if not items:
-        return jsonify({"success": False, "error": "type and items required"}), 400
-    biz = _resolve_business(data)
+    else:
+        if sync_type not in pos_sync_controller.WEBHOOK_TYPES:
+            return jsonify({"success": False, "error": f"Unknown type: {sync_type}"}), 400
+        if not data.get("items", []):
+            return jsonify({"success": False, "error": "type and items required"}), 400
+        biz = _resolve_business(data)
+        print(f"📡 POS Webhook 수신: type={sync_type}, "
+              f"items={len(data['items'])}, biz={biz.get('business_id')}")
     if not biz.get("business_id") or not biz.get("store_id"):
         return jsonify({"success": False, "error": "Business/store not found"}), 404
-    business_id = biz["business_id"]
-    store_id = biz["store_id"]
-    business_type = biz["business_type"]
-    print(f"📡 POS Webhook 수신: type={sync_type}, items={len(items)}, biz={business_id}")
-    if sync_type == "sale":
-        result = pos_sync_controller.handle_sale(
-            business_id, business_type, store_id, items,
-        )
-    elif sync_type == "stock_in":
-        result = pos_sync_controller.handle_stock_in(
-            business_id, store_id, items,
-        )
-    elif sync_type == "loss":
-        result = pos_sync_controller.handle_loss(
-            business_id, store_id, items,
-        )
-    elif sync_type == "product_sync":
-        result = pos_sync_controller.handle_product_sync(
-            business_id, items,
-        )
-    elif sync_type == "store_sync":
-        result = pos_sync_controller.handle_store_sync(
-            business_id, items,
-        )
-    elif sync_type == "employee_sync":
-        result = pos_sync_controller.handle_employee_sync(
-            business_id, items,
-        )
-    elif sync_type == "stock_restore":
-        result = pos_sync_controller.handle_stock_restore(
-            business_id, store_id, items,
+    idempotency_key = pos_sync_controller.webhook_idempotency_key(
+        sync_type, data, request.headers.get("Idempotency-Key", "").strip(),
+    )
+    if idempotency_key and idempotency_service.is_known(biz["business_id"], idempotency_key):
+        print(f"  ⏭️ 중복 Webhook 무시: type={sync_type}, biz={biz['business_id']}")
+        return jsonify({"success": True, "duplicate": True})
+    if config.POS_WEBHOOK_ASYNC:
+        inbox_id = pos_inbox_service.enqueue_webhook(
+            biz["business_id"], biz["business_type"], biz["store_id"], sync_type, data,
+            idempotency_key,
         )
-    else:
-        return jsonify({"success": False, "error": f"Unknown type: {sync_type}"}), 400
-    # 동기화 상세 로그 기록
-    for item in items:
-        menu_code = item.get("menu_code") or item.get("mcode") or item.get("employee_id") or ""
-        quantity = float(item.get("quantity", 0) or 0)
-        pos_record_id = int(item.get("pos_record_id", 0) or 0)
-        status = "success" if result["processed"] > 0 else "skipped"
-        pos_sync_controller.log_sync_detail(
-            business_id, f"webhook_{sync_type}", pos_record_id,
-            sync_type, menu_code, quantity, status,
+        return jsonify({"success": True, "queued": True, "inbox_id": inbox_id}), 202
+    try:
+        result = pos_sync_controller.process_webhook(
+            biz["business_id"], biz["business_type"], biz["store_id"], sync_type, data,
+            idempotency_key,
         )
+    except pos_sync_controller.WebhookFailed as e:
+        # 키를 선점하지 않았으므로 POS가 같은 건을 재전송하면 다시 처리된다
+        return jsonify({"success": False, "error": str(e), "result": e.result}), 500
     return jsonify({"success": True, "result": result})
 
 
-def _handle_baekwon_webhook(sync_type: str, data: dict):
-    """백원 POS (Firebird Bridge) 데이터를 처리합니다."""
-    biz = _resolve_business(data)
-    if not biz.get("business_id"):
-        # business_id가 없으면 기본 비즈니스 사용
-        biz = _resolve_business({})
-    if not biz.get("business_id") or not biz.get("store_id"):
-        return jsonify({"success": False, "error": "Business/store not found"}), 404
-    business_id = biz["business_id"]
-    store_id = biz["store_id"]
-    business_type = biz["business_type"]
-    items = data.get("items", [])
-    print(f"🔶 백원POS Webhook 수신: type={sync_type}, items={len(items)}, biz={business_id}")
-    if sync_type == "baekwon_sale":
-        result = pos_sync_controller.handle_baekwon_sale(
-            business_id, business_type, store_id, data,
-        )
-        return jsonify({"success": True, "result": result})
-    elif sync_type == "baekwon_products":
-        result = pos_sync_controller.handle_baekwon_products(business_id, data)
-        return jsonify({"success": True, "result": result})
-    return jsonify({"success": False, "error": f"Unknown baekwon type: {sync_type}"}), 400
+@pos_sync_bp.route("/inbox/<int:inbox_id>", methods=["GET"])
+def inbox_status(inbox_id: int):
+    """비동기 수신 건(202 응답의 inbox_id)의 처리 상태를 조회합니다."""
+    if not _verify_api_key():
+        return jsonify({"success": False, "error": "Invalid API key"}), 401
+    entry = pos_inbox_service.load_inbox_entry(inbox_id)
+    if not entry:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    return jsonify({"success": True, "data": entry})
 
 
 @pos_sync_bp.route("/sync", methods=["POST"])
@@ -195,9 +177,12 @@ def manual_sync():
         store_id = store["id"] if store else None
     if not store_id:
         return jsonify({"success": False, "error": "Store not found"}), 404
-    result = pos_sync_controller.run_full_sync(
-        business_id, biz["type"], store_id, biz.get("pos_db_name") or "",
-    )
+    with pos_sync_scheduler.business_sync_lock(business_id) as acquired:
+        if not acquired:
+            return jsonify({"success": False, "error": "Sync already running"}), 409
+        result = pos_sync_controller.run_full_sync(
+            business_id, biz["type"], store_id, biz.get("pos_db_name") or "",
+        )
     return jsonify({"success": True, "result": result})
 
 
@@ -214,7 +199,18 @@ def sync_status():
     if not business_id:
         return jsonify({"success": False, "error": "business_id required"}), 400
     status = pos_sync_controller.load_sync_status(business_id)
-    return jsonify({"success": True, "data": status})
+    scheduler = pos_sync_scheduler.load_scheduler_status().get(business_id)
+    return jsonify({"success": True, "data": status, "scheduler": scheduler})
+
+
+@pos_sync_bp.route("/db-pool", methods=["GET"])
+def db_pool_status():
+    """DB 커넥션 풀 상태 조회 (모니터링용)."""
+    if "user" not in session:
+        api_key = request.headers.get("X-API-Key", "")
+        if api_key != config.POS_API_KEY or not api_key:
+            return jsonify({"success": False}), 401
+    return jsonify({"success": True, "data": get_pool_stats()})
 
 
 @pos_sync_bp.route("/lots/<menu_code>", methods=["GET"])
@@ -1,9 +1,11 @@
 """상품 관리 라우트"""
 from io import BytesIO
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from typing import Dict, List
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file, Response, stream_with_context
 from app.routes.dashboard_routes import login_required
 from app.controllers import product_controller, category_controller, supplier_controller
 from app.services.excel_service import generate_product_template, generate_excel_report
+from app.services.csv_export_service import stream_csv
 
 product_bp = Blueprint("product", __name__, url_prefix="/products")
 
@@ -97,18 +99,8 @@ def export_excel():
     """현재 상품 목록을 엑셀로 내보내기"""
     business_id = session["business"]["id"]
     products = product_controller.load_products(business_id, active_only=False)
-    headers = ["Code", "Name", "Barcode", "Category", "Supplier",
-               "Unit", "Buy Price", "Sell Price", "Min Stock", "Max Stock",
-               "Storage Location", "Description"]
-    rows = [
-        [p["code"], p["name"], p.get("barcode", ""),
-         p.get("category_name", "") or "", p.get("supplier_name", "") or "",
-         p["unit"], float(p["unit_price"]), float(p["sell_price"]),
-         float(p["min_stock"]), float(p["max_stock"]) if p.get("max_stock") else "",
-         p.get("storage_location", "") or "", p.get("description", "") or ""]
-        for p in products
-    ]
-    output = generate_excel_report("Products", headers, rows,
+    rows = [_product_export_row(p) for p in products]
+    output = generate_excel_report("Products", PRODUCT_EXPORT_HEADERS, rows,
                                    column_widths=[14, 25, 18, 18, 18, 10, 14, 14, 12, 12, 20, 30])
     print(f"📊 엑셀 내보내기 완료 - {len(products)}개 상품")
     return send_file(
@@ -119,6 +111,34 @@ def export_excel():
     )
 
 
+@product_bp.route("/csv/export")
+@login_required
+def export_csv():
+    """현재 상품 목록을 CSV로 내보내기 (?gzip=1이면 .csv.gz, 서버 측 커서에서 읽는 대로 전송)"""
+    business_id = session["business"]["id"]
+    compress = request.args.get("gzip", "0") == "1"
+    rows = (_product_export_row(p) for p in product_controller.iter_products(business_id, active_only=False))
+    filename = "products_export.csv" + (".gz" if compress else "")
+    return Response(
+        stream_with_context(stream_csv(PRODUCT_EXPORT_HEADERS, rows, compress=compress)),
+        mimetype="application/gzip" if compress else "text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+PRODUCT_EXPORT_HEADERS = ["Code", "Name", "Barcode", "Category", "Supplier",
+                          "Unit", "Buy Price", "Sell Price", "Min Stock", "Max Stock",
+                          "Storage Location", "Description"]
+
+
+def _product_export_row(p: Dict) -> List:
+    return [p["code"], p["name"], p.get("barcode", ""),
+            p.get("category_name", "") or "", p.get("supplier_name", "") or "",
+            p["unit"], float(p["unit_price"]), float(p["sell_price"]),
+            float(p["min_stock"]), float(p["max_stock"]) if p.get("max_stock") else "",
+            p.get("storage_location", "") or "", p.get("description", "") or ""]
+
+
 @product_bp.route("/excel/upload", methods=["POST"])
 @login_required
 def upload_excel():
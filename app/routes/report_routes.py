@@ -1,9 +1,12 @@
 """리포트 라우트"""
 from datetime import date, timedelta
-from flask import Blueprint, render_template, request, session, jsonify, send_file
+from typing import Dict, Iterator, List, Tuple
+from flask import Blueprint, render_template, request, session, jsonify, send_file, url_for, Response, stream_with_context
 from app.routes.dashboard_routes import login_required
 from app.controllers import report_controller, business_controller, inventory_controller
-from app.services.excel_service import generate_excel_report
+from app.services.excel_service import stream_excel_report
+from app.services.csv_export_service import stream_csv
+from app.services import report_job_service
 
 report_bp = Blueprint("report", __name__, url_prefix="/reports")
 
@@ -29,7 +32,7 @@ def purchase_report():
     end = request.args.get("end_date", date.today().isoformat())
     start = request.args.get("start_date", (date.today() - timedelta(days=30)).isoformat())
     data = report_controller.load_purchase_report(business_id, start, end)
-    total = sum(float(r.get("total_amount") or 0) for r in data)
+    total = report_controller.load_order_totals("purchase", business_id, start, end)["total_amount"]
     return render_template("reports/purchases.html", data=data,
                            start_date=start, end_date=end, total=total)
 
@@ -42,7 +45,7 @@ def sales_report():
     end = request.args.get("end_date", date.today().isoformat())
     start = request.args.get("start_date", (date.today() - timedelta(days=30)).isoformat())
     data = report_controller.load_sales_report(business_id, start, end)
-    total = sum(float(r.get("total_amount") or 0) for r in data)
+    total = report_controller.load_order_totals("sale", business_id, start, end)["total_amount"]
     return render_template("reports/sales.html", data=data,
                            start_date=start, end_date=end, total=total)
 
@@ -55,7 +58,7 @@ def wholesale_report():
     end = request.args.get("end_date", date.today().isoformat())
     start = request.args.get("start_date", (date.today() - timedelta(days=30)).isoformat())
     data = report_controller.load_wholesale_report(business_id, start, end)
-    total = sum(float(r.get("final_amount") or 0) for r in data)
+    total = report_controller.load_order_totals("wholesale", business_id, start, end)["final_amount"]
     return render_template("reports/wholesale.html", data=data,
                            start_date=start, end_date=end, total=total)
 
@@ -114,41 +117,167 @@ def export_report(report_type: str):
 @report_bp.route("/excel/<report_type>")
 @login_required
 def download_excel(report_type: str):
-    """엑셀 파일 다운로드"""
-    business_id = session["business"]["id"]
-    end = request.args.get("end_date", date.today().isoformat())
-    start = request.args.get("start_date", (date.today() - timedelta(days=30)).isoformat())
-    if report_type == "inventory":
-        data = report_controller.load_inventory_report(business_id)
-        headers = ["Code", "Product", "Category", "Store", "Unit", "Qty", "Buy Price", "Sell Price", "Value"]
-        rows = [[r.get("code"), r.get("name"), r.get("category_name", ""), r.get("store_name", ""),
-                 r.get("unit"), float(r.get("total_qty", 0)), float(r.get("unit_price", 0)),
-                 float(r.get("sell_price", 0)), float(r.get("stock_value") or 0)] for r in data]
-        title = "Inventory Report"
-    elif report_type == "purchases":
-        data = report_controller.load_purchase_report(business_id, start, end)
-        headers = ["Date", "Number", "Supplier", "Store", "Amount", "Status"]
-        rows = [[str(r.get("purchase_date")), r.get("purchase_number"), r.get("supplier_name", ""),
-                 r.get("store_name"), float(r.get("total_amount", 0)), r.get("status")] for r in data]
-        title = "Purchase Report"
-    elif report_type == "sales":
-        data = report_controller.load_sales_report(business_id, start, end)
-        headers = ["Date", "Number", "Customer", "Store", "Amount", "Status"]
-        rows = [[str(r.get("sale_date")), r.get("sale_number"), r.get("customer_name", ""),
-                 r.get("store_name"), float(r.get("total_amount", 0)), r.get("status")] for r in data]
-        title = "Sales Report"
-    elif report_type == "wholesale":
-        data = report_controller.load_wholesale_report(business_id, start, end)
-        headers = ["Date", "Number", "Client", "Total", "Discount", "Final", "Status"]
-        rows = [[str(r.get("order_date")), r.get("order_number"), r.get("client_name"),
-                 float(r.get("total_amount", 0)), float(r.get("discount_amount", 0)),
-                 float(r.get("final_amount", 0)), r.get("status")] for r in data]
-        title = "Wholesale Report"
-    else:
-        headers = []
-        rows = []
-        title = "Report"
-    output = generate_excel_report(title, headers, rows)
+    """엑셀 파일 다운로드 (서버 측 커서 → write-only 통합 문서 → 조각 단위 응답)"""
+    title, headers, rows = _build_export(report_type, session["business"]["id"], _export_params())
     filename = f"stockmaster_{report_type}_{date.today().isoformat()}.xlsx"
-    return send_file(output, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                     as_attachment=True, download_name=filename)
+    return Response(
+        stream_with_context(stream_excel_report(title, headers, rows)),
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@report_bp.route("/csv/<report_type>")
+@login_required
+def download_csv(report_type: str):
+    """CSV 파일 다운로드 (?gzip=1이면 .csv.gz) — 서버 측 커서에서 읽는 대로 전송"""
+    compress = request.args.get("gzip", "0") == "1"
+    _, headers, rows = _build_export(report_type, session["business"]["id"], _export_params())
+    filename = f"stockmaster_{report_type}_{date.today().isoformat()}.csv" + (".gz" if compress else "")
+    return Response(
+        stream_with_context(stream_csv(headers, rows, compress=compress)),
+        mimetype="application/gzip" if compress else "text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+# ── 백그라운드 리포트 작업 ──
+
+@report_bp.route("/jobs/<report_type>", methods=["POST"])
+@login_required
+def enqueue_report_job(report_type: str):
+    """리포트 생성 작업 등록 (format=xlsx|csv|csv.gz) — 같은 조건의 결과가 캐시에 있으면 바로 완료"""
+    if report_type not in _EXPORTS:
+        return jsonify({"error": f"Unknown report type: {report_type}"}), 404
+    fmt = request.values.get("format", "xlsx")
+    if fmt not in report_job_service.REPORT_FORMATS:
+        return jsonify({"error": f"Unknown format: {fmt}"}), 400
+    business_id = session["business"]["id"]
+    params = _export_params()
+    data_version = report_controller.load_report_data_version(
+        report_type, business_id, params["start_date"], params["end_date"],
+    )
+    job = report_job_service.enqueue_report_job(
+        business_id, report_type, params, fmt,
+        build=lambda: _build_export(report_type, business_id, params),
+        data_version=data_version,
+        total_rows=report_controller.count_report_rows(
+            report_type, business_id, params["start_date"], params["end_date"],
+        ),
+    )
+    return jsonify(_job_response(job)), 202
+
+
+@report_bp.route("/jobs/status/<job_id>")
+@login_required
+def report_job_status(job_id: str):
+    """리포트 작업 진행 상황 (status: queued/running/done/error, rows, progress)"""
+    job = report_job_service.load_job(job_id, session["business"]["id"])
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(_job_response(job))
+
+
+@report_bp.route("/jobs/download/<job_id>")
+@login_required
+def download_report_job(job_id: str):
+    """완료된 리포트 작업 결과 다운로드"""
+    result = report_job_service.load_job_result(job_id, session["business"]["id"])
+    if not result:
+        return jsonify({"error": "Result not ready or expired"}), 404
+    path, filename, mimetype = result
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename)
+
+
+def _job_response(job: Dict) -> Dict:
+    response = dict(job)
+    response["status_url"] = url_for("report.report_job_status", job_id=job["id"])
+    if job["status"] == "done":
+        response["download_url"] = url_for("report.download_report_job", job_id=job["id"])
+    return response
+
+
+def _export_params() -> Dict:
+    """요청 파라미터에서 내보내기 조건을 읽습니다 (작업 캐시 키로도 사용)."""
+    return {
+        "start_date": request.values.get("start_date", (date.today() - timedelta(days=30)).isoformat()),
+        "end_date": request.values.get("end_date", date.today().isoformat()),
+        "store_id": request.values.get("store_id", 0, type=int),
+        "filter_type": request.values.get("filter", "all"),
+    }
+
+
+def _build_export(report_type: str, business_id: int, params: Dict) -> Tuple[str, List[str], Iterator[List]]:
+    """내보낼 리포트의 (제목, 헤더, 행 iterator)를 만듭니다 (행은 지연 조회, 요청 컨텍스트 불필요)."""
+    title, headers, to_row = _EXPORTS.get(report_type, ("Report", [], None))
+    if not to_row:
+        return title, headers, iter(())
+    rows = report_controller.iter_report_rows(
+        report_type, business_id, params["start_date"], params["end_date"],
+        store_id=params["store_id"], filter_type=params["filter_type"],
+    )
+    return title, headers, (to_row(r) for r in rows)
+
+
+def _inventory_export_row(r: Dict) -> List:
+    return [r.get("code"), r.get("name"), r.get("category_name", ""), r.get("store_name", ""),
+            r.get("unit"), float(r.get("total_qty", 0)), float(r.get("unit_price", 0)),
+            float(r.get("sell_price", 0)), float(r.get("stock_value") or 0)]
+
+
+def _purchase_export_row(r: Dict) -> List:
+    return [str(r.get("purchase_date")), r.get("purchase_number"), r.get("supplier_name", ""),
+            r.get("store_name"), float(r.get("total_amount", 0)), r.get("status")]
+
+
+def _sales_export_row(r: Dict) -> List:
+    return [str(r.get("sale_date")), r.get("sale_number"), r.get("customer_name", ""),
+            r.get("store_name"), float(r.get("total_amount", 0)), r.get("status")]
+
+
+def _wholesale_export_row(r: Dict) -> List:
+    return [str(r.get("order_date")), r.get("order_number"), r.get("client_name"),
+            float(r.get("total_amount", 0)), float(r.get("discount_amount", 0)),
+            float(r.get("final_amount", 0)), r.get("status")]
+
+
+def _low_stock_export_row(r: Dict) -> List:
+    return [r.get("code"), r.get("name"), r.get("store_name") or "", r.get("unit"),
+            float(r.get("min_stock") or 0), float(r.get("current_stock") or 0)]
+
+
+def _expiry_export_row(r: Dict) -> List:
+    return [str(r.get("expiry_date")), r.get("days_left"), r.get("product_code"), r.get("product_name"),
+            r.get("category_name") or "", r.get("store_name"), r.get("location") or "",
+            r.get("unit"), float(r.get("quantity") or 0)]
+
+
+def _attachment_export_row(r: Dict) -> List:
+    return [str(r.get("created_at")), r.get("reference_type"), r.get("reference_id"),
+            r.get("file_name"), r.get("file_type"), r.get("file_size"), r.get("memo") or ""]
+
+
+# 리포트 종류 → (제목, 헤더, 행 변환) — 엑셀/CSV 내보내기 공용
+_EXPORTS = {
+    "inventory": ("Inventory Report",
+                  ["Code", "Product", "Category", "Store", "Unit", "Qty", "Buy Price", "Sell Price", "Value"],
+                  _inventory_export_row),
+    "purchases": ("Purchase Report",
+                  ["Date", "Number", "Supplier", "Store", "Amount", "Status"],
+                  _purchase_export_row),
+    "sales": ("Sales Report",
+              ["Date", "Number", "Customer", "Store", "Amount", "Status"],
+              _sales_export_row),
+    "wholesale": ("Wholesale Report",
+                  ["Date", "Number", "Client", "Total", "Discount", "Final", "Status"],
+                  _wholesale_export_row),
+    "low-stock": ("Low Stock Report",
+                  ["Code", "Product", "Store", "Unit", "Min Stock", "Current Stock"],
+                  _low_stock_export_row),
+    "expiry": ("Expiry Report",
+               ["Expiry Date", "Days Left", "Code", "Product", "Category", "Store", "Location", "Unit", "Qty"],
+               _expiry_export_row),
+    "attachments": ("Attachments Report",
+                    ["Uploaded", "Type", "Reference", "File", "MIME", "Size", "Memo"],
+                    _attachment_export_row),
+}
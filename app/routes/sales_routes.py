@@ -128,17 +128,11 @@ def confirm_sale(sale_id: int):
     for inv_id, qty in zip(lot_ids, lot_qtys):
         if inv_id and qty and float(qty) > 0:
             lot_deductions.append({"inventory_id": int(inv_id), "quantity": float(qty)})
-    if lot_deductions:
-        inventory_controller.process_lot_stock_out(
-            lot_deductions=lot_deductions,
-            store_id=store["id"],
-            reason=f"Sale #{sale['sale_number']}",
-            user_id=session["user"]["id"],
-            reference_id=sale_id,
-            reference_type="sale",
-        )
-    from app.db import execute as db_execute
-    db_execute("UPDATE stk_sales SET status = 'confirmed' WHERE id = %s", (sale_id,))
+    if not sales_controller.confirm_sale_lots(
+        sale_id, lot_deductions, store_id=store["id"], user_id=session["user"]["id"],
+    ):
+        flash("Cannot confirm this sale", "danger")
+        return redirect(url_for("sales.view_sale", sale_id=sale_id))
     flash("Sale confirmed - inventory updated", "success")
     return redirect(url_for("sales.view_sale", sale_id=sale_id))
 
@@ -45,24 +45,28 @@ def create_transfer():
         memo = request.form.get("memo", "")
         lot_ids = request.form.getlist("lot_id[]")
         lot_qtys = request.form.getlist("lot_qty[]")
-        items = []
-        for inv_id, qty in zip(lot_ids, lot_qtys):
-            if inv_id and qty and float(qty) > 0:
-                items.append({"inventory_id": int(inv_id), "quantity": float(qty)})
+        items = [
+            {"inventory_id": inv_id, "quantity": qty}
+            for inv_id, qty in zip(lot_ids, lot_qtys) if inv_id and qty
+        ]
         if not items:
             flash("No items selected for transfer", "warning")
             return redirect(url_for("transfer.create_transfer"))
         if from_store_id == to_store_id:
             flash("Source and destination store cannot be the same", "warning")
             return redirect(url_for("transfer.create_transfer"))
-        transfer_id = transfer_controller.create_transfer(
-            business_id=business_id,
-            from_store_id=from_store_id,
-            to_store_id=to_store_id,
-            items=items,
-            user_id=session["user"]["id"],
-            memo=memo,
-        )
+        try:
+            transfer_id = transfer_controller.create_transfer(
+                business_id=business_id,
+                from_store_id=from_store_id,
+                to_store_id=to_store_id,
+                items=items,
+                user_id=session["user"]["id"],
+                memo=memo,
+            )
+        except ValueError:
+            flash("No valid items selected for transfer", "warning")
+            return redirect(url_for("transfer.create_transfer"))
         flash("Transfer created successfully", "success")
         return redirect(url_for("transfer.detail_transfer", transfer_id=transfer_id))
     return render_template(
@@ -0,0 +1,171 @@
+"""상품/레시피 조회 캐시 (프로세스 내)
+
+POS 판매 경로는 품목마다 mcode → 상품, 상품 → 레시피(원재료 포함)를 조회한다.
+비즈니스별로 활성 상품 전체와 활성 레시피 전체를 한 번에 읽어 메모리에 두고,
+이후 조회는 DB를 거치지 않는다.
+
+상품/레시피를 바꾸는 경로(POS 상품 동기화, 상품/레시피 저장·수정·삭제,
+엑셀 가져오기)에서 invalidate_products()/invalidate_recipes()를 호출한다.
+다른 프로세스에서 바뀐 내용은 CATALOG_CACHE_TTL이 지나면 다시 읽으며,
+캐시에 없는 mcode는 "없음"으로 판정하기 전에 DB에서 한 번 더 확인한다.
+DB에도 없던 mcode(POS에만 있는 코드)는 CATALOG_MISS_TTL 동안 "없음"으로 기억해
+판매 라인마다 DB를 다시 조회하지 않는다 (invalidate_products()가 함께 비운다).
+
+반환되는 dict는 캐시와 공유되므로 호출하는 쪽에서 수정하지 않는다.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+from app.db import fetch_all, on_commit
+
+# business_id → (로드 시각, 데이터)
+_products: Dict[int, Tuple[float, Dict[str, Dict]]] = {}
+_recipes: Dict[int, Tuple[float, Dict[str, Dict]]] = {}
+# business_id → {DB에도 없던 mcode → 확인 시각}
+_missing: Dict[int, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def get_product_by_code(business_id: int, code: str) -> Optional[Dict]:
+    """mcode로 활성 상품을 조회합니다."""
+    return get_products_by_codes(business_id, [code]).get(code)
+
+
+def get_products_by_codes(business_id: int, codes: Iterable[str]) -> Dict[str, Dict]:
+    """여러 mcode를 한 번에 조회합니다 (찾은 코드만 포함).
+
+    캐시에 없는 코드는 DB에서 한 번 더 확인합니다 (다른 프로세스가 방금 만든 상품).
+    최근에 DB에서도 없었던 코드는 다시 확인하지 않습니다.
+    """
+    products = _load_products(business_id)
+    codes = set(codes)
+    found = {code: products[code] for code in codes if code in products}
+    missing = _not_recently_missed(business_id, codes - set(found))
+    if missing:
+        fetched = _fetch_products(business_id, missing, products)
+        _remember_missed(business_id, missing - set(fetched))
+        found.update(fetched)
+    return found
+
+
+def get_recipe_for_product(business_id: int, product: Dict) -> Optional[Dict]:
+    """상품에 연결된 활성 레시피(원재료 포함)를 조회합니다.
+
+    pos_menu_id = 상품 ID인 레시피를 우선하고, 없으면 상품명과 같은 이름의 레시피.
+    """
+    recipes = _load_recipes(business_id)
+    return recipes["by_menu_id"].get(product["id"]) or recipes["by_name"].get(product["name"])
+
+
+def invalidate_products(business_id: int) -> None:
+    """커밋 후 사업장의 상품 캐시("없음" 기록 포함)를 비웁니다."""
+    on_commit(lambda: _evict_products(business_id))
+
+
+def invalidate_recipes(business_id: int) -> None:
+    """커밋 후 사업장의 레시피 캐시를 비웁니다."""
+    on_commit(lambda: _evict(_recipes, business_id))
+
+
+def _evict(cache: Dict, business_id: int) -> None:
+    with _lock:
+        cache.pop(business_id, None)
+
+
+def _evict_products(business_id: int) -> None:
+    with _lock:
+        _products.pop(business_id, None)
+        _missing.pop(business_id, None)
+
+
+def _is_fresh(entry: Optional[Tuple[float, Dict]]) -> bool:
+    import config
+    return entry is not None and time.monotonic() - entry[0] < config.CATALOG_CACHE_TTL
+
+
+def _load_products(business_id: int) -> Dict[str, Dict]:
+    with _lock:
+        entry = _products.get(business_id)
+    if _is_fresh(entry):
+        return entry[1]
+    rows = fetch_all(
+        "SELECT id, code, name, unit, sell_price, unit_price FROM stk_products "
+        "WHERE business_id = %s AND is_active = 1",
+        (business_id,),
+    )
+    products = {row["code"]: row for row in rows if row["code"]}
+    with _lock:
+        _products[business_id] = (time.monotonic(), products)
+    return products
+
+
+def _fetch_products(business_id: int, codes: Set[str], products: Dict[str, Dict]) -> Dict[str, Dict]:
+    """캐시에 없던 코드를 DB에서 조회해 캐시에 더하고 찾은 상품을 반환합니다."""
+    placeholders = ", ".join(["%s"] * len(codes))
+    rows = fetch_all(
+        f"SELECT id, code, name, unit, sell_price, unit_price FROM stk_products "
+        f"WHERE business_id = %s AND is_active = 1 AND code IN ({placeholders})",
+        (business_id, *codes),
+    )
+    found = {row["code"]: row for row in rows}
+    if found:
+        with _lock:
+            products.update(found)
+    return found
+
+
+def _not_recently_missed(business_id: int, codes: Set[str]) -> Set[str]:
+    """CATALOG_MISS_TTL 안에 DB에서 없음으로 확인한 코드를 뺍니다."""
+    import config
+    if not codes:
+        return codes
+    now = time.monotonic()
+    with _lock:
+        missed = _missing.get(business_id, {})
+        return {code for code in codes
+                if code not in missed or now - missed[code] >= config.CATALOG_MISS_TTL}
+
+
+def _remember_missed(business_id: int, codes: Set[str]) -> None:
+    import config
+    if not codes:
+        return
+    now = time.monotonic()
+    with _lock:
+        missed = _missing.setdefault(business_id, {})
+        # 오래된 기록은 여기서 정리해 POS 코드가 계속 바뀌어도 무한히 쌓이지 않게 한다
+        for code in [c for c, at in missed.items() if now - at >= config.CATALOG_MISS_TTL]:
+            del missed[code]
+        missed.update((code, now) for code in codes)
+
+
+def _load_recipes(business_id: int) -> Dict[str, Dict]:
+    with _lock:
+        entry = _recipes.get(business_id)
+    if _is_fresh(entry):
+        return entry[1]
+    recipes = fetch_all(
+        "SELECT id, name, pos_menu_id FROM stk_recipes "
+        "WHERE business_id = %s AND is_active = 1 ORDER BY id",
+        (business_id,),
+    )
+    by_id = {}
+    for recipe in recipes:
+        recipe["ingredients"] = []
+        by_id[recipe["id"]] = recipe
+    if by_id:
+        placeholders = ", ".join(["%s"] * len(by_id))
+        for item in fetch_all(
+            f"SELECT recipe_id, product_id, quantity FROM stk_recipe_items "
+            f"WHERE recipe_id IN ({placeholders})",
+            tuple(by_id),
+        ):
+            by_id[item["recipe_id"]]["ingredients"].append(item)
+    data = {"by_menu_id": {}, "by_name": {}}
+    for recipe in recipes:
+        if recipe["pos_menu_id"]:
+            data["by_menu_id"].setdefault(recipe["pos_menu_id"], recipe)
+        data["by_name"].setdefault(recipe["name"], recipe)
+    with _lock:
+        _recipes[business_id] = (time.monotonic(), data)
+    return data
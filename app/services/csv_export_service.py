@@ -0,0 +1,47 @@
+"""CSV 내보내기 서비스 (스트리밍)
+
+행 iterator를 받아 CSV 바이트 조각을 만든다 (선택적으로 gzip 압축). 행을 모아 두지 않고
+CSV_STREAM_CHUNK_SIZE만큼 쌓일 때마다 내보내므로 행 수와 관계없이 메모리 사용량이 일정하다.
+DB 서버 측 커서(stream_all)와 함께 쓰면 조회하는 동안 바로 전송이 시작된다.
+
+사용 예:
+    from app.services.csv_export_service import stream_csv
+
+    rows = (to_row(r) for r in report_controller.iter_report_rows("sales", business_id, start, end))
+    return Response(stream_with_context(stream_csv(headers, rows, compress=True)),
+                    mimetype="application/gzip")
+"""
+import csv
+import io
+import zlib
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+CSV_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_csv(headers: List[str], rows: Iterable[Sequence], compress: bool = False) -> Iterator[bytes]:
+    """헤더와 행들을 UTF-8 CSV 바이트 조각으로 돌려줍니다 (compress=True면 gzip 스트림)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # wbits=31: zlib 대신 gzip 헤더/트레일러를 붙인다
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_STREAM_CHUNK_SIZE:
+            chunk = _drain(buffer, compressor)
+            if chunk:
+                yield chunk
+    chunk = _drain(buffer, compressor)
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def _drain(buffer: io.StringIO, compressor: Optional[Any]) -> bytes:
+    """버퍼에 쌓인 CSV를 꺼내 (압축해) 반환하고 버퍼를 비웁니다."""
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate(0)
+    return compressor.compress(data) if compressor else data
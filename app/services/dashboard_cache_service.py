@@ -0,0 +1,85 @@
+"""대시보드 위젯 캐시 (프로세스 내)
+
+대시보드는 직원 브라우저마다 자주 새로고침되며 열 개 가까운 집계 쿼리를 실행한다.
+위젯을 묶음(group)별로 (business_id, 범위, 묶음) 키에 DASHBOARD_CACHE_TTL 동안 둔다.
+범위는 매장 ID이며 본점(전체) 화면과 매장 구분이 없는 위젯은 0이다.
+
+쓰기 경로가 같은 트랜잭션에서 invalidate_stores()/invalidate_business()를 호출하면
+커밋 후 해당 매장 범위와 본점 범위의 묶음만 지운다.
+    - 재고 합계 변경(inventory_totals_service) → "inventory", "store_inventory"
+    - 매장 간 이동 생성/상태 변경(transfer_controller) → "transfers"
+    - POS 동기화 로그/체크포인트(pos_sync_controller) → "sync"
+상품 정보 변경처럼 훅이 없는 변경은 TTL이 지나면 반영된다.
+
+반환되는 값은 캐시와 공유되므로 호출하는 쪽에서 수정하지 않는다.
+
+사용 예:
+    from app.services import dashboard_cache_service
+
+    summary = dashboard_cache_service.get_widget(
+        business_id, store_id, "inventory", lambda: load_inventory_summary(business_id, store_id),
+    )
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from app.db import fetch_all, on_commit
+
+# (business_id, 범위, 묶음) → (로드 시각, 값)
+_cache: Dict[Tuple[int, int, str], Tuple[float, Any]] = {}
+_store_business: Dict[int, int] = {}  # 매장 → 사업장 (본점 범위를 찾기 위해)
+_lock = threading.Lock()
+
+
+def get_widget(business_id: int, scope: Optional[int], group: str, loader: Callable[[], Any]) -> Any:
+    """캐시된 위젯 묶음을 반환합니다 (없거나 만료되면 loader로 읽어 저장)."""
+    key = (business_id, scope or 0, group)
+    with _lock:
+        entry = _cache.get(key)
+    if _is_fresh(entry):
+        return entry[1]
+    value = loader()
+    with _lock:
+        _cache[key] = (time.monotonic(), value)
+    return value
+
+
+def invalidate_stores(store_ids: Iterable[int], *groups: str) -> None:
+    """커밋 후 매장들의 묶음과 그 사업장 본점 범위의 묶음을 지웁니다."""
+    store_ids = {int(store_id) for store_id in store_ids if store_id}
+    if store_ids:
+        on_commit(lambda: _evict_stores(store_ids, groups))
+
+
+def invalidate_business(business_id: int, *groups: str) -> None:
+    """커밋 후 사업장의 모든 범위에서 묶음을 지웁니다."""
+    on_commit(lambda: _evict(lambda key: key[0] == business_id and key[2] in groups))
+
+
+def _evict_stores(store_ids: set, groups: Tuple[str, ...]) -> None:
+    with _lock:
+        unknown = [store_id for store_id in store_ids if store_id not in _store_business]
+    if unknown:
+        placeholders = ", ".join(["%s"] * len(unknown))
+        rows = fetch_all(
+            f"SELECT id, business_id FROM stk_stores WHERE id IN ({placeholders})",
+            tuple(unknown),
+        )
+        with _lock:
+            _store_business.update({row["id"]: row["business_id"] for row in rows})
+    with _lock:
+        businesses = {_store_business[store_id] for store_id in store_ids if store_id in _store_business}
+    _evict(lambda key: key[2] in groups and (
+        key[1] in store_ids or (key[1] == 0 and key[0] in businesses)
+    ))
+
+
+def _evict(match: Callable[[Tuple[int, int, str]], bool]) -> None:
+    with _lock:
+        for key in [key for key in _cache if match(key)]:
+            del _cache[key]
+
+
+def _is_fresh(entry: Optional[Tuple[float, Any]]) -> bool:
+    import config
+    return entry is not None and time.monotonic() - entry[0] < config.DASHBOARD_CACHE_TTL
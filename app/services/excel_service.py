@@ -1,8 +1,10 @@
 """엑셀 내보내기/가져오기 서비스"""
-from typing import List, Dict, Tuple
+import tempfile
+from typing import List, Dict, Iterable, Iterator, Sequence, Tuple
 from io import BytesIO
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 
@@ -14,6 +16,8 @@ THIN_BORDER = Border(
     top=Side(style="thin"), bottom=Side(style="thin"),
 )
 
+EXCEL_STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def generate_excel_report(title: str, headers: List[str], rows: List[List],
                           column_widths: List[int] = None) -> BytesIO:
@@ -31,6 +35,55 @@ def generate_excel_report(title: str, headers: List[str], rows: List[List],
     return output
 
 
+def stream_excel_report(title: str, headers: List[str], rows: Iterable[Sequence],
+                        column_widths: List[int] = None) -> Iterator[bytes]:
+    """write-only 모드로 엑셀 리포트를 만들어 바이트 조각으로 돌려줍니다.
+
+    행은 받는 즉시 시트 임시 파일에 기록되고, 완성된 xlsx도 임시 파일에서
+    EXCEL_STREAM_CHUNK_SIZE씩 읽어 보내므로 행 수와 관계없이 메모리 사용량이 일정합니다.
+    xlsx는 zip 파일이라 마지막 행까지 기록한 뒤에 첫 조각이 나갑니다.
+    """
+    workbook = Workbook(write_only=True)
+    for style in _named_styles():
+        workbook.add_named_style(style)
+    sheet = workbook.create_sheet(title[:31])
+    # write-only 시트는 행을 쓰기 전에 열 너비를 정해야 한다
+    _set_column_widths(sheet, headers, column_widths)
+    sheet.append([_styled_cell(sheet, title, "report_title")])
+    sheet.append([_styled_cell(sheet, header, "report_header") for header in headers])
+    for row_data in rows:
+        sheet.append([
+            _styled_cell(sheet, value, "report_number" if isinstance(value, (int, float)) else "report_cell")
+            for value in row_data
+        ])
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(EXCEL_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _named_styles() -> List[NamedStyle]:
+    """스트리밍 리포트용 이름 있는 스타일 (셀마다 서식을 복사하지 않고 이름으로 참조)."""
+    return [
+        NamedStyle(name="report_title", font=Font(bold=True, size=14)),
+        NamedStyle(name="report_header", font=HEADER_FONT, fill=HEADER_FILL,
+                   alignment=HEADER_ALIGNMENT, border=THIN_BORDER),
+        NamedStyle(name="report_cell", border=THIN_BORDER),
+        NamedStyle(name="report_number", border=THIN_BORDER, number_format="#,##0.00"),
+    ]
+
+
+def _styled_cell(sheet, value, style: str) -> WriteOnlyCell:
+    """write-only 시트용 셀을 만들고 이름 있는 스타일을 적용합니다."""
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.style = style
+    return cell
+
+
 def _write_title_row(sheet, title: str) -> None:
     """제목 행을 작성합니다."""
     sheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=1)
@@ -65,7 +118,7 @@ def _set_column_widths(sheet, headers: List[str], widths: List[int] = None) -> N
             width = widths[col_idx - 1]
         else:
             width = max(len(str(header)) + 4, 12)
-        sheet.column_dimensions[chr(64 + col_idx) if col_idx <= 26 else "A"].width = width
+        sheet.column_dimensions[get_column_letter(col_idx)].width = width
 
 
 # ── 엑셀 가져오기 (Import) ──
@@ -0,0 +1,115 @@
+"""POS 중복 수신 방지 (Idempotency Key)
+
+Webhook 재전송이나 폴링 중복 실행으로 같은 거래가 두 번 차감되지 않도록
+키 단위로 선점(claim)한다. stk_pos_idempotency의 UNIQUE(business_id, idem_key)가
+최종 판정이며, 앞단의 메모리 LRU가 이미 처리된 키를 DB 조회 없이 걸러낸다.
+
+선점은 호출한 쪽 트랜잭션 안에서 INSERT IGNORE로 이루어지므로, 처리 중 예외로
+트랜잭션이 롤백되면 키도 함께 풀려 재전송 시 다시 처리된다.
+
+사용 예:
+    from app.services import idempotency_service
+
+    key = idempotency_service.make_key("sale:1234")
+    with transaction():
+        if not idempotency_service.claim(business_id, "sale", key):
+            return  # 이미 처리된 건
+        ...재고 처리...
+"""
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Set, Tuple
+from app.db import fetch_one, fetch_all, execute, execute_many, on_commit
+
+_cache: "OrderedDict[Tuple[int, str], None]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def make_key(raw: str) -> str:
+    """원본 키 문자열을 고정 길이(sha256 hex) 키로 변환합니다."""
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_known(business_id: int, key: str) -> bool:
+    """이미 처리된 키인지 확인합니다 (LRU 우선, 없으면 UNIQUE 인덱스 조회)."""
+    if _cache_hit(business_id, key):
+        return True
+    row = fetch_one(
+        "SELECT 1 AS hit FROM stk_pos_idempotency WHERE business_id = %s AND idem_key = %s",
+        (business_id, key),
+    )
+    if row:
+        _remember(business_id, [key])
+        return True
+    return False
+
+
+def claim(business_id: int, scope: str, key: str) -> bool:
+    """키를 선점합니다. 처음 보는 키면 True, 이미 처리된 키면 False."""
+    return key in claim_many(business_id, scope, [key])
+
+
+def claim_many(business_id: int, scope: str, keys: Iterable[str]) -> Set[str]:
+    """여러 키를 다중 행 INSERT IGNORE 한 번으로 선점하고, 새로 선점한 키 집합을 반환합니다."""
+    candidates = [k for k in dict.fromkeys(keys) if not _cache_hit(business_id, k)]
+    if not candidates:
+        return set()
+    token = uuid.uuid4().hex
+    execute_many(
+        "INSERT IGNORE INTO stk_pos_idempotency (business_id, idem_key, scope, claim_token) "
+        "VALUES (%s, %s, %s, %s)",
+        [(business_id, k, scope, token) for k in candidates],
+    )
+    placeholders = ", ".join(["%s"] * len(candidates))
+    claimed = {
+        row["idem_key"]
+        for row in fetch_all(
+            f"SELECT idem_key FROM stk_pos_idempotency "
+            f"WHERE business_id = %s AND claim_token = %s AND idem_key IN ({placeholders})",
+            (business_id, token, *candidates),
+        )
+    }
+    # 다른 쪽이 선점한 키는 이미 커밋된 것(UNIQUE 잠금 대기 후 판정)이므로 바로 캐시
+    _remember(business_id, [k for k in candidates if k not in claimed])
+    on_commit(lambda: _remember(business_id, claimed))
+    return claimed
+
+
+def release_many(business_id: int, keys: Iterable[str]) -> None:
+    """선점한 키를 풀어 다음 실행에서 다시 처리되게 합니다 (처리에 실패한 건, 선점과 같은 트랜잭션에서 호출)."""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return
+    placeholders = ", ".join(["%s"] * len(keys))
+    execute(
+        f"DELETE FROM stk_pos_idempotency WHERE business_id = %s AND idem_key IN ({placeholders})",
+        (business_id, *keys),
+    )
+    # claim_many가 등록한 캐시 기록보다 뒤에 실행되어 풀린 키를 캐시에서 지운다
+    on_commit(lambda: _forget(business_id, keys))
+
+
+def _cache_hit(business_id: int, key: str) -> bool:
+    with _cache_lock:
+        if (business_id, key) in _cache:
+            _cache.move_to_end((business_id, key))
+            return True
+    return False
+
+
+def _forget(business_id: int, keys: Iterable[str]) -> None:
+    with _cache_lock:
+        for key in keys:
+            _cache.pop((business_id, key), None)
+
+
+def _remember(business_id: int, keys: Iterable[str]) -> None:
+    import config
+    with _cache_lock:
+        for key in keys:
+            _cache[(business_id, key)] = None
+            _cache.move_to_end((business_id, key))
+        while len(_cache) > config.POS_IDEMPOTENCY_CACHE_SIZE:
+            _cache.popitem(last=False)
@@ -0,0 +1,100 @@
+"""상품/매장/위치별 재고 합계 (stk_inventory_totals)
+
+재고 합계가 필요한 화면과 POS write-back이 매번 stk_inventory의 로트를 SUM하지
+않도록, 로트 수량을 바꾸는 쪽이 같은 트랜잭션에서 apply_deltas()로
+(product_id, store_id, location) 합계에 증감분을 더한다. 합계 조회는
+PRIMARY KEY (product_id, store_id, location) 점 조회가 된다.
+
+어긋난 합계는 database/run_migrate_inventory_totals.py --rebuild로 로트에서
+다시 만들고, --verify로 로트 합계와 비교한다.
+
+사용 예:
+    from app.services import inventory_totals_service
+
+    with transaction():
+        execute("UPDATE stk_inventory SET quantity = quantity - %s WHERE id = %s", (qty, lot_id))
+        inventory_totals_service.apply_lot_deltas([(lot_id, -qty)])
+"""
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+from app.db import BATCH_SIZE, fetch_all, fetch_one, execute
+from app.services import dashboard_cache_service
+
+_Key = Tuple[int, int, str]  # (product_id, store_id, location)
+
+
+def apply_deltas(deltas: Iterable[Tuple[int, int, str, float]]) -> None:
+    """(product_id, store_id, location, 증감량) 목록을 합계에 반영합니다.
+
+    키별로 합산해 정렬된 순서로 다중 행 upsert 하므로 동시에 반영하는
+    트랜잭션끼리 교착 상태가 생기지 않습니다.
+    """
+    totals: Dict[_Key, float] = {}
+    for product_id, store_id, location, delta in deltas:
+        key = (int(product_id), int(store_id), location or "")
+        totals[key] = totals.get(key, 0.0) + float(delta)
+    keys = sorted(key for key, delta in totals.items() if delta)
+    for start in range(0, len(keys), BATCH_SIZE):
+        chunk = keys[start:start + BATCH_SIZE]
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+        params = [v for key in chunk for v in (*key, totals[key])]
+        execute(
+            f"INSERT INTO stk_inventory_totals (product_id, store_id, location, qty) "
+            f"VALUES {values} "
+            f"ON DUPLICATE KEY UPDATE qty = qty + VALUES(qty)",
+            tuple(params),
+        )
+    dashboard_cache_service.invalidate_stores(
+        {key[1] for key in keys}, "inventory", "store_inventory",
+    )
+
+
+def apply_lot_deltas(lot_deltas: Iterable[Tuple[int, float]]) -> None:
+    """로트 ID 기준 (inventory_id, 증감량) 목록을 합계에 반영합니다 (로트 키는 한 번에 조회)."""
+    by_lot: Dict[int, float] = {}
+    for inventory_id, delta in lot_deltas:
+        by_lot[int(inventory_id)] = by_lot.get(int(inventory_id), 0.0) + float(delta)
+    if not by_lot:
+        return
+    placeholders = ", ".join(["%s"] * len(by_lot))
+    lots = fetch_all(
+        f"SELECT id, product_id, store_id, location FROM stk_inventory WHERE id IN ({placeholders})",
+        tuple(by_lot),
+    )
+    apply_deltas(
+        (lot["product_id"], lot["store_id"], lot["location"], by_lot[lot["id"]]) for lot in lots
+    )
+
+
+def get_product_total(product_id: int, store_id: int = 0) -> Decimal:
+    """상품 재고 합계 (store_id가 있으면 해당 매장, 없으면 전 매장)."""
+    if store_id:
+        row = fetch_one(
+            "SELECT COALESCE(SUM(qty), 0) AS total FROM stk_inventory_totals "
+            "WHERE product_id = %s AND store_id = %s",
+            (product_id, store_id),
+        )
+    else:
+        row = fetch_one(
+            "SELECT COALESCE(SUM(qty), 0) AS total FROM stk_inventory_totals "
+            "WHERE product_id = %s",
+            (product_id,),
+        )
+    return Decimal(str(row["total"])) if row else Decimal("0")
+
+
+def load_product_store_totals(pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Decimal]:
+    """(product_id, store_id) 쌍별 재고 합계를 한 번에 조회합니다 (없는 쌍은 제외)."""
+    pairs = sorted(set(pairs))
+    totals: Dict[Tuple[int, int], Decimal] = {}
+    for start in range(0, len(pairs), BATCH_SIZE):
+        chunk: List[Tuple[int, int]] = pairs[start:start + BATCH_SIZE]
+        placeholders = ", ".join(["(%s, %s)"] * len(chunk))
+        for row in fetch_all(
+            f"SELECT product_id, store_id, SUM(qty) AS total_qty FROM stk_inventory_totals "
+            f"WHERE (product_id, store_id) IN ({placeholders}) "
+            f"GROUP BY product_id, store_id",
+            tuple(v for pair in chunk for v in pair),
+        ):
+            totals[(row["product_id"], row["store_id"])] = row["total_qty"]
+    return totals
@@ -0,0 +1,194 @@
+"""POS Webhook 인박스 (비동기 수신)
+
+POS_WEBHOOK_ASYNC 모드에서는 Webhook이 페이로드를 stk_pos_inbox에 적재만 하고
+202로 응답한다. 워커 풀이 인박스를 비우며, 같은 매장의 건은 한 번에 한 워커만
+수신 순서(id)대로 처리하고 다른 매장은 병렬로 처리한다.
+
+상태: pending → processing → done | error
+processing으로 바꿀 때 locked_at/locked_by(프로세스 토큰)를 남기며, 처리 도중 프로세스가
+종료되어 POS_INBOX_LEASE초가 지나도록 processing인 건만 pending으로 되돌려 다시 처리한다.
+다른 프로세스가 처리 중인 건은 임대 시간 안에는 건드리지 않는다.
+처리에 실패한 건(교착 상태, 잠금 대기 초과 등)은 POS가 이미 202를 받아 재전송하지 않으므로
+next_attempt_at까지 대기(POS_INBOX_RETRY_DELAY초부터 두 배씩)한 뒤 pending으로 다시 처리하고,
+POS_INBOX_MAX_ATTEMPTS번 시도해도 실패하면 error로 남긴다. 대기 중인 건이 있는 매장은
+수신 순서를 지키기 위해 그 건을 처리할 때까지 뒤의 건도 처리하지 않는다.
+"""
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set
+from flask import Flask
+from app.db import fetch_one, fetch_all, insert, execute
+
+_app: Optional[Flask] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_busy_stores: Set[int] = set()
+_lock = threading.Lock()
+_wake = threading.Event()
+_owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def init_pos_inbox(application: Flask) -> None:
+    """인박스 워커를 시작합니다 (POS_WEBHOOK_ASYNC가 꺼져 있으면 아무 것도 하지 않음)."""
+    import config
+    global _app, _executor
+    if not config.POS_WEBHOOK_ASYNC or _executor is not None:
+        return
+    _app = application
+    with application.app_context():
+        _recover_expired(config.POS_INBOX_LEASE)
+    _executor = ThreadPoolExecutor(
+        max_workers=max(1, config.POS_INBOX_WORKERS), thread_name_prefix="pos-inbox",
+    )
+    threading.Thread(
+        target=_dispatch_loop, args=(config.POS_INBOX_POLL_INTERVAL,),
+        name="pos-inbox-dispatch", daemon=True,
+    ).start()
+    print(f"  [POS 인박스] 워커 {config.POS_INBOX_WORKERS}개 시작")
+
+
+def enqueue_webhook(business_id: int, business_type: str, store_id: int,
+                    sync_type: str, data: Dict,
+                    idempotency_key: Optional[str] = None) -> int:
+    """Webhook 페이로드를 인박스에 적재하고 ID를 반환합니다."""
+    inbox_id = insert(
+        "INSERT INTO stk_pos_inbox "
+        "(business_id, business_type, store_id, sync_type, payload, idempotency_key) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        (business_id, business_type, store_id, sync_type,
+         json.dumps(data, ensure_ascii=False), idempotency_key),
+    )
+    _wake.set()
+    return inbox_id
+
+
+def load_inbox_entry(inbox_id: int) -> Optional[Dict]:
+    """인박스 건의 처리 상태를 조회합니다."""
+    entry = fetch_one(
+        "SELECT id, business_id, store_id, sync_type, status, attempts, "
+        "result, error_message, received_at, processed_at "
+        "FROM stk_pos_inbox WHERE id = %s",
+        (inbox_id,),
+    )
+    if entry and entry["result"]:
+        entry["result"] = json.loads(entry["result"])
+    return entry
+
+
+def _recover_expired(lease: float) -> None:
+    """임대 시간이 지난 processing 건을 pending으로 되돌립니다 (처리하던 프로세스가 종료된 건)."""
+    try:
+        recovered = execute(
+            "UPDATE stk_pos_inbox SET status = 'pending', locked_at = NULL, locked_by = NULL "
+            "WHERE status = 'processing' AND locked_at < NOW() - INTERVAL %s SECOND",
+            (int(lease),),
+        )
+    except Exception as e:
+        print(f"⚠️ POS 인박스 복구 실패: {e}")
+        return
+    if recovered:
+        print(f"  [POS 인박스] 임대 만료된 {recovered}건을 pending으로 복구")
+
+
+def _dispatch_loop(poll_interval: float) -> None:
+    """대기 중인 매장마다 워커를 하나씩 배정합니다 (다른 프로세스 적재분은 주기적으로 확인)."""
+    import config
+    while True:
+        _wake.wait(poll_interval)
+        _wake.clear()
+        try:
+            with _app.app_context():
+                _recover_expired(config.POS_INBOX_LEASE)
+                rows = fetch_all(
+                    "SELECT DISTINCT store_id FROM stk_pos_inbox WHERE status = 'pending' "
+                    "AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())"
+                )
+        except Exception as e:
+            print(f"⚠️ POS 인박스 조회 실패: {e}")
+            continue
+        for row in rows:
+            store_id = row["store_id"]
+            with _lock:
+                if store_id in _busy_stores:
+                    continue
+                _busy_stores.add(store_id)
+            _executor.submit(_drain_store, store_id)
+
+
+def _drain_store(store_id: int) -> None:
+    """한 매장의 pending 건을 id 순서대로 처리합니다 (재시도 대기 중인 건을 만나면 중단)."""
+    waiting = False
+    try:
+        with _app.app_context():
+            while True:
+                entry = fetch_one(
+                    "SELECT id, next_attempt_at IS NULL OR next_attempt_at <= NOW() AS due "
+                    "FROM stk_pos_inbox "
+                    "WHERE store_id = %s AND status = 'pending' ORDER BY id LIMIT 1",
+                    (store_id,),
+                )
+                if not entry:
+                    break
+                if not entry["due"]:
+                    waiting = True
+                    break
+                _process_entry(entry["id"])
+    except Exception as e:
+        print(f"⚠️ POS 인박스 처리 중단 (store={store_id}): {e}")
+    finally:
+        with _lock:
+            _busy_stores.discard(store_id)
+        # 처리하는 동안 새로 들어온 건이 있을 수 있으므로 다시 확인 (재시도 대기 중이면 다음 주기에)
+        if not waiting:
+            _wake.set()
+
+
+def _process_entry(inbox_id: int) -> None:
+    import config
+    from app.controllers.pos_sync_controller import process_webhook
+    claimed = execute(
+        "UPDATE stk_pos_inbox SET status = 'processing', attempts = attempts + 1, "
+        "locked_at = NOW(), locked_by = %s "
+        "WHERE id = %s AND status = 'pending'",
+        (_owner, inbox_id),
+    )
+    if not claimed:
+        return
+    entry = fetch_one(
+        "SELECT business_id, business_type, store_id, sync_type, payload, idempotency_key, attempts "
+        "FROM stk_pos_inbox WHERE id = %s",
+        (inbox_id,),
+    )
+    try:
+        result = process_webhook(
+            entry["business_id"], entry["business_type"], entry["store_id"],
+            entry["sync_type"], json.loads(entry["payload"]), entry["idempotency_key"],
+        )
+    except Exception as e:
+        attempts = entry["attempts"]
+        if attempts < config.POS_INBOX_MAX_ATTEMPTS:
+            delay = config.POS_INBOX_RETRY_DELAY * 2 ** (attempts - 1)
+            print(f"⚠️ POS 인박스 #{inbox_id} 처리 실패 ({attempts}/{config.POS_INBOX_MAX_ATTEMPTS}회) "
+                  f"- {delay:.0f}초 후 재시도: {e}")
+            execute(
+                "UPDATE stk_pos_inbox SET status = 'pending', error_message = %s, "
+                "next_attempt_at = NOW() + INTERVAL %s SECOND, locked_at = NULL, locked_by = NULL "
+                "WHERE id = %s AND locked_by = %s",
+                (str(e)[:1000], int(delay), inbox_id, _owner),
+            )
+            return
+        print(f"❌ POS 인박스 #{inbox_id} 처리 실패 ({attempts}회 시도): {e}")
+        execute(
+            "UPDATE stk_pos_inbox SET status = 'error', error_message = %s, "
+            "processed_at = NOW(), locked_by = NULL WHERE id = %s AND locked_by = %s",
+            (str(e)[:1000], inbox_id, _owner),
+        )
+        return
+    execute(
+        "UPDATE stk_pos_inbox SET status = 'done', result = %s, processed_at = NOW(), "
+        "locked_by = NULL WHERE id = %s AND locked_by = %s",
+        (json.dumps(result, ensure_ascii=False, default=str), inbox_id, _owner),
+    )
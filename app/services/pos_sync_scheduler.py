@@ -0,0 +1,157 @@
+"""POS 폴링 동기화 스케줄러
+
+POS_SYNC_INTERVAL(초)마다 POS가 연결된 비즈니스별로 판매(sale_items)와
+입고/Loss(stock_transactions) 폴링을 실행한다. 0이면 스케줄러를 켜지 않고
+기존처럼 /api/pos/sync 수동 호출로만 동기화한다.
+
+- 워커 수는 POS_SYNC_WORKERS로 제한하며, 실행 시각에 0~POS_SYNC_JITTER초를 더해
+  여러 비즈니스가 한꺼번에 POS DB에 몰리지 않게 한다.
+- 같은 비즈니스의 동기화는 겹치지 않는다. 프로세스 안에서는 threading.Lock,
+  프로세스 사이에서는 MySQL GET_LOCK으로 막으며 수동 동기화도 같은 잠금을 쓴다.
+- 실패하거나 POS_SYNC_SLOW_THRESHOLD초보다 오래 걸리면 다음 실행 간격을
+  두 배씩 늘린다 (최대 POS_SYNC_MAX_BACKOFF초). 정상 실행되면 원래 간격으로 돌아온다.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+from flask import Flask
+from app.db import fetch_one, fetch_all
+
+_app: Optional[Flask] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_locks: Dict[int, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_running: Set[int] = set()
+_schedule: Dict[int, Dict] = {}  # business_id → {"next_run", "backoff", "last_error"}
+_state_lock = threading.Lock()
+
+
+def init_pos_sync_scheduler(application: Flask) -> None:
+    """스케줄러 스레드를 시작합니다 (POS_SYNC_INTERVAL이 0이면 시작하지 않음)."""
+    import config
+    global _app, _executor
+    if config.POS_SYNC_INTERVAL <= 0 or _executor is not None:
+        return
+    _app = application
+    _executor = ThreadPoolExecutor(
+        max_workers=max(1, config.POS_SYNC_WORKERS), thread_name_prefix="pos-sync",
+    )
+    threading.Thread(target=_schedule_loop, name="pos-sync-scheduler", daemon=True).start()
+    print(f"  [POS 스케줄러] {config.POS_SYNC_INTERVAL}s 간격, 워커 {config.POS_SYNC_WORKERS}개 시작")
+
+
+@contextmanager
+def business_sync_lock(business_id: int) -> Iterator[bool]:
+    """비즈니스 동기화 잠금을 기다리지 않고 시도합니다. 얻었으면 True를 돌려줍니다.
+
+    with business_sync_lock(business_id) as acquired:
+        if not acquired:
+            return  # 이미 동기화 중
+    """
+    with _locks_guard:
+        lock = _locks.setdefault(business_id, threading.Lock())
+    if not lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        row = fetch_one("SELECT GET_LOCK(%s, 0) AS acquired", (_lock_name(business_id),))
+        if not row or not row["acquired"]:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fetch_one("SELECT RELEASE_LOCK(%s) AS released", (_lock_name(business_id),))
+    finally:
+        lock.release()
+
+
+def load_scheduler_status() -> Dict:
+    """비즈니스별 다음 실행 시각/백오프 상태를 반환합니다."""
+    now = time.time()
+    with _state_lock:
+        return {
+            business_id: {
+                "running": business_id in _running,
+                "next_run_in": max(0.0, round(state["next_run"] - now, 1)),
+                "backoff": state["backoff"],
+                "last_error": state["last_error"],
+            }
+            for business_id, state in _schedule.items()
+        }
+
+
+def _lock_name(business_id: int) -> str:
+    return f"stk_pos_sync_{business_id}"
+
+
+def _schedule_loop() -> None:
+    """1초마다 실행 시각이 된 비즈니스를 워커에 배정합니다."""
+    import config
+    while True:
+        time.sleep(1)
+        try:
+            with _app.app_context():
+                businesses = fetch_all(
+                    "SELECT id, type, pos_db_name FROM stk_businesses "
+                    "WHERE is_active = 1 AND pos_db_name IS NOT NULL AND pos_db_name != ''"
+                )
+        except Exception as e:
+            print(f"⚠️ POS 스케줄러 비즈니스 조회 실패: {e}")
+            continue
+        now = time.time()
+        for biz in businesses:
+            with _state_lock:
+                state = _schedule.setdefault(biz["id"], {
+                    "next_run": now + random.uniform(0, config.POS_SYNC_JITTER),
+                    "backoff": 0.0, "last_error": "",
+                })
+                if biz["id"] in _running or state["next_run"] > now:
+                    continue
+                if len(_running) >= config.POS_SYNC_WORKERS:
+                    break
+                _running.add(biz["id"])
+            _executor.submit(_run_business_sync, biz)
+
+
+def _run_business_sync(biz: Dict) -> None:
+    import config
+    from app.controllers.pos_sync_controller import (
+        sync_sales_from_pos, sync_stock_transactions_from_pos,
+    )
+    started = time.time()
+    error = ""
+    try:
+        with _app.app_context():
+            with business_sync_lock(biz["id"]) as acquired:
+                if acquired:
+                    store = fetch_one(
+                        "SELECT id FROM stk_stores WHERE business_id = %s AND is_active = 1 LIMIT 1",
+                        (biz["id"],),
+                    )
+                    if store:
+                        sync_sales_from_pos(biz["id"], biz["type"], store["id"], biz["pos_db_name"])
+                        sync_stock_transactions_from_pos(biz["id"], store["id"], biz["pos_db_name"])
+    except Exception as e:
+        error = str(e)
+        print(f"❌ POS 자동 동기화 실패 (biz={biz['id']}): {e}")
+    elapsed = time.time() - started
+    with _state_lock:
+        state = _schedule[biz["id"]]
+        if error or elapsed > config.POS_SYNC_SLOW_THRESHOLD:
+            state["backoff"] = min(
+                config.POS_SYNC_MAX_BACKOFF,
+                max(config.POS_SYNC_INTERVAL, state["backoff"] * 2),
+            )
+            if not error:
+                print(f"⚠️ POS 자동 동기화 지연 (biz={biz['id']}, {elapsed:.1f}s) "
+                      f"→ 다음 실행 {state['backoff']:.0f}s 후")
+        else:
+            state["backoff"] = 0.0
+        state["last_error"] = error
+        delay = state["backoff"] or config.POS_SYNC_INTERVAL
+        state["next_run"] = time.time() + delay + random.uniform(0, config.POS_SYNC_JITTER)
+        _running.discard(biz["id"])
@@ -0,0 +1,162 @@
+"""POS 재고 write-back 큐
+
+재고 변동이 생긴 (product_id, store_id) 쌍을 모아 두었다가 커밋 후
+한꺼번에 POS menulist.minventory에 반영한다. 요청 처리 시간이 POS DB
+응답 속도에 묶이지 않도록, 실제 반영은 백그라운드 스레드가 짧은
+지연(POS_WRITEBACK_DELAY) 뒤에 모아서 수행한다.
+
+사용 예:
+    from app.services.pos_writeback_service import mark_dirty
+
+    with transaction():
+        ...재고 변경...
+        mark_dirty(product_id, store_id)   # 커밋되면 큐에 등록
+"""
+import atexit
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from flask import Flask, g
+from app.db import BATCH_SIZE, fetch_all, on_commit, write_pos_db
+from app.services import inventory_totals_service
+
+_Pair = Tuple[int, int]
+
+_app: Optional[Flask] = None
+_delay: float = 0.0
+_retry_interval: float = 30.0
+_pending: Set[_Pair] = set()
+_lock = threading.Lock()
+_wake = threading.Event()
+_worker: Optional[threading.Thread] = None
+
+
+def init_pos_writeback(application: Flask) -> None:
+    """write-back 플러시 스레드를 시작합니다 (지연 0이면 커밋 시 즉시 반영)."""
+    import config
+    global _app, _delay, _retry_interval, _worker
+    _app = application
+    _delay = max(0.0, config.POS_WRITEBACK_DELAY)
+    _retry_interval = max(1.0, config.POS_WRITEBACK_RETRY_INTERVAL)
+    if _delay <= 0 or _worker is not None:
+        return
+    _worker = threading.Thread(target=_flush_loop, name="pos-writeback", daemon=True)
+    _worker.start()
+    atexit.register(_flush_on_exit)
+    print(f"  [POS write-back] 플러시 스레드 시작 (지연 {_delay}s)")
+
+
+def mark_dirty(product_id: int, store_id: int) -> None:
+    """재고가 바뀐 상품/매장을 표시합니다 (커밋 후 큐에 등록, 요청 내 중복 제거)."""
+    pending = g.get("pos_writeback_pending")
+    if pending is None:
+        pending = g.pos_writeback_pending = set()
+    pending.add((int(product_id), int(store_id)))
+    # 훅마다 등록해 두어야 SAVEPOINT 롤백으로 일부 훅이 지워져도 반영이 누락되지 않는다.
+    # 첫 훅이 요청의 표시분을 모두 가져가므로 나머지 훅은 아무 일도 하지 않는다.
+    on_commit(_drain_request)
+
+
+def enqueue(pairs: Iterable[_Pair]) -> None:
+    """(product_id, store_id) 쌍을 write-back 큐에 넣습니다."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    if _worker is None:
+        flush(pairs)
+        return
+    with _lock:
+        _pending.update(pairs)
+    _wake.set()
+
+
+def flush(pairs: Iterable[_Pair]) -> int:
+    """재고 합계를 한 번에 집계해 POS menulist에 일괄 반영합니다. 반영된 행 수를 반환."""
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return 0
+    product_ids = sorted({pid for pid, _ in pairs})
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    codes = {
+        row["id"]: row["code"]
+        for row in fetch_all(
+            f"SELECT id, code FROM stk_products WHERE id IN ({placeholders})",
+            tuple(product_ids),
+        )
+        if row["code"]
+    }
+    totals = inventory_totals_service.load_product_store_totals(pairs)
+    # 같은 mcode가 여러 매장에서 표시되면 기존 동작처럼 마지막 값이 남는다
+    inventory_by_code: Dict[str, int] = {}
+    for pair in pairs:
+        code = codes.get(pair[0])
+        if code:
+            inventory_by_code[code] = int(float(totals.get(pair, 0)))
+    return _write_menulist(inventory_by_code)
+
+
+def _write_menulist(inventory_by_code: Dict[str, int]) -> int:
+    """UPDATE menulist ... CASE mcode 한 문장으로 재고를 반영합니다 (BATCH_SIZE 단위)."""
+    items = list(inventory_by_code.items())
+    affected = 0
+    for start in range(0, len(items), BATCH_SIZE):
+        chunk = items[start:start + BATCH_SIZE]
+        cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+        placeholders = ", ".join(["%s"] * len(chunk))
+        params: List = [v for item in chunk for v in item]
+        params.extend(code for code, _ in chunk)
+        affected += write_pos_db(
+            f"UPDATE menulist SET minventory = CASE mcode {cases} END "
+            f"WHERE mcode IN ({placeholders})",
+            tuple(params),
+        )
+    if items:
+        print(f"POS 재고 동기화: {len(items)}건 일괄 반영 ({affected}행 변경)")
+    return affected
+
+
+def _drain_request() -> None:
+    pending = g.pop("pos_writeback_pending", None)
+    if not pending:
+        return
+    try:
+        enqueue(pending)
+    except Exception as e:
+        print(f"POS 동기화 스킵: {e}")
+
+
+def _take_pending() -> Set[_Pair]:
+    with _lock:
+        pairs = set(_pending)
+        _pending.clear()
+    return pairs
+
+
+def _flush_loop() -> None:
+    """표시가 들어오면 _delay만큼 더 모은 뒤 한꺼번에 반영합니다."""
+    while True:
+        with _lock:
+            has_pending = bool(_pending)
+        # 실패 후 남은 항목이 있으면 새 표시가 없어도 주기적으로 재시도
+        _wake.wait(_retry_interval if has_pending else None)
+        _wake.clear()
+        time.sleep(_delay)
+        pairs = _take_pending()
+        if pairs:
+            _flush_in_app(pairs)
+
+
+def _flush_in_app(pairs: Set[_Pair]) -> None:
+    try:
+        with _app.app_context():
+            flush(pairs)
+    except Exception as e:
+        print(f"POS 동기화 실패 ({len(pairs)}건, 재시도 예정): {e}")
+        with _lock:
+            _pending.update(pairs)
+
+
+def _flush_on_exit() -> None:
+    pairs = _take_pending()
+    if pairs:
+        _flush_in_app(pairs)
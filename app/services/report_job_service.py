@@ -0,0 +1,223 @@
+"""리포트 백그라운드 작업 큐
+
+재고/유통기한/기간별 첨부파일/1년치 매출처럼 무거운 리포트는 요청 안에서 만들면
+브라우저가 시간 초과로 끊긴다. 라우트는 enqueue_report_job()으로 작업을 등록하고
+load_job()으로 진행 상황(기록한 행 수)을 폴링한 뒤, 완료되면 결과 파일을 내려받는다.
+작업은 REPORT_JOB_WORKERS개 워커에서 실행된다.
+
+결과 파일은 REPORT_CACHE_DIR에 (비즈니스, 리포트 종류, 파라미터, 형식, 데이터 버전)
+해시를 이름으로 저장하고 REPORT_CACHE_TTL이 지나면 지운다. 같은 키로 다시 요청하면
+작업을 실행하지 않고 바로 완료 상태로 돌려주며, 같은 키의 작업이 진행 중이면 그 작업을
+돌려준다. 데이터 버전은 리포트가 읽는 테이블의 변경 지표라서 데이터가 바뀌면 키도 바뀐다.
+
+작업 상태는 프로세스 메모리에만 두므로 재시작하면 진행 중이던 작업은 사라진다 (캐시 파일은 유지).
+
+사용 예:
+    job = report_job_service.enqueue_report_job(
+        business_id, "sales", {"start_date": start, "end_date": end}, "xlsx",
+        build=lambda: ("Sales Report", headers, rows_iter()),
+        data_version=report_controller.load_report_data_version("sales", business_id, start, end),
+    )
+    report_job_service.load_job(job["id"], business_id)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from flask import Flask
+from app.services.csv_export_service import stream_csv
+from app.services.excel_service import stream_excel_report
+
+# 형식 → (확장자, MIME)
+REPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("csv", "text/csv; charset=utf-8"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+}
+
+_PROGRESS_EVERY = 500  # 행 수 갱신 간격
+
+_app: Optional[Flask] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_jobs: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+ReportBuild = Callable[[], Tuple[str, List[str], Iterator[List]]]
+
+
+def init_report_jobs(application: Flask) -> None:
+    """워커 풀을 만들고 만료된 캐시 파일을 정리합니다."""
+    import config
+    global _app, _executor
+    if _executor is not None:
+        return
+    _app = application
+    os.makedirs(config.REPORT_CACHE_DIR, exist_ok=True)
+    _purge_expired()
+    _executor = ThreadPoolExecutor(
+        max_workers=max(1, config.REPORT_JOB_WORKERS), thread_name_prefix="report-job",
+    )
+    print(f"  [리포트 작업] 워커 {config.REPORT_JOB_WORKERS}개, 캐시 {config.REPORT_CACHE_DIR}")
+
+
+def enqueue_report_job(business_id: int, report_type: str, params: Dict, fmt: str,
+                       build: ReportBuild, data_version: str,
+                       total_rows: Optional[int] = None) -> Dict:
+    """리포트 작업을 등록하고 작업 상태를 반환합니다 (캐시가 있으면 바로 완료).
+
+    build: 워커의 앱 컨텍스트에서 호출되어 (제목, 헤더, 행 iterator)를 돌려주는 함수.
+           요청/세션에 접근하지 않도록 필요한 값은 미리 묶어서 넘깁니다.
+    total_rows: 알고 있으면 진행률(%) 계산에 사용
+    """
+    _purge_expired()
+    cache_key = _cache_key(business_id, report_type, params, fmt, data_version)
+    path = _cache_path(cache_key, fmt)
+    with _lock:
+        for job in _jobs.values():
+            if job["cache_key"] == cache_key and job["status"] in ("queued", "running"):
+                return _snapshot(job)
+        job = {
+            "id": uuid.uuid4().hex,
+            "business_id": business_id,
+            "report_type": report_type,
+            "format": fmt,
+            "cache_key": cache_key,
+            "path": path,
+            "status": "queued",
+            "rows": 0,
+            "total_rows": total_rows,
+            "error": "",
+            "cached": False,
+            "created_at": time.time(),
+            "finished_at": None,
+        }
+        if os.path.exists(path):
+            job.update(status="done", cached=True, finished_at=time.time())
+        _jobs[job["id"]] = job
+        snapshot = _snapshot(job)
+    if snapshot["status"] == "queued":
+        _executor.submit(_run_job, job["id"], build)
+    return snapshot
+
+
+def load_job(job_id: str, business_id: int) -> Optional[Dict]:
+    """작업 상태를 조회합니다 (다른 비즈니스의 작업이면 None)."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job or job["business_id"] != business_id:
+            return None
+        return _snapshot(job)
+
+
+def load_job_result(job_id: str, business_id: int) -> Optional[Tuple[str, str, str]]:
+    """완료된 작업의 (파일 경로, 다운로드 파일명, MIME)을 반환합니다 (없거나 만료되면 None)."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job or job["business_id"] != business_id or job["status"] != "done":
+            return None
+        job = dict(job)
+    if not os.path.exists(job["path"]):
+        return None
+    extension, mimetype = REPORT_FORMATS[job["format"]]
+    created = time.strftime("%Y-%m-%d", time.localtime(job["created_at"]))
+    return job["path"], f"stockmaster_{job['report_type']}_{created}.{extension}", mimetype
+
+
+def _run_job(job_id: str, build: ReportBuild) -> None:
+    with _lock:
+        job = _jobs[job_id]
+        job["status"] = "running"
+    part_path = job["path"] + f".{job_id}.part"
+    try:
+        with _app.app_context():
+            title, headers, rows = build()
+            if job["format"] == "xlsx":
+                chunks = stream_excel_report(title, headers, _count_rows(job, rows))
+            else:
+                chunks = stream_csv(headers, _count_rows(job, rows), compress=job["format"] == "csv.gz")
+            with open(part_path, "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        os.replace(part_path, job["path"])
+    except Exception as e:
+        print(f"❌ 리포트 작업 실패 ({job['report_type']}, {job_id}): {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        with _lock:
+            job.update(status="error", error=str(e)[:500], finished_at=time.time())
+        return
+    with _lock:
+        job.update(status="done", finished_at=time.time())
+    print(f"📊 리포트 작업 완료 ({job['report_type']}, {job['rows']}행, "
+          f"{job['finished_at'] - job['created_at']:.1f}s)")
+
+
+def _count_rows(job: Dict, rows: Iterator[List]) -> Iterator[List]:
+    """행을 그대로 넘기면서 진행 행 수를 갱신합니다."""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % _PROGRESS_EVERY == 0:
+            with _lock:
+                job["rows"] = count
+    with _lock:
+        job["rows"] = count
+
+
+def _snapshot(job: Dict) -> Dict:
+    """외부에 돌려줄 작업 상태 (락 보유 상태에서 호출)."""
+    progress = None
+    if job["status"] == "done":
+        progress = 100
+    elif job["total_rows"]:
+        progress = min(99, int(job["rows"] * 100 / job["total_rows"]))
+    return {
+        "id": job["id"],
+        "report_type": job["report_type"],
+        "format": job["format"],
+        "status": job["status"],
+        "rows": job["rows"],
+        "total_rows": job["total_rows"],
+        "progress": progress,
+        "cached": job["cached"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+    }
+
+
+def _cache_key(business_id: int, report_type: str, params: Dict, fmt: str, data_version: str) -> str:
+    raw = json.dumps([business_id, report_type, params, fmt, data_version], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _cache_path(cache_key: str, fmt: str) -> str:
+    import config
+    return os.path.join(config.REPORT_CACHE_DIR, f"{cache_key}.{REPORT_FORMATS[fmt][0]}")
+
+
+def _purge_expired() -> None:
+    """TTL이 지난 캐시 파일과 끝난 작업 기록을 지웁니다."""
+    import config
+    now = time.time()
+    try:
+        names = os.listdir(config.REPORT_CACHE_DIR)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        path = os.path.join(config.REPORT_CACHE_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > config.REPORT_CACHE_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+    with _lock:
+        for job_id in [
+            job_id for job_id, job in _jobs.items()
+            if job["finished_at"] and now - job["finished_at"] > config.REPORT_CACHE_TTL
+        ]:
+            del _jobs[job_id]
@@ -0,0 +1,227 @@
+"""일별 집계(rollup) 테이블 관리
+
+stk_transactions는 판매 라인마다 늘어나는 가장 큰 테이블이라 기간 요약을
+원본에서 매번 집계하면 느리다. 입출고 기록 경로는 집계를 건드리지 않고
+(매장별 같은 행을 갱신하면 동시 거래가 그 행 잠금에 줄을 선다),
+기간 요약을 읽을 때 마감된 날짜만 stk_tx_daily(매장, 일자, 유형)로 한 번 집계해 두고
+stk_tx_daily_closed(사업장, 일자)에 마감 표시를 남긴다. 마감 전 날짜(오늘, 자정 직후
+_CLOSE_GRACE_SECONDS 동안의 어제)는 원본을 (store_id, created_at) 인덱스 범위로 읽어 합친다.
+일자는 집계할 때 DATE(created_at)으로 정하므로 자정 무렵 거래도 원본과 같은 날짜에 들어간다.
+
+판매/매입/도매 주문은 stk_order_daily(사업장, 종류, 일자, 매장, 상태)에
+건수/금액을 둔다. 주문을 만들거나 상태를 바꾸는 쪽이 같은 트랜잭션에서
+load_order_for_update()로 바뀌기 전 행을 잠가 읽고, 변경 후 record_order()로
+이전 상태 칸에서 빼고 새 상태 칸에 더한다.
+
+기존 데이터나 어긋난 구간은 database/run_migrate_tx_daily.py,
+database/run_migrate_order_daily.py의 --rebuild로 원본에서 다시 만들고,
+--verify로 원본 집계와 비교한다.
+
+사용 예:
+    from app.services import rollup_service
+
+    rollup_service.load_transaction_totals(business_id, "2026-01-01", "2026-01-31")
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from app.db import fetch_all, fetch_one, execute, execute_many, transaction
+
+_DateLike = Union[str, date]
+
+# 날짜가 끝나고 이 시간이 지나야 마감(집계 대상)으로 본다 — 자정 직전에 시작해 늦게 커밋된 거래 대비
+_CLOSE_GRACE_SECONDS = 600
+
+# 주문 종류 → (테이블, 일자 컬럼, 총액, 할인액, 최종액) — 매입은 할인 없이 총액이 최종액
+ORDER_KINDS = {
+    "sale": ("stk_sales", "sale_date", "total_amount", "discount_amount", "final_amount"),
+    "purchase": ("stk_purchases", "purchase_date", "total_amount", "0", "total_amount"),
+    "wholesale": ("stk_wholesale_orders", "order_date", "total_amount", "discount_amount", "final_amount"),
+}
+
+
+def day_range(start_date: _DateLike, end_date: _DateLike) -> Tuple[str, str]:
+    """포함 구간 [start_date, end_date]를 반열린 구간 [start, end + 1일)로 바꿉니다.
+
+    DATE(created_at) BETWEEN 대신 created_at >= start AND created_at < end로
+    비교해야 (store_id, created_at) 인덱스를 사용할 수 있습니다.
+    """
+    start = _to_date(start_date)
+    end = _to_date(end_date) + timedelta(days=1)
+    return start.isoformat(), end.isoformat()
+
+
+def load_transaction_totals(business_id: int, start_date: _DateLike,
+                            end_date: _DateLike) -> List[Dict]:
+    """기간(양 끝 포함)의 유형별 입출고 건수/금액을 조회합니다.
+
+    마감된 날짜는 일별 집계(아직 없으면 먼저 채움)에서, 마감 전 날짜는 원본에서 읽어 합칩니다.
+    """
+    start, end = day_range(start_date, end_date)
+    cutoff = fetch_one(
+        "SELECT DATE(NOW() - INTERVAL %s SECOND) AS d", (_CLOSE_GRACE_SECONDS,),
+    )["d"].isoformat()
+    totals: Dict[str, Dict] = {}
+    if start < cutoff:
+        closed_end = min(end, cutoff)
+        try:
+            _close_days(business_id, start, closed_end)
+            rows = fetch_all(
+                "SELECT d.type, SUM(d.tx_count) AS count, COALESCE(SUM(d.total_amount), 0) AS total "
+                "FROM stk_tx_daily d "
+                "JOIN stk_stores s ON d.store_id = s.id "
+                "WHERE s.business_id = %s AND d.tx_date >= %s AND d.tx_date < %s "
+                "GROUP BY d.type",
+                (business_id, start, closed_end),
+            )
+        except Exception as e:
+            print(f"⚠️ 입출고 일별 집계 실패, 원본으로 조회: {e}")
+            rows = _load_raw_totals(business_id, start, closed_end)
+        _add_totals(totals, rows)
+    if end > cutoff:
+        _add_totals(totals, _load_raw_totals(business_id, max(start, cutoff), end))
+    return [{"type": tx_type, **values} for tx_type, values in totals.items()]
+
+
+def _close_days(business_id: int, start: str, end: str) -> None:
+    """[start, end) 중 마감 표시가 없는 날짜를 원본에서 집계하고 마감 표시를 남깁니다."""
+    done = {
+        row["tx_date"] for row in fetch_all(
+            "SELECT tx_date FROM stk_tx_daily_closed "
+            "WHERE business_id = %s AND tx_date >= %s AND tx_date < %s",
+            (business_id, start, end),
+        )
+    }
+    day, last = _to_date(start), _to_date(end)
+    missing = []
+    while day < last:
+        if day not in done:
+            missing.append(day)
+        day += timedelta(days=1)
+    if not missing:
+        return
+    first, until = missing[0].isoformat(), (missing[-1] + timedelta(days=1)).isoformat()
+    with transaction():
+        execute(
+            "DELETE d FROM stk_tx_daily d JOIN stk_stores s ON d.store_id = s.id "
+            "WHERE s.business_id = %s AND d.tx_date >= %s AND d.tx_date < %s",
+            (business_id, first, until),
+        )
+        execute(
+            "INSERT INTO stk_tx_daily (store_id, tx_date, type, tx_count, total_amount) "
+            "SELECT t.store_id, DATE(t.created_at), t.type, COUNT(*), COALESCE(SUM(t.total_amount), 0) "
+            "FROM stk_stores s "
+            "JOIN stk_transactions t ON t.store_id = s.id "
+            "AND t.created_at >= %s AND t.created_at < %s "
+            "WHERE s.business_id = %s "
+            "GROUP BY t.store_id, DATE(t.created_at), t.type "
+            "ON DUPLICATE KEY UPDATE tx_count = VALUES(tx_count), total_amount = VALUES(total_amount)",
+            (first, until, business_id),
+        )
+        execute_many(
+            "INSERT IGNORE INTO stk_tx_daily_closed (business_id, tx_date) VALUES (%s, %s)",
+            [(business_id, day.isoformat()) for day in missing],
+        )
+
+
+def _load_raw_totals(business_id: int, start: str, end: str) -> List[Dict]:
+    """[start, end)의 유형별 입출고 합계를 원본에서 집계합니다."""
+    return fetch_all(
+        "SELECT t.type, COUNT(*) AS count, COALESCE(SUM(t.total_amount), 0) AS total "
+        "FROM stk_stores s "
+        "JOIN stk_transactions t ON t.store_id = s.id "
+        "AND t.created_at >= %s AND t.created_at < %s "
+        "WHERE s.business_id = %s "
+        "GROUP BY t.type",
+        (start, end, business_id),
+    )
+
+
+def _add_totals(totals: Dict[str, Dict], rows: Iterable[Dict]) -> None:
+    for row in rows:
+        entry = totals.setdefault(row["type"], {"count": 0, "total": 0.0})
+        entry["count"] += int(row["count"] or 0)
+        entry["total"] += float(row["total"] or 0)
+
+
+def load_order_for_update(kind: str, order_id: int) -> Optional[Dict]:
+    """집계에 필요한 주문 값을 행 잠금(FOR UPDATE)과 함께 조회합니다.
+
+    상태를 바꾸기 전에 호출해야 동시에 바뀐 상태를 이전 상태로 잘못 빼지 않습니다.
+    """
+    table, date_col, total_col, discount_col, final_col = ORDER_KINDS[kind]
+    return fetch_one(
+        f"SELECT business_id, store_id, {date_col} AS order_date, status, "
+        f"{total_col} AS total_amount, {discount_col} AS discount_amount, "
+        f"{final_col} AS final_amount "
+        f"FROM {table} WHERE id = %s FOR UPDATE",
+        (order_id,),
+    )
+
+
+def record_order(kind: str, before: Optional[Dict], after: Optional[Dict]) -> None:
+    """주문 변경을 일별 집계에 반영합니다 (before 칸에서 빼고 after 칸에 더함).
+
+    before/after: load_order_for_update() 형태의 dict (신규 주문이면 before=None)
+    """
+    buckets = []
+    if before:
+        buckets.append((before, -1))
+    if after:
+        buckets.append((after, 1))
+    # 같은 칸끼리 합치고 정렬해 교착 상태를 피한다
+    deltas: Dict[Tuple, List[float]] = {}
+    for order, sign in buckets:
+        key = (order["business_id"], kind, str(order["order_date"]), order["store_id"], order["status"])
+        entry = deltas.setdefault(key, [0, 0.0, 0.0, 0.0])
+        entry[0] += sign
+        entry[1] += sign * float(order["total_amount"] or 0)
+        entry[2] += sign * float(order["discount_amount"] or 0)
+        entry[3] += sign * float(order["final_amount"] or 0)
+    keys = sorted(key for key, entry in deltas.items() if any(entry))
+    if not keys:
+        return
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(keys))
+    params = [v for key in keys for v in (*key, *deltas[key])]
+    execute(
+        f"INSERT INTO stk_order_daily "
+        f"(business_id, kind, order_date, store_id, status, "
+        f"order_count, total_amount, discount_amount, final_amount) "
+        f"VALUES {values} "
+        f"ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count), "
+        f"total_amount = total_amount + VALUES(total_amount), "
+        f"discount_amount = discount_amount + VALUES(discount_amount), "
+        f"final_amount = final_amount + VALUES(final_amount)",
+        tuple(params),
+    )
+
+
+def load_order_daily(kind: str, business_id: int, date_from: _DateLike = "",
+                     date_to: _DateLike = "", store_id: Optional[int] = None) -> List[Dict]:
+    """주문 일별 집계를 (일자, 상태)별로 조회합니다 (매장 합산, 일자 내림차순)."""
+    where = "WHERE business_id = %s AND kind = %s"
+    params: list = [business_id, kind]
+    if store_id:
+        where += " AND store_id = %s"
+        params.append(store_id)
+    if date_from:
+        where += " AND order_date >= %s"
+        params.append(str(date_from))
+    if date_to:
+        where += " AND order_date <= %s"
+        params.append(str(date_to))
+    return fetch_all(
+        f"SELECT order_date, status, SUM(order_count) AS order_count, "
+        f"SUM(total_amount) AS total_amount, SUM(discount_amount) AS discount_amount, "
+        f"SUM(final_amount) AS final_amount "
+        f"FROM stk_order_daily {where} "
+        f"GROUP BY order_date, status ORDER BY order_date DESC, status",
+        tuple(params),
+    )
+
+
+def _to_date(value: _DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
@@ -17,6 +17,7 @@
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional
 from app.db import fetch_one, execute, insert
+from app.services import inventory_totals_service
 
 
 def process_variant_stock_in(
@@ -141,13 +142,8 @@ def recalculate_product_cost(product_id: int) -> dict:
 
 
 def _get_total_inventory_qty(product_id: int) -> Decimal:
-    """전 매장 합산 재고 수량을 조회한다."""
-    row = fetch_one(
-        "SELECT COALESCE(SUM(quantity), 0) AS total "
-        "FROM stk_inventory WHERE product_id = %s",
-        (product_id,),
-    )
-    return Decimal(str(row["total"])) if row else Decimal("0")
+    """전 매장 합산 재고 수량을 조회한다 (stk_inventory_totals 점 조회)."""
+    return inventory_totals_service.get_product_total(product_id)
 
 
 def _update_product_cost(product_id: int, avg_cost: Decimal, total_value: Decimal) -> None:
@@ -171,13 +167,13 @@ def _upsert_inventory(product_id: int, store_id: int, qty: float,
     """재고를 증가시킨다 (로트별 관리)."""
     if expiry_date:
         existing = fetch_one(
-            "SELECT id FROM stk_inventory "
+            "SELECT id, location FROM stk_inventory "
             "WHERE product_id=%s AND store_id=%s AND expiry_date=%s",
             (product_id, store_id, expiry_date),
         )
     else:
         existing = fetch_one(
-            "SELECT id FROM stk_inventory "
+            "SELECT id, location FROM stk_inventory "
             "WHERE product_id=%s AND store_id=%s AND expiry_date IS NULL",
             (product_id, store_id),
         )
@@ -186,12 +182,16 @@ def _upsert_inventory(product_id: int, store_id: int, qty: float,
             "UPDATE stk_inventory SET quantity = quantity + %s WHERE id = %s",
             (qty, existing["id"]),
         )
+        location = existing["location"]
     else:
+        qty = max(0, qty)
+        location = "warehouse"
         insert(
             "INSERT INTO stk_inventory (product_id, store_id, location, quantity, expiry_date) "
             "VALUES (%s, %s, %s, %s, %s)",
-            (product_id, store_id, "warehouse", max(0, qty), expiry_date),
+            (product_id, store_id, location, qty, expiry_date),
         )
+    inventory_totals_service.apply_deltas([(product_id, store_id, location, qty)])
 
 
 def _record_transaction(product_id: int, store_id: int, quantity: float,
@@ -199,9 +199,10 @@ def _record_transaction(product_id: int, store_id: int, quantity: float,
                         reason: str = "", user_id: Optional[int] = None,
                         variant_id: Optional[int] = None) -> int:
     """입고 트랜잭션을 기록한다."""
-    return insert(
+    tx_id = insert(
         "INSERT INTO stk_transactions "
         "(product_id, store_id, type, to_location, quantity, unit_price, total_amount, reason, user_id) "
         "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
         (product_id, store_id, "in", "warehouse", quantity, unit_price, total_amount, reason, user_id),
     )
+    return tx_id
@@ -113,3 +113,29 @@ function exportTableToCSV(tableId, filename) {
   link.download = filename || 'export.csv';
   link.click();
 }
+
+/**
+ * Build a report in the background, show progress on the button and download when ready
+ */
+function runReportJob(url, button) {
+  const label = button ? button.innerHTML : '';
+  const restore = () => { if (button) { button.disabled = false; button.innerHTML = label; } };
+  if (button) button.disabled = true;
+  const poll = job => {
+    if (job.status === 'done') {
+      restore();
+      window.location = job.download_url;
+      return;
+    }
+    if (!job.status || job.status === 'error') throw new Error(job.error || 'Report failed');
+    if (button) button.textContent = job.progress != null ? job.progress + '%' : job.rows + ' rows';
+    return new Promise(resolve => setTimeout(resolve, 2000))
+      .then(() => fetch(job.status_url))
+      .then(r => r.json())
+      .then(poll);
+  };
+  fetch(url, { method: 'POST' })
+    .then(r => r.json())
+    .then(poll)
+    .catch(err => { restore(); alert(err.message); });
+}
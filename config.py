@@ -16,6 +16,53 @@ DB_USER: str = os.getenv("DB_USER", "root")
 DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
 DB_NAME: str = os.getenv("DB_NAME", "stock_master")
 POS_DB_NAME: str = os.getenv("POS_DB_NAME", "order_sys")
+
+# DB 커넥션 풀
+DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+DB_POOL_IDLE_TIMEOUT: float = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # seconds
+DB_POOL_CHECKOUT_TIMEOUT: float = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10"))  # seconds
+POS_DB_POOL_MAX_SIZE: int = int(os.getenv("POS_DB_POOL_MAX_SIZE", "5"))  # POS DB별
+
+# POS 재고 write-back (0이면 커밋 시 즉시 반영)
+POS_WRITEBACK_DELAY: float = float(os.getenv("POS_WRITEBACK_DELAY", "2"))  # seconds
+POS_WRITEBACK_RETRY_INTERVAL: float = float(os.getenv("POS_WRITEBACK_RETRY_INTERVAL", "30"))  # seconds
+
+# 주기 작업(POS 스케줄러, 인박스 디스패처)을 이 프로세스에서 실행할지 (여러 프로세스로 띄우면 한 곳만 true)
+BACKGROUND_POLLERS: bool = os.getenv("BACKGROUND_POLLERS", "true").lower() == "true"
+
+# POS Webhook 비동기 수신 (stk_pos_inbox 적재 후 202 응답)
+POS_WEBHOOK_ASYNC: bool = os.getenv("POS_WEBHOOK_ASYNC", "false").lower() == "true"
+POS_INBOX_WORKERS: int = int(os.getenv("POS_INBOX_WORKERS", "4"))
+POS_INBOX_POLL_INTERVAL: float = float(os.getenv("POS_INBOX_POLL_INTERVAL", "5"))  # seconds
+POS_INBOX_LEASE: float = float(os.getenv("POS_INBOX_LEASE", "600"))  # seconds (processing 건 복구 기준)
+POS_INBOX_MAX_ATTEMPTS: int = int(os.getenv("POS_INBOX_MAX_ATTEMPTS", "5"))  # 실패 시 재시도 포함 최대 시도 횟수
+POS_INBOX_RETRY_DELAY: float = float(os.getenv("POS_INBOX_RETRY_DELAY", "30"))  # seconds (재시도마다 두 배)
+POS_IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("POS_IDEMPOTENCY_CACHE_SIZE", "50000"))  # 메모리 LRU 키 수
+
+# POS 폴링 동기화 스케줄러 (POS_SYNC_INTERVAL=0이면 수동 동기화만)
+POS_SYNC_INTERVAL: float = float(os.getenv("POS_SYNC_INTERVAL", "0"))  # seconds
+POS_SYNC_JITTER: float = float(os.getenv("POS_SYNC_JITTER", "10"))  # seconds
+POS_SYNC_WORKERS: int = int(os.getenv("POS_SYNC_WORKERS", "2"))
+POS_SYNC_SLOW_THRESHOLD: float = float(os.getenv("POS_SYNC_SLOW_THRESHOLD", "30"))  # seconds
+POS_SYNC_MAX_BACKOFF: float = float(os.getenv("POS_SYNC_MAX_BACKOFF", "600"))  # seconds
+POS_SYNC_CHUNK_SIZE: int = int(os.getenv("POS_SYNC_CHUNK_SIZE", "500"))  # 청크당 POS 행 수 (청크마다 커밋)
+
+# 상품/레시피 조회 캐시 (다른 프로세스의 변경 반영 주기)
+CATALOG_CACHE_TTL: float = float(os.getenv("CATALOG_CACHE_TTL", "300"))  # seconds
+CATALOG_MISS_TTL: float = float(os.getenv("CATALOG_MISS_TTL", "30"))  # seconds (DB에도 없던 mcode 기억)
+
+# 대시보드 위젯 캐시 (쓰기 경로가 무효화하며, TTL은 훅이 없는 변경의 반영 주기)
+DASHBOARD_CACHE_TTL: float = float(os.getenv("DASHBOARD_CACHE_TTL", "15"))  # seconds
+
+# 리포트 내보내기 (기간 리포트는 EXPORT_CHUNK_DAYS일 구간씩 나눠 조회, 0이면 한 번에)
+EXPORT_CHUNK_DAYS: int = int(os.getenv("EXPORT_CHUNK_DAYS", "31"))
+
+# 리포트 백그라운드 작업 (결과 파일은 REPORT_CACHE_DIR에 REPORT_CACHE_TTL 동안 보관)
+REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+REPORT_CACHE_DIR: str = os.getenv("REPORT_CACHE_DIR", os.path.join(_base_dir, "report_cache"))
+REPORT_CACHE_TTL: float = float(os.getenv("REPORT_CACHE_TTL", "3600"))  # seconds
+
 APP_PORT: int = int(os.getenv("APP_PORT", "5555"))
 APP_DEBUG: bool = os.getenv("APP_DEBUG", "true").lower() == "true"
 POS_API_KEY: str = os.getenv("POS_API_KEY", "")
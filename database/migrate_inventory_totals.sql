@@ -0,0 +1,26 @@
+-- ============================================
+-- Migration: 상품/매장/위치별 재고 합계 (stk_inventory_totals)
+-- ============================================
+
+-- 1. 재고 합계 테이블 (재고 변경 시 같은 트랜잭션에서 증감분 반영)
+CREATE TABLE IF NOT EXISTS stk_inventory_totals (
+    product_id INT NOT NULL,
+    store_id INT NOT NULL,
+    location VARCHAR(50) NOT NULL DEFAULT '',
+    qty DECIMAL(14,4) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, store_id, location),
+    INDEX idx_store (store_id),
+    FOREIGN KEY (product_id) REFERENCES stk_products(id) ON DELETE CASCADE,
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 2. 현재 로트 수량으로 채우기
+INSERT INTO stk_inventory_totals (product_id, store_id, location, qty)
+SELECT product_id, store_id, COALESCE(location, ''), SUM(quantity)
+FROM stk_inventory
+GROUP BY product_id, store_id, COALESCE(location, '')
+ON DUPLICATE KEY UPDATE qty = VALUES(qty);
+
+-- Done! 검증: python database/run_migrate_inventory_totals.py --verify
+SELECT 'Migration complete: stk_inventory_totals created' AS result;
@@ -0,0 +1,51 @@
+-- ============================================
+-- Migration: 판매/매입/도매 주문 일별 집계 (stk_order_daily)
+-- ============================================
+
+-- 1. 사업장/종류/일자/매장/상태별 주문 건수·금액 (주문 생성·상태 변경 시 같은 트랜잭션에서 누적)
+CREATE TABLE IF NOT EXISTS stk_order_daily (
+    business_id INT NOT NULL,
+    kind VARCHAR(20) NOT NULL COMMENT 'sale, purchase, wholesale',
+    order_date DATE NOT NULL,
+    store_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    discount_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    final_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_id, kind, order_date, store_id, status),
+    INDEX idx_store (store_id),
+    FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 2. 기존 주문으로 채우기
+INSERT INTO stk_order_daily
+    (business_id, kind, order_date, store_id, status, order_count, total_amount, discount_amount, final_amount)
+SELECT business_id, 'sale', sale_date, store_id, COALESCE(status, 'draft'), COUNT(*),
+       COALESCE(SUM(total_amount), 0), COALESCE(SUM(discount_amount), 0), COALESCE(SUM(final_amount), 0)
+FROM stk_sales
+GROUP BY business_id, sale_date, store_id, COALESCE(status, 'draft')
+ON DUPLICATE KEY UPDATE order_count = VALUES(order_count), total_amount = VALUES(total_amount),
+    discount_amount = VALUES(discount_amount), final_amount = VALUES(final_amount);
+
+INSERT INTO stk_order_daily
+    (business_id, kind, order_date, store_id, status, order_count, total_amount, discount_amount, final_amount)
+SELECT business_id, 'purchase', purchase_date, store_id, COALESCE(status, 'draft'), COUNT(*),
+       COALESCE(SUM(total_amount), 0), 0, COALESCE(SUM(total_amount), 0)
+FROM stk_purchases
+GROUP BY business_id, purchase_date, store_id, COALESCE(status, 'draft')
+ON DUPLICATE KEY UPDATE order_count = VALUES(order_count), total_amount = VALUES(total_amount),
+    discount_amount = VALUES(discount_amount), final_amount = VALUES(final_amount);
+
+INSERT INTO stk_order_daily
+    (business_id, kind, order_date, store_id, status, order_count, total_amount, discount_amount, final_amount)
+SELECT business_id, 'wholesale', order_date, store_id, COALESCE(status, 'draft'), COUNT(*),
+       COALESCE(SUM(total_amount), 0), COALESCE(SUM(discount_amount), 0), COALESCE(SUM(final_amount), 0)
+FROM stk_wholesale_orders
+GROUP BY business_id, order_date, store_id, COALESCE(status, 'draft')
+ON DUPLICATE KEY UPDATE order_count = VALUES(order_count), total_amount = VALUES(total_amount),
+    discount_amount = VALUES(discount_amount), final_amount = VALUES(final_amount);
+
+-- Done!
+SELECT 'Migration complete: stk_order_daily created' AS result;
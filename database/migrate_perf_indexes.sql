@@ -0,0 +1,30 @@
+-- ============================================
+-- Migration: 재고/입출고 조회 경로 복합 인덱스
+-- ============================================
+
+-- 1. stk_inventory — 매장별 로트 조회 (FEFO 출고 FOR UPDATE, 재고 목록, write-back 합계)
+ALTER TABLE stk_inventory
+  ADD INDEX IF NOT EXISTS idx_inv_store_product_lot (store_id, product_id, location, expiry_date);
+
+-- 2. stk_inventory — 매장별 유통기한 임박/만료 집계
+ALTER TABLE stk_inventory
+  ADD INDEX IF NOT EXISTS idx_inv_store_expiry (store_id, expiry_date);
+
+-- 3. stk_transactions — 매장별 최근 내역 (ORDER BY created_at DESC LIMIT), 기간 집계
+ALTER TABLE stk_transactions
+  ADD INDEX IF NOT EXISTS idx_tx_store_created (store_id, created_at);
+
+-- 4. stk_transactions — 유형 필터가 있는 내역 조회
+ALTER TABLE stk_transactions
+  ADD INDEX IF NOT EXISTS idx_tx_store_type_created (store_id, type, created_at);
+
+-- 5. 기간 리포트 (사업장 + 일자)
+ALTER TABLE stk_sales
+  ADD INDEX IF NOT EXISTS idx_sales_business_date (business_id, sale_date);
+ALTER TABLE stk_purchases
+  ADD INDEX IF NOT EXISTS idx_purchases_business_date (business_id, purchase_date);
+ALTER TABLE stk_wholesale_orders
+  ADD INDEX IF NOT EXISTS idx_wholesale_business_date (business_id, order_date);
+
+-- Done! 실행 계획 확인: python database/run_migrate_perf_indexes.py --check
+SELECT 'Migration complete: performance indexes added' AS result;
@@ -0,0 +1,19 @@
+-- ============================================
+-- POS 중복 수신 방지 (Idempotency Key)
+-- ============================================
+
+-- 1. 처리된 키 테이블 (UNIQUE 인덱스가 최종 중복 판정)
+CREATE TABLE IF NOT EXISTS stk_pos_idempotency (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    business_id INT NOT NULL,
+    idem_key CHAR(64) NOT NULL COMMENT 'sha256 of header key or pos_record_id',
+    scope VARCHAR(30) NOT NULL COMMENT 'webhook type or poll source',
+    claim_token CHAR(32) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_business_key (business_id, idem_key),
+    INDEX idx_created (created_at)
+) ENGINE=InnoDB;
+
+-- 2. 비동기 인박스에 키 보관
+ALTER TABLE stk_pos_inbox
+  ADD COLUMN IF NOT EXISTS idempotency_key CHAR(64) NULL AFTER payload;
@@ -0,0 +1,32 @@
+-- ============================================
+-- POS Webhook 비동기 수신 인박스
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS stk_pos_inbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    business_id INT NOT NULL,
+    business_type VARCHAR(20) NOT NULL DEFAULT 'mart',
+    store_id INT NOT NULL,
+    sync_type VARCHAR(30) NOT NULL COMMENT 'webhook type (sale, stock_in, baekwon_sale, ...)',
+    payload LONGTEXT NOT NULL COMMENT 'webhook JSON body',
+    status ENUM('pending','processing','done','error') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    result TEXT NULL COMMENT 'handler result JSON',
+    error_message TEXT NULL,
+    received_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    processed_at DATETIME NULL,
+    locked_at DATETIME NULL COMMENT 'processing 시작 시각 (임대 만료 판정)',
+    locked_by VARCHAR(100) NULL COMMENT '처리 중인 프로세스 토큰',
+    next_attempt_at DATETIME NULL COMMENT '실패 후 재시도 가능 시각',
+    INDEX idx_status_store (status, store_id, id),
+    FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 기존 테이블에 처리 임대(lease) 컬럼 추가
+ALTER TABLE stk_pos_inbox
+  ADD COLUMN IF NOT EXISTS locked_at DATETIME NULL COMMENT 'processing 시작 시각 (임대 만료 판정)' AFTER processed_at,
+  ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100) NULL COMMENT '처리 중인 프로세스 토큰' AFTER locked_at;
+
+-- 실패 건 재시도 대기 컬럼 추가
+ALTER TABLE stk_pos_inbox
+  ADD COLUMN IF NOT EXISTS next_attempt_at DATETIME NULL COMMENT '실패 후 재시도 가능 시각' AFTER locked_by;
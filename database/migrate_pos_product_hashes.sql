@@ -0,0 +1,23 @@
+-- ============================================
+-- POS 상품 마스터 증분 동기화 (menulist 행 해시)
+-- ============================================
+
+-- 1. menulist 행별 해시 (바뀐 행만 다시 읽기 위한 비교 기준)
+CREATE TABLE IF NOT EXISTS stk_pos_product_hashes (
+    business_id INT NOT NULL,
+    pos_id INT NOT NULL COMMENT 'menulist.id',
+    row_hash CHAR(32) NOT NULL COMMENT 'md5 of mcode|mname|mprice1|barcode|cost_price',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (business_id, pos_id)
+) ENGINE=InnoDB;
+
+-- 2. menulist 전체 지문 (같으면 행별 비교 없이 동기화 생략)
+CREATE TABLE IF NOT EXISTS stk_pos_product_fingerprint (
+    business_id INT NOT NULL PRIMARY KEY,
+    row_count INT NOT NULL COMMENT 'menulist 행 수',
+    fingerprint BIGINT NOT NULL COMMENT 'BIT_XOR of CRC32(id|row_hash)',
+    synced_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- 예전에 지문을 보관하던 동기화 로그 행 정리 (pos_last_id/record_count 자리에 지문이 들어 있음)
+DELETE FROM stk_pos_sync_log WHERE pos_table = 'menulist';
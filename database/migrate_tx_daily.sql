@@ -0,0 +1,39 @@
+-- ============================================
+-- Migration: 입출고 일별 집계 (stk_tx_daily)
+-- ============================================
+
+-- 1. 매장/일자/유형별 입출고 건수·금액 (마감된 날짜를 조회 시 원본에서 집계)
+CREATE TABLE IF NOT EXISTS stk_tx_daily (
+    store_id INT NOT NULL,
+    tx_date DATE NOT NULL,
+    type VARCHAR(20) NOT NULL COMMENT 'stk_transactions.type',
+    tx_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (store_id, tx_date, type),
+    INDEX idx_date (tx_date),
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 2. 사업장별 집계 완료(마감) 날짜 — 표시가 없는 날짜는 조회 시 원본에서 다시 집계
+CREATE TABLE IF NOT EXISTS stk_tx_daily_closed (
+    business_id INT NOT NULL,
+    tx_date DATE NOT NULL,
+    closed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (business_id, tx_date),
+    FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 3. 기존 입출고 내역으로 어제까지 채우고 마감 표시
+DELETE FROM stk_tx_daily;
+DELETE FROM stk_tx_daily_closed;
+INSERT INTO stk_tx_daily (store_id, tx_date, type, tx_count, total_amount)
+SELECT store_id, DATE(created_at), type, COUNT(*), COALESCE(SUM(total_amount), 0)
+FROM stk_transactions
+WHERE created_at < CURDATE()
+GROUP BY store_id, DATE(created_at), type;
+INSERT IGNORE INTO stk_tx_daily_closed (business_id, tx_date)
+SELECT DISTINCT s.business_id, d.tx_date
+FROM stk_tx_daily d JOIN stk_stores s ON d.store_id = s.id;
+
+-- Done!
+SELECT 'Migration complete: stk_tx_daily created' AS result;
@@ -0,0 +1,117 @@
+"""재고 합계(stk_inventory_totals) DB 마이그레이션 실행 스크립트
+
+python database/run_migrate_inventory_totals.py            # 테이블 생성 + 재계산 + 검증
+python database/run_migrate_inventory_totals.py --rebuild  # 로트 수량으로 합계 재계산
+python database/run_migrate_inventory_totals.py --verify   # 합계와 로트 수량 비교
+"""
+import os
+import sys
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+_LOT_TOTALS_SQL = (
+    "SELECT product_id, store_id, COALESCE(location, '') AS location, SUM(quantity) AS qty "
+    "FROM stk_inventory GROUP BY product_id, store_id, COALESCE(location, '')"
+)
+
+
+def _connect():
+    return pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = _connect()
+    cur = conn.cursor()
+    print("=== 재고 합계 마이그레이션 시작 ===\n")
+
+    # 1. stk_inventory_totals 테이블 생성
+    print("1. stk_inventory_totals 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_inventory_totals (
+            product_id INT NOT NULL,
+            store_id INT NOT NULL,
+            location VARCHAR(50) NOT NULL DEFAULT '',
+            qty DECIMAL(14,4) NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (product_id, store_id, location),
+            INDEX idx_store (store_id),
+            FOREIGN KEY (product_id) REFERENCES stk_products(id) ON DELETE CASCADE,
+            FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_inventory_totals 생성 완료")
+    cur.close()
+    conn.close()
+
+    # 2. 현재 로트 수량으로 채우기
+    print("2. 로트 수량으로 합계 계산...")
+    rebuild()
+
+    # 검증
+    print("\n=== 검증 ===")
+    verify()
+    print("\n=== 마이그레이션 완료 ===")
+
+
+def rebuild():
+    """로트 수량으로 합계를 다시 만듭니다 (재고 변경이 없는 시간에 실행)."""
+    conn = _connect()
+    cur = conn.cursor()
+    conn.begin()
+    cur.execute("DELETE FROM stk_inventory_totals")
+    cur.execute(
+        "INSERT INTO stk_inventory_totals (product_id, store_id, location, qty) " + _LOT_TOTALS_SQL
+    )
+    rows = cur.rowcount
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f"   OK 합계 {rows}행 생성")
+
+
+def verify() -> bool:
+    """합계 테이블과 로트 수량 합계를 키별로 비교합니다. 일치하면 True."""
+    conn = _connect()
+    cur = conn.cursor()
+    cur.execute(_LOT_TOTALS_SQL)
+    lots = {(r[0], r[1], r[2]): float(r[3]) for r in cur.fetchall()}
+    cur.execute("SELECT product_id, store_id, location, qty FROM stk_inventory_totals")
+    totals = {(r[0], r[1], r[2]): float(r[3]) for r in cur.fetchall()}
+    cur.close()
+    conn.close()
+    mismatches = [
+        key for key in set(lots) | set(totals)
+        if abs(lots.get(key, 0.0) - totals.get(key, 0.0)) > 0.0001
+    ]
+    print(f"  상품/매장/위치 {len(lots)}건 비교: {'OK' if not mismatches else 'FAIL'}")
+    for product_id, store_id, location in sorted(mismatches)[:50]:
+        key = (product_id, store_id, location)
+        print(f"    불일치 product={product_id} store={store_id} location={location!r}: "
+              f"로트={lots.get(key, 0.0)}, 합계={totals.get(key, 0.0)}")
+    if len(mismatches) > 50:
+        print(f"    ... 외 {len(mismatches) - 50}건 (--rebuild로 재계산)")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--rebuild":
+        rebuild()
+    elif args and args[0] == "--verify":
+        sys.exit(0 if verify() else 1)
+    else:
+        run_migration()
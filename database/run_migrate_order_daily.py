@@ -0,0 +1,168 @@
+"""판매/매입/도매 주문 일별 집계(stk_order_daily) DB 마이그레이션 실행 스크립트
+
+python database/run_migrate_order_daily.py                          # 테이블 생성 + 전체 백필
+python database/run_migrate_order_daily.py --rebuild 2026-01-01 2026-01-31  # 기간만 재집계
+python database/run_migrate_order_daily.py --verify                 # 최근 30일 원본과 비교
+"""
+import os
+import sys
+from datetime import date, timedelta
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+# 종류 → (테이블, 일자 컬럼, 할인액, 최종액) — app/services/rollup_service.ORDER_KINDS와 같은 규칙
+ORDER_SOURCES = {
+    "sale": ("stk_sales", "sale_date", "discount_amount", "final_amount"),
+    "purchase": ("stk_purchases", "purchase_date", "0", "total_amount"),
+    "wholesale": ("stk_wholesale_orders", "order_date", "discount_amount", "final_amount"),
+}
+
+
+def _connect():
+    return pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+
+
+def _aggregate_sql(kind: str, select_keys: str, where: str, group_keys: str) -> str:
+    table, date_col, discount_col, final_col = ORDER_SOURCES[kind]
+    return (
+        f"SELECT {select_keys.format(date_col=date_col)}, COUNT(*), "
+        f"COALESCE(SUM(total_amount), 0), COALESCE(SUM({discount_col}), 0), "
+        f"COALESCE(SUM({final_col}), 0) "
+        f"FROM {table} {where.format(date_col=date_col)} "
+        f"GROUP BY {group_keys.format(date_col=date_col)}"
+    )
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = _connect()
+    cur = conn.cursor()
+    print("=== 주문 일별 집계 마이그레이션 시작 ===\n")
+
+    # 1. stk_order_daily 테이블 생성
+    print("1. stk_order_daily 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_order_daily (
+            business_id INT NOT NULL,
+            kind VARCHAR(20) NOT NULL COMMENT 'sale, purchase, wholesale',
+            order_date DATE NOT NULL,
+            store_id INT NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+            discount_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+            final_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+            PRIMARY KEY (business_id, kind, order_date, store_id, status),
+            INDEX idx_store (store_id),
+            FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
+            FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_order_daily 생성 완료")
+    cur.close()
+    conn.close()
+
+    # 2. 기존 주문 백필
+    print("2. 기존 판매/매입/도매 주문 집계...")
+    rebuild()
+
+    # 검증
+    print("\n=== 검증 ===")
+    verify(date.today() - timedelta(days=30), date.today())
+    print("\n=== 마이그레이션 완료 ===")
+
+
+def rebuild(start_date=None, end_date=None):
+    """원본 주문에서 일별 집계를 다시 만듭니다 (기간 생략 시 전체, 주문 변경이 없는 시간에 실행)."""
+    conn = _connect()
+    cur = conn.cursor()
+    conn.begin()
+    if start_date is None:
+        cur.execute("DELETE FROM stk_order_daily")
+        where, params = "", ()
+    else:
+        cur.execute(
+            "DELETE FROM stk_order_daily WHERE order_date >= %s AND order_date <= %s",
+            (start_date, end_date),
+        )
+        where, params = "WHERE {date_col} >= %s AND {date_col} <= %s", (start_date, end_date)
+    rows = 0
+    for kind in ORDER_SOURCES:
+        cur.execute(
+            "INSERT INTO stk_order_daily "
+            "(business_id, kind, order_date, store_id, status, "
+            "order_count, total_amount, discount_amount, final_amount) "
+            + _aggregate_sql(
+                kind,
+                f"business_id, '{kind}', {{date_col}}, store_id, COALESCE(status, 'draft')",
+                where,
+                "business_id, {date_col}, store_id, COALESCE(status, 'draft')",
+            ),
+            params,
+        )
+        rows += cur.rowcount
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f"   OK 집계 {rows}행 생성")
+
+
+def verify(start_date, end_date) -> bool:
+    """기간의 일별 집계와 원본 주문 집계를 사업장/종류/상태별로 비교합니다. 일치하면 True."""
+    conn = _connect()
+    cur = conn.cursor()
+    raw = {}
+    for kind in ORDER_SOURCES:
+        cur.execute(
+            _aggregate_sql(
+                kind,
+                f"business_id, '{kind}', COALESCE(status, 'draft')",
+                "WHERE {date_col} >= %s AND {date_col} <= %s",
+                "business_id, COALESCE(status, 'draft')",
+            ),
+            (start_date, end_date),
+        )
+        raw.update({(r[0], r[1], r[2]): (int(r[3]), float(r[6])) for r in cur.fetchall()})
+    cur.execute(
+        "SELECT business_id, kind, status, SUM(order_count), COALESCE(SUM(final_amount), 0) "
+        "FROM stk_order_daily WHERE order_date >= %s AND order_date <= %s "
+        "GROUP BY business_id, kind, status",
+        (start_date, end_date),
+    )
+    rolled = {(r[0], r[1], r[2]): (int(r[3]), float(r[4])) for r in cur.fetchall()}
+    cur.close()
+    conn.close()
+    mismatches = [
+        key for key in set(raw) | set(rolled)
+        if raw.get(key, (0, 0.0))[0] != rolled.get(key, (0, 0.0))[0]
+        or abs(raw.get(key, (0, 0.0))[1] - rolled.get(key, (0, 0.0))[1]) > 0.01
+    ]
+    print(f"  {start_date} ~ {end_date}: 사업장/종류/상태 {len(raw)}건 비교, "
+          f"{'OK' if not mismatches else 'FAIL'}")
+    for key in sorted(mismatches):
+        print(f"    불일치 business={key[0]} kind={key[1]} status={key[2]}: "
+              f"원본={raw.get(key)}, 집계={rolled.get(key)}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--rebuild":
+        rebuild(date.fromisoformat(args[1]), date.fromisoformat(args[2]))
+    elif args and args[0] == "--verify":
+        sys.exit(0 if verify(date.today() - timedelta(days=30), date.today()) else 1)
+    else:
+        run_migration()
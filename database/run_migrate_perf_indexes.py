@@ -0,0 +1,153 @@
+"""재고/입출고 조회 경로 복합 인덱스 DB 마이그레이션 실행 스크립트
+
+python database/run_migrate_perf_indexes.py          # 인덱스 추가 + 실행 계획 확인
+python database/run_migrate_perf_indexes.py --check  # 실행 계획(EXPLAIN)만 확인
+"""
+import os
+import sys
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+# (테이블, 인덱스명, 컬럼)
+INDEXES = [
+    ("stk_inventory", "idx_inv_store_product_lot", "store_id, product_id, location, expiry_date"),
+    ("stk_inventory", "idx_inv_store_expiry", "store_id, expiry_date"),
+    ("stk_transactions", "idx_tx_store_created", "store_id, created_at"),
+    ("stk_transactions", "idx_tx_store_type_created", "store_id, type, created_at"),
+    ("stk_sales", "idx_sales_business_date", "business_id, sale_date"),
+    ("stk_purchases", "idx_purchases_business_date", "business_id, purchase_date"),
+    ("stk_wholesale_orders", "idx_wholesale_business_date", "business_id, order_date"),
+]
+
+# (설명, 대상 테이블 별칭, 허용 인덱스, SQL) — 컨트롤러 쿼리와 같은 형태
+# 파라미터 {store_id}, {business_id}는 첫 매장 기준으로 채운다
+PLAN_CHECKS = [
+    ("출고 로트 조회 (process_stock_out_batch)", "stk_inventory",
+     ("idx_inv_store_product_lot", "uk_inv_lot"),
+     "SELECT id, product_id, location, quantity, expiry_date FROM stk_inventory "
+     "WHERE store_id = {store_id} AND product_id IN (1, 2, 3) AND quantity > 0 "
+     "ORDER BY product_id, location, expiry_date IS NULL, expiry_date ASC, id ASC"),
+    ("POS write-back 재고 합계", "stk_inventory",
+     ("idx_inv_store_product_lot", "uk_inv_lot"),
+     "SELECT product_id, store_id, COALESCE(SUM(quantity), 0) AS total_qty "
+     "FROM stk_inventory WHERE (product_id, store_id) IN ((1, {store_id}), (2, {store_id})) "
+     "GROUP BY product_id, store_id"),
+    ("유통기한 임박 집계 (load_expiry_alerts)", "i",
+     ("idx_inv_store_expiry",),
+     "SELECT COUNT(*) AS cnt FROM stk_inventory i "
+     "JOIN stk_products p ON i.product_id = p.id "
+     "WHERE i.store_id = {store_id} AND p.is_active = 1 "
+     "AND i.expiry_date IS NOT NULL AND i.expiry_date >= CURDATE() "
+     "AND i.expiry_date <= DATE_ADD(CURDATE(), INTERVAL 30 DAY) AND i.quantity > 0"),
+    ("최근 입출고 (load_transactions)", "t",
+     ("idx_tx_store_created",),
+     "SELECT t.*, p.name AS product_name FROM stk_transactions t "
+     "JOIN stk_products p ON t.product_id = p.id "
+     "WHERE t.store_id = {store_id} ORDER BY t.created_at DESC LIMIT 50"),
+    ("유형별 입출고 (load_transactions type)", "t",
+     ("idx_tx_store_type_created",),
+     "SELECT t.*, p.name AS product_name FROM stk_transactions t "
+     "JOIN stk_products p ON t.product_id = p.id "
+     "WHERE t.store_id = {store_id} AND t.type = 'sale' ORDER BY t.created_at DESC LIMIT 50"),
+    ("기간 입출고 집계", "t",
+     ("idx_tx_store_created", "idx_tx_store_type_created"),
+     "SELECT t.type, COUNT(*) AS count FROM stk_transactions t "
+     "WHERE t.store_id = {store_id} "
+     "AND t.created_at >= CURDATE() - INTERVAL 30 DAY AND t.created_at < CURDATE() + INTERVAL 1 DAY "
+     "GROUP BY t.type"),
+    ("매출 리포트", "sa",
+     ("idx_sales_business_date",),
+     "SELECT sa.sale_date, sa.total_amount FROM stk_sales sa "
+     "WHERE sa.business_id = {business_id} "
+     "AND sa.sale_date BETWEEN CURDATE() - INTERVAL 30 DAY AND CURDATE() "
+     "ORDER BY sa.sale_date DESC"),
+    ("매입 리포트", "p",
+     ("idx_purchases_business_date",),
+     "SELECT p.purchase_date, p.total_amount FROM stk_purchases p "
+     "WHERE p.business_id = {business_id} "
+     "AND p.purchase_date BETWEEN CURDATE() - INTERVAL 30 DAY AND CURDATE() "
+     "ORDER BY p.purchase_date DESC"),
+    ("도매 리포트", "wo",
+     ("idx_wholesale_business_date",),
+     "SELECT wo.order_date, wo.final_amount FROM stk_wholesale_orders wo "
+     "WHERE wo.business_id = {business_id} "
+     "AND wo.order_date BETWEEN CURDATE() - INTERVAL 30 DAY AND CURDATE() "
+     "ORDER BY wo.order_date DESC"),
+]
+
+
+def _connect():
+    return pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = _connect()
+    cur = conn.cursor()
+    print("=== 성능 인덱스 마이그레이션 시작 ===\n")
+
+    for no, (table, name, columns) in enumerate(INDEXES, 1):
+        print(f"{no}. {table}.{name} ({columns}) 추가...")
+        try:
+            cur.execute(f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+            print(f"   OK {name} 추가 완료")
+        except pymysql.err.OperationalError as e:
+            if "Duplicate key name" in str(e):
+                print(f"   -- {name} 이미 존재")
+            else:
+                raise
+
+    # 검증
+    print("\n=== 검증 ===")
+    for table, name, _ in INDEXES:
+        cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (name,))
+        print(f"  {table}.{name}: {'OK' if cur.fetchone() else 'FAIL'}")
+
+    cur.close()
+    conn.close()
+    print("\n=== 마이그레이션 완료 ===")
+
+
+def check_plans() -> bool:
+    """대표 쿼리를 EXPLAIN해 기대한 인덱스를 쓰는지 확인합니다. 모두 통과하면 True."""
+    conn = _connect()
+    cur = conn.cursor(pymysql.cursors.DictCursor)
+    print("\n=== 실행 계획 확인 (EXPLAIN) ===")
+    cur.execute("SELECT id, business_id FROM stk_stores ORDER BY id LIMIT 1")
+    store = cur.fetchone() or {"id": 1, "business_id": 1}
+    passed = True
+    for label, alias, expected, sql in PLAN_CHECKS:
+        cur.execute("EXPLAIN " + sql.format(store_id=store["id"], business_id=store["business_id"]))
+        row = next((r for r in cur.fetchall() if r["table"] == alias), None)
+        key = row["key"] if row else None
+        extra = (row.get("Extra") or "") if row else ""
+        ok = key in expected
+        passed = passed and ok
+        print(f"  [{'OK' if ok else 'FAIL'}] {label}: key={key}, type={row['type'] if row else '-'}"
+              f"{', ' + extra if extra else ''}")
+    cur.close()
+    conn.close()
+    # 행 수가 아주 적은 테이블은 옵티마이저가 전체 스캔을 고를 수 있다
+    if not passed:
+        print("  ※ 데이터가 적으면 전체 스캔이 선택될 수 있으니 운영 DB에서 다시 확인하세요")
+    return passed
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        sys.exit(0 if check_plans() else 1)
+    run_migration()
+    check_plans()
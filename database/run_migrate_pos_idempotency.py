@@ -0,0 +1,67 @@
+"""POS 중복 수신 방지(Idempotency Key) DB 마이그레이션 실행 스크립트"""
+import os
+import sys
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+    cur = conn.cursor()
+    print("=== POS Idempotency 마이그레이션 시작 ===\n")
+
+    # 1. stk_pos_idempotency 테이블 생성
+    print("1. stk_pos_idempotency 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_pos_idempotency (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            business_id INT NOT NULL,
+            idem_key CHAR(64) NOT NULL COMMENT 'sha256 of header key or pos_record_id',
+            scope VARCHAR(30) NOT NULL COMMENT 'webhook type or poll source',
+            claim_token CHAR(32) NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uk_business_key (business_id, idem_key),
+            INDEX idx_created (created_at)
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_pos_idempotency 생성 완료")
+
+    # 2. stk_pos_inbox.idempotency_key 추가
+    print("2. stk_pos_inbox.idempotency_key 컬럼 추가...")
+    try:
+        cur.execute("ALTER TABLE stk_pos_inbox ADD COLUMN idempotency_key CHAR(64) NULL AFTER payload")
+        print("   OK idempotency_key 추가 완료")
+    except pymysql.err.OperationalError as e:
+        if "Duplicate column" in str(e):
+            print("   -- idempotency_key 이미 존재")
+        else:
+            raise
+
+    # 검증
+    print("\n=== 검증 ===")
+    cur.execute("SHOW TABLES LIKE 'stk_pos_idempotency'")
+    print(f"  stk_pos_idempotency: {'OK' if cur.fetchone() else 'FAIL'}")
+    cur.execute("SHOW COLUMNS FROM stk_pos_inbox LIKE 'idempotency_key'")
+    print(f"  idempotency_key: {'OK' if cur.fetchone() else 'FAIL'}")
+
+    cur.close()
+    conn.close()
+    print("\n=== 마이그레이션 완료 ===")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,84 @@
+"""POS Webhook 인박스 DB 마이그레이션 실행 스크립트"""
+import os
+import sys
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+    cur = conn.cursor()
+    print("=== POS 인박스 마이그레이션 시작 ===\n")
+
+    print("1. stk_pos_inbox 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_pos_inbox (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            business_id INT NOT NULL,
+            business_type VARCHAR(20) NOT NULL DEFAULT 'mart',
+            store_id INT NOT NULL,
+            sync_type VARCHAR(30) NOT NULL COMMENT 'webhook type (sale, stock_in, baekwon_sale, ...)',
+            payload LONGTEXT NOT NULL COMMENT 'webhook JSON body',
+            status ENUM('pending','processing','done','error') NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            result TEXT NULL COMMENT 'handler result JSON',
+            error_message TEXT NULL,
+            received_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            processed_at DATETIME NULL,
+            locked_at DATETIME NULL COMMENT 'processing 시작 시각 (임대 만료 판정)',
+            locked_by VARCHAR(100) NULL COMMENT '처리 중인 프로세스 토큰',
+            next_attempt_at DATETIME NULL COMMENT '실패 후 재시도 가능 시각',
+            INDEX idx_status_store (status, store_id, id),
+            FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_pos_inbox 생성 완료")
+
+    print("2. 처리 임대(locked_at, locked_by) 컬럼 추가...")
+    cur.execute("""
+        ALTER TABLE stk_pos_inbox
+          ADD COLUMN IF NOT EXISTS locked_at DATETIME NULL
+            COMMENT 'processing 시작 시각 (임대 만료 판정)' AFTER processed_at,
+          ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100) NULL
+            COMMENT '처리 중인 프로세스 토큰' AFTER locked_at
+    """)
+    print("   OK locked_at, locked_by 추가 완료")
+
+    print("3. 재시도 대기(next_attempt_at) 컬럼 추가...")
+    cur.execute("""
+        ALTER TABLE stk_pos_inbox
+          ADD COLUMN IF NOT EXISTS next_attempt_at DATETIME NULL
+            COMMENT '실패 후 재시도 가능 시각' AFTER locked_by
+    """)
+    print("   OK next_attempt_at 추가 완료")
+
+    # 검증
+    print("\n=== 검증 ===")
+    cur.execute("SHOW TABLES LIKE 'stk_pos_inbox'")
+    print(f"  stk_pos_inbox: {'OK' if cur.fetchone() else 'FAIL'}")
+    cur.execute("SHOW COLUMNS FROM stk_pos_inbox LIKE 'locked_at'")
+    print(f"  locked_at: {'OK' if cur.fetchone() else 'FAIL'}")
+    cur.execute("SHOW COLUMNS FROM stk_pos_inbox LIKE 'next_attempt_at'")
+    print(f"  next_attempt_at: {'OK' if cur.fetchone() else 'FAIL'}")
+
+    cur.close()
+    conn.close()
+    print("\n=== 마이그레이션 완료 ===")
+
+
+if __name__ == "__main__":
+    run_migration()
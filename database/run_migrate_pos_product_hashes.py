@@ -0,0 +1,70 @@
+"""POS 상품 마스터 증분 동기화(menulist 행 해시) DB 마이그레이션 실행 스크립트"""
+import os
+import sys
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+    cur = conn.cursor()
+    print("=== POS 상품 해시 마이그레이션 시작 ===\n")
+
+    # 1. stk_pos_product_hashes 테이블 생성
+    print("1. stk_pos_product_hashes 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_pos_product_hashes (
+            business_id INT NOT NULL,
+            pos_id INT NOT NULL COMMENT 'menulist.id',
+            row_hash CHAR(32) NOT NULL COMMENT 'md5 of mcode|mname|mprice1|barcode|cost_price',
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (business_id, pos_id)
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_pos_product_hashes 생성 완료")
+
+    # 2. stk_pos_product_fingerprint 테이블 생성
+    print("2. stk_pos_product_fingerprint 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_pos_product_fingerprint (
+            business_id INT NOT NULL PRIMARY KEY,
+            row_count INT NOT NULL COMMENT 'menulist 행 수',
+            fingerprint BIGINT NOT NULL COMMENT 'BIT_XOR of CRC32(id|row_hash)',
+            synced_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_pos_product_fingerprint 생성 완료")
+
+    # 3. 예전에 동기화 로그에 보관하던 menulist 지문 정리
+    print("3. stk_pos_sync_log menulist 행 정리...")
+    cur.execute("DELETE FROM stk_pos_sync_log WHERE pos_table = 'menulist'")
+    print(f"   OK {cur.rowcount}건 삭제")
+
+    # 검증
+    print("\n=== 검증 ===")
+    cur.execute("SHOW TABLES LIKE 'stk_pos_product_hashes'")
+    print(f"  stk_pos_product_hashes: {'OK' if cur.fetchone() else 'FAIL'}")
+    cur.execute("SHOW TABLES LIKE 'stk_pos_product_fingerprint'")
+    print(f"  stk_pos_product_fingerprint: {'OK' if cur.fetchone() else 'FAIL'}")
+
+    cur.close()
+    conn.close()
+    print("\n=== 마이그레이션 완료 ===")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,172 @@
+"""입출고 일별 집계(stk_tx_daily) DB 마이그레이션 실행 스크립트
+
+python database/run_migrate_tx_daily.py                          # 테이블 생성 + 어제까지 재집계
+python database/run_migrate_tx_daily.py --rebuild 2026-01-01 2026-01-31  # 기간만 재집계
+python database/run_migrate_tx_daily.py --verify                 # 어제까지 최근 30일 원본과 비교
+
+앱은 마감 표시(stk_tx_daily_closed)가 없는 날짜를 조회 시 스스로 집계하므로
+재집계는 어긋난 구간을 바로잡을 때만 필요하다. 오늘은 집계하지 않는다 (원본에서 조회).
+"""
+import os
+import sys
+from datetime import date, timedelta
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "stock_master")
+
+_AGGREGATE_SQL = (
+    "SELECT store_id, DATE(created_at), type, COUNT(*), COALESCE(SUM(total_amount), 0) "
+    "FROM stk_transactions "
+)
+
+
+def _connect():
+    return pymysql.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER,
+        password=DB_PASS, database=DB_NAME,
+        charset="utf8mb4", autocommit=True,
+    )
+
+
+def run_migration():
+    """마이그레이션을 실행합니다."""
+    conn = _connect()
+    cur = conn.cursor()
+    print("=== 입출고 일별 집계 마이그레이션 시작 ===\n")
+
+    # 1. stk_tx_daily 테이블 생성
+    print("1. stk_tx_daily 테이블 생성...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_tx_daily (
+            store_id INT NOT NULL,
+            tx_date DATE NOT NULL,
+            type VARCHAR(20) NOT NULL COMMENT 'stk_transactions.type',
+            tx_count INT NOT NULL DEFAULT 0,
+            total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+            PRIMARY KEY (store_id, tx_date, type),
+            INDEX idx_date (tx_date),
+            FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_tx_daily 생성 완료")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stk_tx_daily_closed (
+            business_id INT NOT NULL,
+            tx_date DATE NOT NULL,
+            closed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (business_id, tx_date),
+            FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+    """)
+    print("   OK stk_tx_daily_closed 생성 완료")
+    cur.close()
+    conn.close()
+
+    # 2. 기존 내역 집계
+    print("2. 기존 입출고 내역 집계...")
+    rebuild()
+
+    # 검증
+    print("\n=== 검증 ===")
+    yesterday = date.today() - timedelta(days=1)
+    verify(yesterday - timedelta(days=29), yesterday)
+    print("\n=== 마이그레이션 완료 ===")
+
+
+def rebuild(start_date=None, end_date=None):
+    """원본에서 어제까지의 일별 집계를 다시 만들고 마감 표시합니다 (기간 생략 시 전체)."""
+    yesterday = date.today() - timedelta(days=1)
+    start_date = start_date or date(1970, 1, 1)
+    end_date = min(end_date or yesterday, yesterday)
+    if end_date < start_date:
+        print("   -- 재집계할 마감된 날짜 없음 (오늘은 원본에서 조회)")
+        return
+    # 반열린 구간 [start, end + 1일) — created_at 인덱스 범위 스캔
+    end_exclusive = end_date + timedelta(days=1)
+    conn = _connect()
+    cur = conn.cursor()
+    conn.begin()
+    cur.execute(
+        "DELETE FROM stk_tx_daily WHERE tx_date >= %s AND tx_date < %s",
+        (start_date, end_exclusive),
+    )
+    cur.execute(
+        "DELETE FROM stk_tx_daily_closed WHERE tx_date >= %s AND tx_date < %s",
+        (start_date, end_exclusive),
+    )
+    cur.execute(
+        "INSERT INTO stk_tx_daily (store_id, tx_date, type, tx_count, total_amount) "
+        + _AGGREGATE_SQL
+        + "WHERE created_at >= %s AND created_at < %s "
+          "GROUP BY store_id, DATE(created_at), type",
+        (start_date, end_exclusive),
+    )
+    rows = cur.rowcount
+    # 거래가 없는 날짜는 표시하지 않아도 조회 시 빈 구간으로 빠르게 마감된다
+    cur.execute(
+        "INSERT IGNORE INTO stk_tx_daily_closed (business_id, tx_date) "
+        "SELECT DISTINCT s.business_id, d.tx_date FROM stk_tx_daily d "
+        "JOIN stk_stores s ON d.store_id = s.id "
+        "WHERE d.tx_date >= %s AND d.tx_date < %s",
+        (start_date, end_exclusive),
+    )
+    conn.commit()
+    cur.close()
+    conn.close()
+    print(f"   OK 집계 {rows}행 생성 ({start_date} ~ {end_date})")
+
+
+def verify(start_date, end_date) -> bool:
+    """기간의 일별 집계와 원본 집계를 매장/유형별로 비교합니다. 일치하면 True.
+
+    앱이 아직 조회하지 않아 마감 표시가 없는 날짜는 집계가 비어 있으므로 --rebuild 후 비교한다.
+    """
+    conn = _connect()
+    cur = conn.cursor()
+    end_exclusive = end_date + timedelta(days=1)
+    cur.execute(
+        "SELECT store_id, type, COUNT(*), COALESCE(SUM(total_amount), 0) "
+        "FROM stk_transactions WHERE created_at >= %s AND created_at < %s "
+        "GROUP BY store_id, type",
+        (start_date, end_exclusive),
+    )
+    raw = {(r[0], r[1]): (int(r[2]), float(r[3])) for r in cur.fetchall()}
+    cur.execute(
+        "SELECT store_id, type, SUM(tx_count), COALESCE(SUM(total_amount), 0) "
+        "FROM stk_tx_daily WHERE tx_date >= %s AND tx_date < %s "
+        "GROUP BY store_id, type",
+        (start_date, end_exclusive),
+    )
+    rolled = {(r[0], r[1]): (int(r[2]), float(r[3])) for r in cur.fetchall()}
+    cur.close()
+    conn.close()
+    mismatches = [
+        key for key in set(raw) | set(rolled)
+        if raw.get(key, (0, 0.0))[0] != rolled.get(key, (0, 0.0))[0]
+        or abs(raw.get(key, (0, 0.0))[1] - rolled.get(key, (0, 0.0))[1]) > 0.01
+    ]
+    print(f"  {start_date} ~ {end_date}: 매장/유형 {len(raw)}건 비교, "
+          f"{'OK' if not mismatches else 'FAIL'}")
+    for store_id, tx_type in sorted(mismatches):
+        print(f"    불일치 store={store_id} type={tx_type}: "
+              f"원본={raw.get((store_id, tx_type))}, 집계={rolled.get((store_id, tx_type))}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--rebuild":
+        rebuild(date.fromisoformat(args[1]), date.fromisoformat(args[2]))
+    elif args and args[0] == "--verify":
+        yesterday = date.today() - timedelta(days=1)
+        sys.exit(0 if verify(yesterday - timedelta(days=29), yesterday) else 1)
+    else:
+        run_migration()
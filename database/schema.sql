@@ -118,6 +118,22 @@ CREATE TABLE IF NOT EXISTS stk_inventory (
     memo TEXT,
     last_updated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (product_id) REFERENCES stk_products(id) ON DELETE CASCADE,
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE,
+    UNIQUE KEY uk_inv_lot (product_id, store_id, location, expiry_date),
+    INDEX idx_inv_store_product_lot (store_id, product_id, location, expiry_date),
+    INDEX idx_inv_store_expiry (store_id, expiry_date)
+) ENGINE=InnoDB;
+
+-- ── 상품/매장/위치별 재고 합계 (재고 변경 시 증감분 반영) ──
+CREATE TABLE IF NOT EXISTS stk_inventory_totals (
+    product_id INT NOT NULL,
+    store_id INT NOT NULL,
+    location VARCHAR(50) NOT NULL DEFAULT '',
+    qty DECIMAL(14,4) NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, store_id, location),
+    INDEX idx_store (store_id),
+    FOREIGN KEY (product_id) REFERENCES stk_products(id) ON DELETE CASCADE,
     FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
@@ -138,9 +154,32 @@ CREATE TABLE IF NOT EXISTS stk_transactions (
     user_id INT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (product_id) REFERENCES stk_products(id) ON DELETE CASCADE,
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE,
+    INDEX idx_tx_store_created (store_id, created_at),
+    INDEX idx_tx_store_type_created (store_id, type, created_at)
+) ENGINE=InnoDB;
+
+-- ── 입출고 일별 집계 (마감된 날짜를 조회 시 원본에서 집계) ──
+CREATE TABLE IF NOT EXISTS stk_tx_daily (
+    store_id INT NOT NULL,
+    tx_date DATE NOT NULL,
+    type VARCHAR(20) NOT NULL COMMENT 'stk_transactions.type',
+    tx_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (store_id, tx_date, type),
+    INDEX idx_date (tx_date),
     FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+-- 사업장별 집계 완료(마감) 날짜
+CREATE TABLE IF NOT EXISTS stk_tx_daily_closed (
+    business_id INT NOT NULL,
+    tx_date DATE NOT NULL,
+    closed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (business_id, tx_date),
+    FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 -- ── 매입 ──
 CREATE TABLE IF NOT EXISTS stk_purchases (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -156,7 +195,8 @@ CREATE TABLE IF NOT EXISTS stk_purchases (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
     FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE,
-    FOREIGN KEY (supplier_id) REFERENCES stk_suppliers(id) ON DELETE SET NULL
+    FOREIGN KEY (supplier_id) REFERENCES stk_suppliers(id) ON DELETE SET NULL,
+    INDEX idx_purchases_business_date (business_id, purchase_date)
 ) ENGINE=InnoDB;
 
 -- ── 매입 상세 ──
@@ -271,7 +311,8 @@ CREATE TABLE IF NOT EXISTS stk_wholesale_orders (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
     FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE,
-    FOREIGN KEY (client_id) REFERENCES stk_wholesale_clients(id) ON DELETE CASCADE
+    FOREIGN KEY (client_id) REFERENCES stk_wholesale_clients(id) ON DELETE CASCADE,
+    INDEX idx_wholesale_business_date (business_id, order_date)
 ) ENGINE=InnoDB;
 
 -- ── 도매 주문 상세 ──
@@ -355,7 +396,25 @@ CREATE TABLE IF NOT EXISTS stk_sales (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
     FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE,
-    FOREIGN KEY (client_id) REFERENCES stk_wholesale_clients(id) ON DELETE SET NULL
+    FOREIGN KEY (client_id) REFERENCES stk_wholesale_clients(id) ON DELETE SET NULL,
+    INDEX idx_sales_business_date (business_id, sale_date)
+) ENGINE=InnoDB;
+
+-- ── 판매/매입/도매 주문 일별 집계 (주문 생성·상태 변경 시 같은 트랜잭션에서 누적) ──
+CREATE TABLE IF NOT EXISTS stk_order_daily (
+    business_id INT NOT NULL,
+    kind VARCHAR(20) NOT NULL COMMENT 'sale, purchase, wholesale',
+    order_date DATE NOT NULL,
+    store_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    discount_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    final_amount DECIMAL(18,6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_id, kind, order_date, store_id, status),
+    INDEX idx_store (store_id),
+    FOREIGN KEY (business_id) REFERENCES stk_businesses(id) ON DELETE CASCADE,
+    FOREIGN KEY (store_id) REFERENCES stk_stores(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
 -- ── 판매 상세 ──
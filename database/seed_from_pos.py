@@ -79,12 +79,13 @@ def cleanup(stk):
     """기존 데이터를 모두 삭제합니다."""
     tables = [
         "stk_stock_count_items", "stk_stock_counts",
-        "stk_sale_items", "stk_sales",
+        "stk_order_daily", "stk_sale_items", "stk_sales",
         "stk_wholesale_order_items", "stk_wholesale_orders",
         "stk_wholesale_pricing", "stk_wholesale_clients",
         "stk_repackaging", "stk_recipe_items", "stk_recipes",
         "stk_purchase_items", "stk_purchases",
-        "stk_transactions", "stk_inventory",
+        "stk_tx_daily_closed", "stk_tx_daily", "stk_transactions",
+        "stk_inventory_totals", "stk_inventory",
         "stk_products", "stk_suppliers", "stk_categories",
         "stk_users", "stk_stores", "stk_businesses",
     ]
@@ -378,6 +379,11 @@ def seed_inventory(stk, store_id: int, product_map: dict):
                 "VALUES (%s, %s, %s, %s)",
                 (pid, store_id, location, qty),
             )
+            cur.execute(
+                "INSERT INTO stk_inventory_totals (product_id, store_id, location, qty) "
+                "VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE qty = qty + VALUES(qty)",
+                (pid, store_id, location, qty),
+            )
             count += 1
     print(f"  초기 재고 {count}개 항목 설정")
 
@@ -9,10 +9,16 @@ if sys.stdout and hasattr(sys.stdout, 'reconfigure'):
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+import os
 import config
 from app import create_app
 
-app = create_app()
+# 디버그 리로더는 감시용 부모 프로세스와 실제 서버 자식 프로세스가 모두 이 모듈을 실행하므로
+# 백그라운드 서비스는 자식(WERKZEUG_RUN_MAIN=true)에서만 시작한다
+_reloader_parent = (
+    __name__ == "__main__" and config.APP_DEBUG and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+)
+app = create_app(start_services=not _reloader_parent)
 
 if __name__ == "__main__":
     print("=" * 50)
@@ -0,0 +1,191 @@
+"""POS Webhook 트랜잭션 롤백 / 중복 수신 통합 테스트
+
+StockMaster 웹 서버가 실행중인 상태에서 실행합니다 (POS_WEBHOOK_ASYNC=false, 마트 사업장).
+"""
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+BASE = "http://localhost:5556"
+API_KEY = os.getenv("POS_API_KEY") or os.getenv("BAEKWON_POS_API_KEY", "baekwon-bridge-key")
+DB_CFG = dict(
+    host=os.getenv("DB_HOST", "localhost"),
+    port=int(os.getenv("DB_PORT", "3306")),
+    user=os.getenv("DB_USER", "root"),
+    password=os.getenv("DB_PASSWORD", ""),
+    database=os.getenv("DB_NAME", "stock_master"),
+    charset="utf8mb4",
+    cursorclass=pymysql.cursors.DictCursor,
+)
+
+
+def db_query(sql, params=None):
+    conn = pymysql.connect(**DB_CFG)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    result = cur.fetchall()
+    conn.close()
+    return result
+
+
+def db_one(sql, params=None):
+    rows = db_query(sql, params)
+    return rows[0] if rows else None
+
+
+results = []
+
+
+def check(name, condition):
+    status = "PASS" if condition else "FAIL"
+    results.append((name, status))
+    print(f"  [{status}] {name}")
+
+
+def post_sale(items, idem_key):
+    return requests.post(
+        f"{BASE}/api/pos/webhook",
+        json={"type": "sale", "business_id": biz_id, "items": items},
+        headers={"X-API-Key": API_KEY, "Idempotency-Key": idem_key},
+    )
+
+
+def stock_of(product_id):
+    """(로트 합계, 재고 합계 테이블 합계)"""
+    lots = db_one(
+        "SELECT COALESCE(SUM(quantity), 0) AS qty FROM stk_inventory WHERE product_id = %s AND store_id = %s",
+        (product_id, store_id),
+    )["qty"]
+    totals = db_one(
+        "SELECT COALESCE(SUM(qty), 0) AS qty FROM stk_inventory_totals WHERE product_id = %s AND store_id = %s",
+        (product_id, store_id),
+    )["qty"]
+    return float(lots), float(totals)
+
+
+def out_tx_count(product_ids):
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    return db_one(
+        f"SELECT COUNT(*) AS cnt FROM stk_transactions "
+        f"WHERE store_id = %s AND type = 'out' AND product_id IN ({placeholders})",
+        (store_id, *product_ids),
+    )["cnt"]
+
+
+def idem_stored(idem_key):
+    return db_one(
+        "SELECT COUNT(*) AS cnt FROM stk_pos_idempotency WHERE business_id = %s AND idem_key = %s",
+        (biz_id, hashlib.sha256(f"header:{idem_key}".encode("utf-8")).hexdigest()),
+    )["cnt"] > 0
+
+
+print("=== POS Webhook 롤백/중복 수신 테스트 시작 ===\n")
+
+if os.getenv("POS_WEBHOOK_ASYNC", "false").lower() == "true":
+    print("POS_WEBHOOK_ASYNC=true 이면 결과를 바로 확인할 수 없습니다. false로 실행하세요.")
+    exit(1)
+
+# 0. 테스트 데이터 — 서버의 _resolve_business와 같은 규칙으로 매장을 고른다
+biz = db_one("SELECT id FROM stk_businesses WHERE type <> 'restaurant' ORDER BY id LIMIT 1")
+if not biz:
+    print("마트 사업장이 필요합니다.")
+    exit(1)
+biz_id = biz["id"]
+store_id = db_one(
+    "SELECT id FROM stk_stores WHERE business_id = %s AND is_active = 1 LIMIT 1", (biz_id,),
+)["id"]
+lots = db_query(
+    "SELECT i.id, i.product_id, p.code FROM stk_inventory i "
+    "JOIN stk_products p ON i.product_id = p.id "
+    "WHERE i.store_id = %s AND i.location = 'warehouse' AND i.quantity >= 5 "
+    "AND p.is_active = 1 AND p.code <> '' ORDER BY i.quantity DESC LIMIT 20",
+    (store_id,),
+)
+picked = {}
+for lot in lots:
+    picked.setdefault(lot["product_id"], lot)
+if len(picked) < 2:
+    print("창고 재고 5개 이상인 상품이 2개 이상 필요합니다.")
+    exit(1)
+lot_a, lot_b = list(picked.values())[:2]
+print(f"   사업장 {biz_id}, 매장 {store_id}")
+print(f"   상품A: {lot_a['code']} (product_id={lot_a['product_id']})")
+print(f"   상품B: {lot_b['code']} (lot_id={lot_b['id']})")
+
+# 1. 오류 라인이 있으면 전체 롤백
+print("\n1. 오류 라인 포함 판매 → 전체 롤백")
+sql_mode = db_one("SELECT @@GLOBAL.sql_mode AS mode")["mode"] or ""
+rollback_key = f"test-rollback-{uuid.uuid4().hex}"
+if "STRICT" not in sql_mode:
+    print(f"   sql_mode에 STRICT가 없어 범위 초과 오류를 만들 수 없습니다 ({sql_mode}) — 건너뜀")
+else:
+    before_a, before_b = stock_of(lot_a["product_id"]), stock_of(lot_b["product_id"])
+    before_tx = out_tx_count([lot_a["product_id"], lot_b["product_id"]])
+    # 상품B는 DECIMAL(10,4) 범위를 넘는 수량을 로트 지정 차감 → 해당 라인 오류
+    r = post_sale([
+        {"menu_code": lot_a["code"], "quantity": 1},
+        {"menu_code": lot_b["code"], "quantity": 5000000, "lot_id": lot_b["id"]},
+    ], rollback_key)
+    data = r.json()
+    check("HTTP 500 응답", r.status_code == 500)
+    check("success=false, 오류 라인 보고", not data.get("success") and bool(data.get("result", {}).get("errors")))
+    check("상품A 차감 롤백", stock_of(lot_a["product_id"]) == before_a)
+    check("상품B 차감 롤백", stock_of(lot_b["product_id"]) == before_b)
+    check("출고 기록 롤백", out_tx_count([lot_a["product_id"], lot_b["product_id"]]) == before_tx)
+    check("중복 판정 키 미저장", not idem_stored(rollback_key))
+
+    # 2. 같은 키로 재전송하면 다시 처리
+    print("\n2. 롤백된 키로 재전송 → 정상 처리")
+    r = post_sale([{"menu_code": lot_a["code"], "quantity": 1}], rollback_key)
+    data = r.json()
+    check("HTTP 200 응답", r.status_code == 200)
+    check("중복으로 무시되지 않음", not data.get("duplicate") and data.get("result", {}).get("processed") == 1)
+    lots_qty, totals_qty = stock_of(lot_a["product_id"])
+    check("상품A 1개 차감", abs(lots_qty - (before_a[0] - 1)) < 0.0001)
+    check("재고 합계 = 로트 합계", abs(lots_qty - totals_qty) < 0.0001)
+    check("중복 판정 키 저장", idem_stored(rollback_key))
+
+# 3. 같은 키 재전송은 중복으로 무시
+print("\n3. 같은 Idempotency-Key 재전송 → 중복 무시")
+dup_key = f"test-duplicate-{uuid.uuid4().hex}"
+before = stock_of(lot_a["product_id"])
+r = post_sale([{"menu_code": lot_a["code"], "quantity": 1}], dup_key)
+check("첫 전송 처리", r.status_code == 200 and r.json().get("result", {}).get("processed") == 1)
+after_first = stock_of(lot_a["product_id"])
+r = post_sale([{"menu_code": lot_a["code"], "quantity": 1}], dup_key)
+check("재전송 duplicate=true", r.status_code == 200 and r.json().get("duplicate") is True)
+check("재전송은 재고 변화 없음", stock_of(lot_a["product_id"]) == after_first)
+check("전체 1개만 차감", abs(after_first[0] - (before[0] - 1)) < 0.0001)
+
+# 4. 같은 키 동시 전송 → 한 번만 차감
+print("\n4. 같은 Idempotency-Key 동시 전송 → 한 번만 차감")
+race_key = f"test-race-{uuid.uuid4().hex}"
+before = stock_of(lot_a["product_id"])
+with ThreadPoolExecutor(max_workers=4) as pool:
+    responses = list(pool.map(
+        lambda _: post_sale([{"menu_code": lot_a["code"], "quantity": 1}], race_key), range(4),
+    ))
+processed = sum(1 for r in responses if r.status_code == 200 and not r.json().get("duplicate"))
+check("4건 모두 200 응답", all(r.status_code == 200 for r in responses))
+check("처리된 요청 1건", processed == 1)
+lots_qty, totals_qty = stock_of(lot_a["product_id"])
+check("상품A 1개만 차감", abs(lots_qty - (before[0] - 1)) < 0.0001)
+check("재고 합계 = 로트 합계", abs(lots_qty - totals_qty) < 0.0001)
+
+# 결과 요약
+print("\n" + "=" * 50)
+passed = sum(1 for _, s in results if s == "PASS")
+failed = sum(1 for _, s in results if s == "FAIL")
+print(f"결과: {passed} PASS / {failed} FAIL / 총 {len(results)} 건")
+if failed > 0:
+    print("\n실패 항목:")
+    for name, status in results:
+        if status == "FAIL":
+            print(f"  - {name}")
+print("=" * 50)
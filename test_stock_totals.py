@@ -0,0 +1,257 @@
+"""판매 후 재고 합계/일별 집계 정합성 및 CSV 내보내기 통합 테스트
+
+StockMaster 웹 서버가 실행중인 상태에서 실행합니다 (POS_WEBHOOK_ASYNC=false, 마트 사업장).
+"""
+import csv
+import gzip
+import io
+import os
+import re
+import uuid
+from datetime import date, timedelta
+import requests
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+BASE = "http://localhost:5556"
+API_KEY = os.getenv("POS_API_KEY") or os.getenv("BAEKWON_POS_API_KEY", "baekwon-bridge-key")
+DB_CFG = dict(
+    host=os.getenv("DB_HOST", "localhost"),
+    port=int(os.getenv("DB_PORT", "3306")),
+    user=os.getenv("DB_USER", "root"),
+    password=os.getenv("DB_PASSWORD", ""),
+    database=os.getenv("DB_NAME", "stock_master"),
+    charset="utf8mb4",
+    cursorclass=pymysql.cursors.DictCursor,
+)
+
+
+def db_query(sql, params=None):
+    conn = pymysql.connect(**DB_CFG)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    result = cur.fetchall()
+    conn.close()
+    return result
+
+
+def db_one(sql, params=None):
+    rows = db_query(sql, params)
+    return rows[0] if rows else None
+
+
+results = []
+
+
+def check(name, condition):
+    status = "PASS" if condition else "FAIL"
+    results.append((name, status))
+    print(f"  [{status}] {name}")
+
+
+def totals_mismatches(store_id):
+    """매장의 (상품, 위치)별 재고 합계 테이블과 로트 합계가 다른 키 목록"""
+    lots = {
+        (r["product_id"], r["location"] or ""): float(r["qty"])
+        for r in db_query(
+            "SELECT product_id, location, SUM(quantity) AS qty FROM stk_inventory "
+            "WHERE store_id = %s GROUP BY product_id, location",
+            (store_id,),
+        )
+    }
+    totals = {
+        (r["product_id"], r["location"]): float(r["qty"])
+        for r in db_query(
+            "SELECT product_id, location, qty FROM stk_inventory_totals WHERE store_id = %s",
+            (store_id,),
+        )
+    }
+    return [
+        key for key in set(lots) | set(totals)
+        if abs(lots.get(key, 0.0) - totals.get(key, 0.0)) > 0.0001
+    ]
+
+
+def order_daily_mismatches(business_id, sale_date):
+    """판매 일별 집계와 stk_sales 원본 집계가 (매장, 상태)별로 다른 키 목록"""
+    raw = {
+        (r["store_id"], r["status"]): (int(r["cnt"]), float(r["amount"]))
+        for r in db_query(
+            "SELECT store_id, status, COUNT(*) AS cnt, COALESCE(SUM(final_amount), 0) AS amount "
+            "FROM stk_sales WHERE business_id = %s AND sale_date = %s GROUP BY store_id, status",
+            (business_id, sale_date),
+        )
+    }
+    rolled = {
+        (r["store_id"], r["status"]): (int(r["cnt"]), float(r["amount"]))
+        for r in db_query(
+            "SELECT store_id, status, SUM(order_count) AS cnt, COALESCE(SUM(final_amount), 0) AS amount "
+            "FROM stk_order_daily WHERE business_id = %s AND kind = 'sale' AND order_date = %s "
+            "GROUP BY store_id, status",
+            (business_id, sale_date),
+        )
+    }
+    return [
+        key for key in set(raw) | set(rolled)
+        if raw.get(key, (0, 0.0))[0] != rolled.get(key, (0, 0.0))[0]
+        or abs(raw.get(key, (0, 0.0))[1] - rolled.get(key, (0, 0.0))[1]) > 0.01
+    ]
+
+
+def csv_rows(content):
+    return list(csv.reader(io.StringIO(content.decode("utf-8"))))
+
+
+print("=== 재고 합계/일별 집계 정합성 및 CSV 내보내기 테스트 시작 ===\n")
+
+# 0. 테스트 데이터 — 서버의 _resolve_business와 같은 규칙으로 매장을 고른다
+biz = db_one("SELECT id FROM stk_businesses WHERE type <> 'restaurant' ORDER BY id LIMIT 1")
+if not biz:
+    print("마트 사업장이 필요합니다.")
+    exit(1)
+biz_id = biz["id"]
+store_id = db_one(
+    "SELECT id FROM stk_stores WHERE business_id = %s AND is_active = 1 LIMIT 1", (biz_id,),
+)["id"]
+product = db_one(
+    "SELECT i.product_id, p.code, p.sell_price FROM stk_inventory i "
+    "JOIN stk_products p ON i.product_id = p.id "
+    "WHERE i.store_id = %s AND i.location = 'warehouse' AND i.quantity >= 2 "
+    "AND p.is_active = 1 AND p.code <> '' ORDER BY i.quantity DESC LIMIT 1",
+    (store_id,),
+)
+if not product:
+    print("창고 재고 2개 이상인 상품이 필요합니다.")
+    exit(1)
+today = date.today().isoformat()
+print(f"   사업장 {biz_id}, 매장 {store_id}, 상품 {product['code']}")
+
+# 1. POS 판매 후 재고 합계 = 로트 합계
+print("\n1. POS 판매 후 재고 합계 테이블 정합성")
+check("판매 전 재고 합계 = 로트 합계", not totals_mismatches(store_id))
+before_qty = float(db_one(
+    "SELECT COALESCE(SUM(qty), 0) AS qty FROM stk_inventory_totals WHERE product_id = %s AND store_id = %s",
+    (product["product_id"], store_id),
+)["qty"])
+before_daily = db_one(
+    "SELECT COUNT(*) AS cnt, COALESCE(SUM(tx_count), 0) AS tx FROM stk_tx_daily "
+    "WHERE store_id = %s AND tx_date = %s",
+    (store_id, today),
+)
+r = requests.post(
+    f"{BASE}/api/pos/webhook",
+    json={"type": "sale", "business_id": biz_id,
+          "items": [{"menu_code": product["code"], "quantity": 2}]},
+    headers={"X-API-Key": API_KEY, "Idempotency-Key": f"test-totals-{uuid.uuid4().hex}"},
+)
+check("판매 Webhook 처리", r.status_code == 200 and r.json().get("result", {}).get("processed") == 1)
+after_qty = float(db_one(
+    "SELECT COALESCE(SUM(qty), 0) AS qty FROM stk_inventory_totals WHERE product_id = %s AND store_id = %s",
+    (product["product_id"], store_id),
+)["qty"])
+check("재고 합계 2개 감소", abs(after_qty - (before_qty - 2)) < 0.0001)
+mismatches = totals_mismatches(store_id)
+check("판매 후 재고 합계 = 로트 합계", not mismatches)
+for key in mismatches[:10]:
+    print(f"    불일치 product/location={key}")
+
+# 2. 입출고 일별 집계 — 쓰기 경로는 오늘 집계를 건드리지 않고, 마감된 날짜는 원본과 일치
+print("\n2. 입출고 일별 집계 정합성")
+after_daily = db_one(
+    "SELECT COUNT(*) AS cnt, COALESCE(SUM(tx_count), 0) AS tx FROM stk_tx_daily "
+    "WHERE store_id = %s AND tx_date = %s",
+    (store_id, today),
+)
+check("판매가 오늘 일별 집계 행을 갱신하지 않음", after_daily == before_daily)
+closed_days = db_query(
+    "SELECT tx_date FROM stk_tx_daily_closed WHERE business_id = %s AND tx_date >= %s",
+    (biz_id, (date.today() - timedelta(days=30)).isoformat()),
+)
+closed_mismatch = 0
+for day in closed_days:
+    raw = {
+        (r["store_id"], r["type"]): int(r["cnt"])
+        for r in db_query(
+            "SELECT t.store_id, t.type, COUNT(*) AS cnt FROM stk_stores s "
+            "JOIN stk_transactions t ON t.store_id = s.id "
+            "AND t.created_at >= %s AND t.created_at < %s + INTERVAL 1 DAY "
+            "WHERE s.business_id = %s GROUP BY t.store_id, t.type",
+            (day["tx_date"], day["tx_date"], biz_id),
+        )
+    }
+    rolled = {
+        (r["store_id"], r["type"]): int(r["cnt"])
+        for r in db_query(
+            "SELECT d.store_id, d.type, d.tx_count AS cnt FROM stk_tx_daily d "
+            "JOIN stk_stores s ON d.store_id = s.id "
+            "WHERE s.business_id = %s AND d.tx_date = %s",
+            (biz_id, day["tx_date"]),
+        )
+    }
+    if raw != rolled:
+        closed_mismatch += 1
+        print(f"    불일치 {day['tx_date']}: 원본={raw}, 집계={rolled}")
+print(f"   마감된 날짜 {len(closed_days)}일 비교")
+check("마감된 날짜 집계 = 원본", closed_mismatch == 0)
+
+# 3. 판매 주문 일별 집계 — 생성/취소 후 stk_sales 원본과 일치
+print("\n3. 판매 주문 일별 집계 정합성")
+s = requests.Session()
+r = s.post(f"{BASE}/login", data={"username": "admin", "password": "admin123"}, allow_redirects=True)
+check("로그인 성공", r.status_code == 200)
+r = s.post(f"{BASE}/sales/create", data={
+    "sale_date": today,
+    "customer_name": "Totals Test",
+    "discount_rate": "0",
+    "memo": "Rollup consistency test",
+    "item_product_id[]": [str(product["product_id"])],
+    "item_quantity[]": ["1"],
+    "item_unit_price[]": [str(float(product["sell_price"] or 1000))],
+}, allow_redirects=True)
+sale_match = re.search(r"/sales/(\d+)", r.url)
+check("판매 생성", r.status_code == 200 and sale_match is not None)
+check("생성 후 일별 집계 = 원본", not order_daily_mismatches(biz_id, today))
+if sale_match:
+    r = s.post(f"{BASE}/sales/{sale_match.group(1)}/cancel", allow_redirects=True)
+    check("판매 취소", r.status_code == 200)
+    check("취소 후 일별 집계 = 원본", not order_daily_mismatches(biz_id, today))
+
+# 4. CSV 내보내기
+print("\n4. CSV 내보내기")
+r = s.get(f"{BASE}/reports/csv/inventory")
+check("재고 CSV 다운로드", r.status_code == 200 and "text/csv" in r.headers.get("content-type", ""))
+rows = csv_rows(r.content)
+check("재고 CSV 헤더", bool(rows) and rows[0][:3] == ["Code", "Product", "Category"])
+expected = s.get(f"{BASE}/reports/api/export/inventory").json()
+check(f"재고 CSV 행 수 = 리포트 행 수 ({len(expected)})", len(rows) - 1 == len(expected))
+codes = {row[0] for row in rows[1:]}
+check("판매한 상품이 CSV에 포함", product["code"] in codes)
+
+r_gz = s.get(f"{BASE}/reports/csv/inventory?gzip=1")
+check("gzip CSV 다운로드", r_gz.status_code == 200 and r_gz.headers.get("content-type", "").startswith("application/gzip"))
+check("gzip 해제 결과 = 일반 CSV", gzip.decompress(r_gz.content) == r.content)
+
+start = (date.today() - timedelta(days=30)).isoformat()
+r = s.get(f"{BASE}/reports/csv/sales?start_date={start}&end_date={today}")
+rows = csv_rows(r.content)
+expected = s.get(f"{BASE}/reports/api/export/sales?start_date={start}&end_date={today}").json()
+check("판매 CSV 헤더", bool(rows) and rows[0] == ["Date", "Number", "Customer", "Store", "Amount", "Status"])
+check(f"판매 CSV 행 수 = 리포트 행 수 ({len(expected)})", len(rows) - 1 == len(expected))
+
+r = s.get(f"{BASE}/reports/csv/expiry?filter=all")
+rows = csv_rows(r.content)
+check("유통기한 CSV 헤더", bool(rows) and rows[0][:2] == ["Expiry Date", "Days Left"])
+
+# 결과 요약
+print("\n" + "=" * 50)
+passed = sum(1 for _, s in results if s == "PASS")
+failed = sum(1 for _, s in results if s == "FAIL")
+print(f"결과: {passed} PASS / {failed} FAIL / 총 {len(results)} 건")
+if failed > 0:
+    print("\n실패 항목:")
+    for name, status in results:
+        if status == "FAIL":
+            print(f"  - {name}")
+print("=" * 50)